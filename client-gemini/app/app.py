@@ -1,18 +1,32 @@
+import asyncio
 import logging
 from app.core.signaling import SignalingClient
 from app.core.cli import CLIHandler
-from app.config.constants import MAX_SESSIONS
+from app.core.admission import AdmissionController
+from app.config.constants import LIVE_POOL_ENABLED, LIVE_HANDLE_STORE_ENABLED, METRICS_ENABLED, METRICS_HOST, METRICS_PORT
 from app.config.factories import create_call_session
+from app.wakeword.engine import get_wakeword_engine, shutdown_wakeword_engine
+from app.services.homeassistant_api import get_homeassistant_client, close_homeassistant_client
+from app.llm.gemini import get_live_session_pool, shutdown_live_session_pool
+from app.llm.handle_store import get_session_handle_store, close_session_handle_store
+from app.media.video import shutdown_video_encode_pool
+from app.metrics.loop_lag import get_loop_lag_monitor, close_loop_lag_monitor
+from app.metrics.server import MetricsServer
 
 LOGGER = logging.getLogger(__name__)
 
 class GeminiApp:
-    def __init__(self):
+    def __init__(self, signaling_client=None, metrics_port=METRICS_PORT):
         self.main_caller_id = "666666"  
         self.active_sessions = {}      
-        self.signaling_client = SignalingClient()
+        self.signaling_client = signaling_client or SignalingClient()
         self.llm_name = "gemini"
         self.cli = CLIHandler(self)   
+        # Admits, queues or rejects calls from the box's actual load
+        self.admission = AdmissionController(lambda: self.active_sessions.values(),
+                                             wakeword_stats=lambda: get_wakeword_engine().stats())
+        self._early_candidates = {}  # caller id -> ICE candidates that arrived while the call was queued
+        self.metrics_server = MetricsServer(self.metrics, METRICS_HOST, metrics_port) if METRICS_ENABLED else None
         self._wire_signaling()
 
     def _wire_signaling(self):
@@ -25,23 +39,50 @@ class GeminiApp:
 
     # --- Signaling Handler Methods ---
     async def handle_incoming_call(self, data):
+        """Answers a call; returns the session it created, or None if this attempt created none."""
         caller_id = data.get('callerId')
         rtc_message = data.get('rtcMessage')
 
         LOGGER.info(f"Incoming call from {caller_id} to main ID.")
 
-        if len(self.active_sessions) >= MAX_SESSIONS:
-            LOGGER.warning(f"At max capacity ({MAX_SESSIONS} calls). Rejecting call from {caller_id}.")
-            return
+        if caller_id in self.active_sessions:
+            LOGGER.warning(f"Already in an active session with {caller_id}. Ignoring the new call.")
+            return None
+        if self.admission.is_waiting(caller_id):
+            LOGGER.warning(f"Call from {caller_id} is already queued. Ignoring the repeated call.")
+            return None
+
+        self._early_candidates[caller_id] = []
+        if not await self.admission.acquire(caller_id):
+            self._early_candidates.pop(caller_id, None)
+            # Tell the caller instead of letting it ring forever
+            await self.signaling_client.send_hangup(caller_id, reason="busy")
+            return None
+
+        try:
+            session = create_call_session(
+                remote_user_id=caller_id,
+                signaling_client=self.signaling_client,
+                on_cleanup_callback=self.remove_session,
+                llm_name=self.llm_name
+            )
+        except Exception as e:
+            LOGGER.error(f"Failed to create a session for {caller_id}. Error: {e}")
+            self._early_candidates.pop(caller_id, None)
+            self.admission.release()
+            return None
 
-        session = create_call_session(
-            remote_user_id=caller_id,
-            signaling_client=self.signaling_client,
-            on_cleanup_callback=self.remove_session,
-            llm_name=self.llm_name
-        )
         self.active_sessions[caller_id] = session
-        await session.webrtc_manager.handle_remote_offer(rtc_message)
+        try:
+            await session.webrtc_manager.handle_remote_offer(rtc_message)
+            for candidate in self._early_candidates.pop(caller_id, []):
+                await session.webrtc_manager.add_ice_candidate(candidate)
+        except Exception as e:
+            LOGGER.error(f"Failed to answer the call from {caller_id}. Error: {e}")
+            self._early_candidates.pop(caller_id, None)
+            # Releases the slot through remove_session
+            await session.cleanup()
+        return session
 
     async def handle_call_answered(self, data):
         callee_id = data.get('callee')
@@ -52,6 +93,7 @@ class GeminiApp:
     async def handle_call_ended(self, data):
         caller_id = data.get("senderId")
         LOGGER.warning(f"Caller {caller_id} hung up before call connected.")
+        self.admission.cancel(caller_id)
         session = self.active_sessions.get(caller_id)
         if session:
             await session.cleanup() 
@@ -62,6 +104,8 @@ class GeminiApp:
         session = self.active_sessions.get(sender_id)
         if session:
             await session.webrtc_manager.add_ice_candidate(data)
+        elif sender_id in self._early_candidates:
+            self._early_candidates[sender_id].append(data)
     # ----------------------------------
 
     async def remove_session(self, session_id):
@@ -69,27 +113,33 @@ class GeminiApp:
         LOGGER.info(f"Removing session {session_id} from active list.")
         if session_id in self.active_sessions:
             del self.active_sessions[session_id]
+            self.admission.release()
         LOGGER.info(f"Current active sessions: {len(self.active_sessions)}")
 
     async def start_call(self, target_id):
-        """Initiates an outbound call to a target user."""
+        """Initiates an outbound call; returns the session it created, or None if this attempt created none."""
         LOGGER.info(f"Attempting to start call to {target_id}.")
 
-        if target_id in self.active_sessions:
+        if target_id in self.active_sessions or self.admission.is_waiting(target_id):
             LOGGER.warning(f"Already in an active session with {target_id}. Cannot start a new call.")
-            return
+            return None
 
-        if len(self.active_sessions) >= MAX_SESSIONS:
-            LOGGER.warning(f"At max capacity ({MAX_SESSIONS} calls). Cannot start a new call.")
-            return
+        if not await self.admission.acquire(target_id):
+            LOGGER.warning(f"No capacity for a new call. Cannot call {target_id}.")
+            return None
 
         LOGGER.info(f"Creating new session for outbound call to {target_id}.")
-        session = create_call_session(
-            remote_user_id=target_id,
-            signaling_client=self.signaling_client,
-            on_cleanup_callback=self.remove_session,
-            llm_name=self.llm_name
-        )
+        try:
+            session = create_call_session(
+                remote_user_id=target_id,
+                signaling_client=self.signaling_client,
+                on_cleanup_callback=self.remove_session,
+                llm_name=self.llm_name
+            )
+        except Exception as e:
+            LOGGER.error(f"Failed to create a session for {target_id}. Error: {e}")
+            self.admission.release()
+            return None
         self.active_sessions[target_id] = session
         
         try:
@@ -98,6 +148,7 @@ class GeminiApp:
         except Exception as e:
             LOGGER.error(f"Failed to initiate call to {target_id}. Error: {e}")
             await session.cleanup()
+        return session
 
     async def hang_up(self, session_id_to_hang_up):
         """Hangs up a specific call by its ID."""
@@ -116,9 +167,47 @@ class GeminiApp:
         for session in all_sessions:
             await session.cleanup()
         await self.signaling_client.disconnect()
+        await self.admission.close()
+        if self.metrics_server:
+            await self.metrics_server.close()
+        await close_loop_lag_monitor()
+        await close_homeassistant_client()
+        await shutdown_live_session_pool()
+        await close_session_handle_store()
+        shutdown_video_encode_pool()
+        shutdown_wakeword_engine()
+
+    def metrics(self):
+        """Loop lag, admission and per-call pipeline latencies, as served at /metrics."""
+        return {
+            "loop_lag": get_loop_lag_monitor().stats(),
+            "admission": self.admission.stats(),
+            "sessions": {
+                session_id: session.llm_client.metrics.stats()
+                for session_id, session in self.active_sessions.items()
+                if getattr(session.llm_client, "metrics", None)
+            },
+        }
+
+    async def start(self):
+        """Starts the process-wide services calls depend on."""
+        # Load the shared wake word engine before the first call arrives
+        await asyncio.to_thread(get_wakeword_engine)
+        get_homeassistant_client().start()
+        self.admission.start()
+        get_loop_lag_monitor().start()
+        if self.metrics_server:
+            await self.metrics_server.start()
+        if LIVE_HANDLE_STORE_ENABLED:
+            # Handles saved by the previous run let returning callers resume their conversation
+            await get_session_handle_store().open()
+        if LIVE_POOL_ENABLED:
+            # Open Live sessions in the background so the first call is answered warm
+            get_live_session_pool().start()
 
     async def run(self):
         try:
+            await self.start()
             # Connect to signaling using the main "reception" ID
             await self.signaling_client.connect(self.main_caller_id)
             await self.cli.loop() # Assuming the CLI now calls hang_up with a specific ID
@@ -1,5 +1,6 @@
 # config.py
 import fractions
+import os
 
 # --- Signaling Server ---
 SIGNALING_SERVER_URL = "http://10.10.10.124:3500"
@@ -11,6 +12,12 @@ GEMINI_API_VERSION = "v1alpha" #"v1beta"
 GEMINI_VOICE = "Puck" # Orus | Kore | Puck | Charon | Fenrir | Aoede | Leda | Zephyr
 GEMINI_LANGUAGE = "en-US" # en-US | en-UK | ko-KR | ta-IN | ja-JP | fr-FR
 MAX_SESSIONS = 3
+LIVE_POOL_ENABLED = True # Keep configured Live sessions open so answering a call skips connect + setup
+LIVE_POOL_MAX_AGE_S = 480 # Recycle warm sessions well before the server's connection lifetime runs out
+LIVE_HANDOVER_DRAIN_S = 10 # After go_away, how long the old connection may keep playing its reply
+LIVE_HANDLE_STORE_ENABLED = True # Keep resumption handles on disk so a restart resumes conversations
+LIVE_HANDLE_STORE_PATH = os.path.join(os.path.dirname(__file__), "../../data/live_handles.db") # Shared by every shard worker
+LIVE_HANDLE_TTL_S = 7200 # Handles stay resumable for 2h after a session ends
 
 # --- Gemini WebRTC Audio ---
 GEMINI_WEBRTC_SAMPLE_RATE = 24000
@@ -19,6 +26,79 @@ CHUNK_DURATION_MS = 20
 WEBRTC_TIME_BASE = fractions.Fraction(1, GEMINI_WEBRTC_SAMPLE_RATE)
 SAMPLES_PER_FRAME = int(GEMINI_WEBRTC_SAMPLE_RATE * 0.02) # 20ms frame
 CHUNK_SIZE_BYTES = int((GEMINI_WEBRTC_SAMPLE_RATE * (CHUNK_DURATION_MS / 1000)) * BYTES_PER_SAMPLE)
+PLAYBACK_BUFFER_SECONDS = 60 # Reply audio buffered ahead of playback before the receiver waits
+JITTER_MIN_MS = 20 # Adaptive jitter buffer target depth bounds
+JITTER_MAX_MS = 400
+JITTER_START_MS = 60
+COMFORT_NOISE_AMPLITUDE = 0 # Peak of the noise played while Gemini is silent (0 = digital silence)
+MEDIA_CLOCK_MAX_LAG_MS = 200 # Output track skips ahead instead of bursting when it falls further behind than this
+
+# --- Wake Word ---
+WAKE_WORD_MODEL = "ok_nabu.onnx"
+WAKE_WORD_ENGINE = "batched"  # pooled | batched | process
+WAKE_WORD_POOL_SIZE = 2  # Shared openwakeword models, loaded once at startup (pooled)
+WAKE_WORD_BATCH_TICK_MS = 20  # How long chunks are collected before one batched inference (batched)
+WAKE_WORD_PROCESS_WORKERS = 2  # Worker processes running inference off the GIL (process)
+
+# --- Uplink Voice Gate ---
+VAD_ENABLED = True  # Drop silent frames instead of streaming them to Gemini
+VAD_ENERGY_THRESHOLD_DB = -50  # dBFS below which a frame is always silence
+VAD_NOISE_MARGIN_DB = 9  # How far above the adaptive noise floor speech must be
+VAD_MAX_ZERO_CROSSING_RATE = 0.35  # Noisier frames need an extra margin
+VAD_PRE_ROLL_MS = 300  # Audio released ahead of speech so onsets are not clipped
+VAD_HANGOVER_MS = 800  # Keep sending after speech so Gemini's VAD sees the pause
+VAD_KEEPALIVE_MS = 1000  # During long silence send one frame this often (0 = never)
+
+# --- Uplink Aggregation ---
+UPLINK_CHUNK_MS = 60  # Audio packed into one Gemini message (trade message rate vs latency)
+UPLINK_MAX_QUEUE = 50  # Messages waiting for the websocket before the oldest is dropped
+
+# --- Video ---
+VIDEO_ENABLED = True # Stream sampled camera frames to Gemini; off = the video track is declined
+VIDEO_SAMPLE_FPS = 1 # Frames sent to Gemini per second
+VIDEO_MAX_SIDE = 768 # Longest side after downscaling, in pixels
+VIDEO_JPEG_QSCALE = 5 # JPEG quantizer: 2 (best) .. 31 (smallest)
+VIDEO_ENCODE_WORKERS = 2 # Threads scaling + encoding sampled frames, shared by every call
+
+# --- Admission Control ---
+ADMISSION_SAMPLE_INTERVAL_S = 0.5 # How often load is sampled
+ADMISSION_MAX_LOOP_LAG_MS = 50 # Event loop running this late means audio deadlines are being missed
+ADMISSION_MAX_LOOP_CPU_PERCENT = 70 # Event-loop thread busy time; past this, lag climbs fast
+ADMISSION_MAX_CPU_PERCENT = 85 # Process CPU, as a share of the cores it may run on
+ADMISSION_MAX_WAKEWORD_BACKLOG = 4 # Wake word chunks waiting for inference
+ADMISSION_MAX_UNDERRUNS_PER_MIN = 30 # Playback underruns across all calls
+ADMISSION_QUEUE_TIMEOUT_S = 10 # A call that cannot be taken rings this long before it is rejected
+ADMISSION_MAX_QUEUED = 3 # Calls waiting for a slot; more are rejected at once
+
+# --- Session Sharding ---
+SHARD_STATS_INTERVAL_S = 1 # How often worker processes report their load to the supervisor
+SHARD_PIN_CPUS = True # Pin each worker process to its own core when there are enough of them
+SHARD_READY_TIMEOUT_S = 120 # Workers load wake word models and open Live sessions before taking calls
+
+# --- Metrics ---
+METRICS_ENABLED = True # Serve per-stage latencies and loop lag as JSON over HTTP
+METRICS_HOST = "127.0.0.1" # Local only
+METRICS_PORT = 9464 # Supervisor mode: the supervisor, with worker N on METRICS_PORT + 1 + N
+LOOP_LAG_INTERVAL_S = 0.05 # How often the loop lag monitor checks in
+
+# --- Home Assistant ---
+HASS_URL = "http://10.10.10.142:8123"
+HASS_LIGHT_ENTITY_ID = "switch.power_monitor_switch_1"
+HASS_TIMEOUT_S = 5 # Per request, so a stuck HA cannot hold a tool call forever
+HASS_MAX_CONNECTIONS = 10 # Keep-alive connection pool size
+HASS_STATE_CACHE_ENABLED = True # Mirror entity states over the websocket API instead of polling REST
+
+# --- Tools ---
+TOOL_TIMEOUT_S = 8 # Default per-tool timeout
+TOOL_CALL_DEADLINE_S = 10 # Whatever has not finished by then is answered with an error
+TOOL_NON_BLOCKING_HOME_ASSISTANT = True # Let Gemini keep talking while Home Assistant calls run
+
+# --- Barge-in ---
+BARGE_IN_ENABLED = True # Cut playback locally when the caller talks over a reply
+BARGE_IN_THRESHOLD_DB = -35 # Stricter than the uplink gate so residual echo does not cut replies
+BARGE_IN_MIN_SPEECH_MS = 120 # Continuous speech needed before cutting
+BARGE_IN_FADE_MS = 40 # Fade-out applied to the reply instead of a hard click
+BARGE_IN_CONFIRM_MS = 1500 # Resume the reply if Gemini has not reported an interruption by then
 
 # --- STUN Servers ---
 ICE_SERVERS = [
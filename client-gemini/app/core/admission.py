@@ -0,0 +1,205 @@
+# app/core/admission.py
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from app.config.constants import (
+    MAX_SESSIONS,
+    ADMISSION_SAMPLE_INTERVAL_S,
+    ADMISSION_MAX_LOOP_LAG_MS,
+    ADMISSION_MAX_LOOP_CPU_PERCENT,
+    ADMISSION_MAX_CPU_PERCENT,
+    ADMISSION_MAX_WAKEWORD_BACKLOG,
+    ADMISSION_MAX_UNDERRUNS_PER_MIN,
+    ADMISSION_QUEUE_TIMEOUT_S,
+    ADMISSION_MAX_QUEUED,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+WINDOW = 4  # samples averaged per signal, so one slow tick does not close the doors
+COST_SIGNALS = ("loop_cpu_percent", "cpu_percent")  # grow with every call, so they are projected
+
+
+class AdmissionController:
+    """
+    Decides whether a new call can be taken, from what the process is doing.
+
+    A sampler task measures event-loop lag (how late its own sleep wakes up),
+    the CPU time of the event-loop thread and of the whole process, the
+    wake-word inference backlog and the playback underrun rate across
+    calls. A call is admitted while there is a free slot (`max_sessions`)
+    and no signal is over its limit, with the CPU signals projected to
+    include one more call at the current per-call cost. Admissions are
+    spaced a sample apart so each new call shows up in the signals before
+    the next is let in. Otherwise the call waits in a FIFO queue for up to
+    `queue_timeout_s` and is rejected if that runs out or the queue is full.
+
+    `sessions()` returns the live CallSessions; `wakeword_stats()` the
+    shared wake-word engine's stats.
+    """
+
+    def __init__(self, sessions, wakeword_stats=None, max_sessions=MAX_SESSIONS,
+                 interval_s=ADMISSION_SAMPLE_INTERVAL_S, max_loop_lag_ms=ADMISSION_MAX_LOOP_LAG_MS,
+                 max_loop_cpu_percent=ADMISSION_MAX_LOOP_CPU_PERCENT, max_cpu_percent=ADMISSION_MAX_CPU_PERCENT,
+                 max_wakeword_backlog=ADMISSION_MAX_WAKEWORD_BACKLOG, max_underruns_per_min=ADMISSION_MAX_UNDERRUNS_PER_MIN,
+                 queue_timeout_s=ADMISSION_QUEUE_TIMEOUT_S, max_queued=ADMISSION_MAX_QUEUED):
+        self.sessions = sessions
+        self.wakeword_stats = wakeword_stats
+        self.max_sessions = max_sessions
+        self.interval_s = interval_s
+        self.limits = {
+            "loop_lag_ms": max_loop_lag_ms,
+            "loop_cpu_percent": max_loop_cpu_percent,
+            "cpu_percent": max_cpu_percent,
+            "wakeword_backlog": max_wakeword_backlog,
+            "underruns_per_min": max_underruns_per_min,
+        }
+        self.queue_timeout_s = queue_timeout_s
+        self.max_queued = max_queued
+
+        self.signals = dict.fromkeys(self.limits, 0.0)
+        self._samples = {name: deque(maxlen=WINDOW) for name in self.limits}
+        self.active = 0
+        self._last_admitted_at = -math.inf
+        self._waiters = OrderedDict()  # call id -> future, oldest first
+        self._task = None
+        self._cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._sample())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for future in self._waiters.values():
+            if not future.done():
+                future.set_result(False)
+        self._waiters.clear()
+
+    def overloaded(self, extra_calls=0):
+        """The signals over their limit with `extra_calls` more calls (empty when there is headroom)."""
+        over = []
+        for name, value in self.signals.items():
+            if name in COST_SIGNALS and self.active:
+                value *= (self.active + extra_calls) / self.active
+            if value > self.limits[name]:
+                over.append(name)
+        return over
+
+    def _can_admit(self):
+        if self.active >= self.max_sessions or self.overloaded(extra_calls=1):
+            return False
+        return asyncio.get_running_loop().time() - self._last_admitted_at >= self.interval_s
+
+    async def acquire(self, call_id):
+        """Takes a call slot, waiting in the queue if needed. Returns False if the call is rejected."""
+        if call_id in self._waiters:
+            return False  # already waiting; the first attempt answers
+        if not self._waiters and self._can_admit():
+            self._take_slot()
+            return True
+        if len(self._waiters) >= self.max_queued or self.queue_timeout_s <= 0:
+            self._reject(call_id)
+            return False
+
+        self.queued += 1
+        LOGGER.info(f"Queueing call {call_id}: {self.active}/{self.max_sessions} calls, "
+                    f"overloaded: {', '.join(self.overloaded(extra_calls=1)) or 'no'}.")
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[call_id] = future
+        try:
+            if await asyncio.wait_for(asyncio.shield(future), self.queue_timeout_s):
+                return True
+            self.rejected += 1  # cancelled: the caller hung up while queued
+            return False
+        except asyncio.TimeoutError:
+            if future.done() and future.result():
+                return True  # admitted in the same tick the timeout fired
+            self._reject(call_id)
+            return False
+        finally:
+            self._waiters.pop(call_id, None)
+
+    def is_waiting(self, call_id):
+        """True while the call is queued for a slot."""
+        return call_id in self._waiters
+
+    def cancel(self, call_id):
+        """Drops a queued call whose caller gave up."""
+        future = self._waiters.pop(call_id, None)
+        if future and not future.done():
+            future.set_result(False)
+
+    def release(self):
+        self.active = max(0, self.active - 1)
+        self._admit_waiting()
+
+    def _take_slot(self):
+        self.active += 1
+        self.admitted += 1
+        self._last_admitted_at = asyncio.get_running_loop().time()
+
+    def _reject(self, call_id):
+        self.rejected += 1
+        LOGGER.warning(f"Rejecting call {call_id}: {self.active}/{self.max_sessions} calls, "
+                       f"overloaded: {', '.join(self.overloaded(extra_calls=1)) or 'no'}.")
+
+    def _admit_waiting(self):
+        while self._waiters and self._can_admit():
+            call_id, future = self._waiters.popitem(last=False)
+            if not future.done():
+                self._take_slot()
+                future.set_result(True)
+
+    def _underruns(self):
+        total = 0
+        for session in self.sessions():
+            playback = getattr(session.llm_client, "playback_buffer", None)
+            total += getattr(playback, "underruns", 0)
+        return total
+
+    async def _sample(self):
+        loop = asyncio.get_running_loop()
+        # thread_time() here is the event-loop thread, since this task runs on it
+        cpu, loop_cpu, wall = time.process_time(), time.thread_time(), loop.time()
+        underruns = self._underruns()
+        while True:
+            await asyncio.sleep(self.interval_s)
+            now, now_cpu, now_loop_cpu = loop.time(), time.process_time(), time.thread_time()
+            now_underruns = self._underruns()
+            elapsed = now - wall
+            sample = {
+                "loop_lag_ms": max(0.0, elapsed - self.interval_s) * 1000,
+                "loop_cpu_percent": 100 * (now_loop_cpu - loop_cpu) / elapsed,
+                "cpu_percent": 100 * (now_cpu - cpu) / elapsed / self._cores,
+                # Ended calls take their counters with them, so the total can go down
+                "underruns_per_min": max(0, now_underruns - underruns) * 60 / elapsed,
+                "wakeword_backlog": self.wakeword_stats()["waiting"] if self.wakeword_stats else 0,
+            }
+            for name, value in sample.items():
+                self._samples[name].append(value)
+                self.signals[name] = sum(self._samples[name]) / len(self._samples[name])
+            cpu, loop_cpu, wall, underruns = now_cpu, now_loop_cpu, now, now_underruns
+            self._admit_waiting()
+
+    def stats(self):
+        return {
+            "active": self.active,
+            "max_sessions": self.max_sessions,
+            "waiting": len(self._waiters),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "overloaded": self.overloaded(),
+            **self.signals,
+        }
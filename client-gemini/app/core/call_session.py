@@ -16,7 +16,7 @@ class CallSession:
 
         # Each session gets its own, isolated managers.
         self.llm_client = llm_client(self.remote_user_id)
-        self.webrtc_manager = WebRTCManager(self.llm_client.audio_playback_queue, llm_track)
+        self.webrtc_manager = WebRTCManager(self.llm_client.playback_buffer, llm_track)
 
         self.cleaned_up = False
         self._wire_components()
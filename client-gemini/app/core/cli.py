@@ -1,6 +1,11 @@
 # app/cli.py
 import asyncio
-from app.config.constants import MAX_SESSIONS 
+from app.config.constants import LIVE_POOL_ENABLED, LIVE_HANDLE_STORE_ENABLED
+from app.wakeword.engine import get_wakeword_engine
+from app.services.homeassistant_api import get_homeassistant_client
+from app.llm.gemini import get_live_session_pool
+from app.llm.handle_store import get_session_handle_store
+from app.metrics.loop_lag import get_loop_lag_monitor
 
 class CLIHandler:
     def __init__(self, app):
@@ -76,13 +81,87 @@ class CLIHandler:
         """Displays the current status of active call sessions."""
         print("\n--- Active Call Status ---")
         active_sessions = self.app.active_sessions
-        
+        admission = self.app.admission.stats()
+        print(f"Total active calls: {admission['active']} / {admission['max_sessions']}, {admission['waiting']} waiting"
+              f"{' (overloaded: ' + ', '.join(admission['overloaded']) + ')' if admission['overloaded'] else ''}")
+
         if not active_sessions:
             print("No active calls.")
         else:
-            print(f"Total active calls: {len(active_sessions)} / {MAX_SESSIONS}")
             for i, session_id in enumerate(active_sessions.keys()):
                 print(f"  {i+1}. Session with Remote User: {session_id}")
+                llm_client = active_sessions[session_id].llm_client
+                if getattr(llm_client, "session_ready_s", None) is not None:
+                    print(f"     Live session ready after {llm_client.session_ready_s * 1000:.0f}ms")
+                handover_gaps = getattr(llm_client, "handover_gaps", None)
+                if handover_gaps and handover_gaps.count:
+                    stats = handover_gaps.stats()
+                    print(f"     Handovers: {stats['count']}, uplink held {stats['mean_ms']:.0f}ms mean, "
+                          f"max {stats['max_ms']:.0f}ms")
+                voice_gate = getattr(llm_client, "voice_gate", None)
+                if voice_gate:
+                    stats = voice_gate.stats()
+                    print(f"     Silence suppressed: {stats['frames_saved']} frames, {stats['bytes_saved'] / 1024:.1f} KiB")
+                playback = getattr(llm_client, "playback_buffer", None)
+                if playback and hasattr(playback, "stats"):
+                    stats = playback.stats()
+                    print(f"     Playback: depth {stats['depth_ms']:.0f}ms (target {stats['target_ms']:.0f}ms), "
+                          f"underruns {stats['underruns']}, overruns {stats['overruns']}")
+                barge_in = getattr(llm_client, "barge_in", None)
+                if barge_in:
+                    stats = barge_in.stats()
+                    print(f"     Barge-in: {stats['cuts']} cuts ({stats['cuts_rolled_back']} rolled back), "
+                          f"silence after {stats['local_ms_mean']:.0f}ms local vs {stats['server_ms_mean']:.0f}ms via Gemini")
+                tool_executor = getattr(llm_client, "tool_executor", None)
+                if tool_executor:
+                    for name, stats in tool_executor.stats().items():
+                        print(f"     Tool {name}: {stats['count']} calls, p50 <={stats['p50_ms']:.0f}ms, "
+                              f"p95 <={stats['p95_ms']:.0f}ms, max {stats['max_ms']:.0f}ms, "
+                              f"timeouts {stats['timeouts']}, errors {stats['errors']}")
+                uplink = getattr(llm_client, "uplink", None)
+                if uplink:
+                    stats = uplink.stats()
+                    print(f"     Uplink: {stats['messages_sent']} msgs, queue {stats['queue_depth']} (max {stats['max_queue_depth']}), "
+                          f"send {stats['send_latency_ms_mean']:.1f}ms, added {stats['added_latency_ms_mean']:.1f}ms")
+                metrics = getattr(llm_client, "metrics", None)
+                if metrics:
+                    stages = ", ".join(f"{stage} {stats['p95_ms']:.3g}" for stage, stats in metrics.stats().items() if stats["count"])
+                    print(f"     Pipeline p95 (ms): {stages or 'no audio yet'}")
+                video_sampler = getattr(llm_client, "video_sampler", None)
+                if video_sampler:
+                    stats = video_sampler.stats()
+                    print(f"     Video: {stats['frames_sent']} of {stats['frames_received']} frames sent "
+                          f"({stats['kib_sent']:.0f} KiB), encode {stats['encode_ms_mean']:.1f}ms")
+
+        stats = get_loop_lag_monitor().stats()
+        print(f"Event loop lag: {stats['last_ms']:.1f}ms now, p50 {stats['p50_ms']:.3g}ms, p95 {stats['p95_ms']:.3g}ms, "
+              f"max {stats['max_ms']:.1f}ms")
+
+        print(f"Admission: {admission['admitted']} admitted, {admission['queued']} queued, {admission['rejected']} rejected; "
+              f"loop lag {admission['loop_lag_ms']:.1f}ms, loop CPU {admission['loop_cpu_percent']:.0f}%, "
+              f"CPU {admission['cpu_percent']:.0f}%, "
+              f"wake word backlog {admission['wakeword_backlog']:.1f}, underruns {admission['underruns_per_min']:.1f}/min")
+
+        if LIVE_POOL_ENABLED:
+            stats = get_live_session_pool().stats()
+            print(f"Warm Live sessions: {stats['idle']} idle, {stats['in_use']} in use, "
+                  f"{stats['hits']} hits / {stats['misses']} misses, {stats['retired']} retired")
+
+        if LIVE_HANDLE_STORE_ENABLED:
+            stats = get_session_handle_store().stats()
+            print(f"Saved Live session handles: {stats['handles']} ({stats['writes']} updates in {stats['flushes']} writes)")
+
+        state_cache = get_homeassistant_client().state_cache
+        if state_cache:
+            stats = state_cache.stats()
+            print(f"Home Assistant cache: {'connected' if stats['connected'] else 'offline'}, {stats['entities']} entities, "
+                  f"hit rate {stats['hit_rate']:.0%}, {stats['deduplicated']} calls deduplicated")
+
+        stats = get_wakeword_engine().stats()
+        print(f"Wake word inferences in flight: {stats['in_flight']} (waiting: {stats['waiting']})")
+        if "latency_ms_mean" in stats:
+            print(f"Wake word round trip: mean {stats['latency_ms_mean']:.1f}ms, "
+                  f"p95 {stats['latency_ms_p95']:.1f}ms, max {stats['latency_ms_max']:.1f}ms")
         
         print("--------------------------")
 
@@ -122,4 +201,47 @@ class CLIHandler:
 
         except (EOFError, KeyboardInterrupt):
             print("\nHangup cancelled.")
-            return
\ No newline at end of file
+            return
+
+class SupervisorCLIHandler(CLIHandler):
+    """The same commands, for a SessionSupervisor spreading calls over worker processes."""
+
+    def show_status(self):
+        """Displays the calls and load of each session worker."""
+        print("\n--- Session Workers ---")
+        stats = self.app.stats()
+        print(f"Total active calls: {stats['calls']}, {stats['routed']} events routed, "
+              f"{stats['unroutable']} without a call, {stats['restarts']} worker restarts")
+        for i, worker in enumerate(stats["workers"]):
+            state = "ready" if worker["ready"] else "starting" if worker["alive"] else "dead"
+            print(f"  Worker {i} (pid {worker['pid']}, {state}): {worker['calls']} calls")
+            admission = worker.get("admission")
+            if admission:
+                print(f"     Admission: {admission['admitted']} admitted, {admission['rejected']} rejected, "
+                      f"{admission['waiting']} waiting; loop lag {admission['loop_lag_ms']:.1f}ms, "
+                      f"loop CPU {admission['loop_cpu_percent']:.0f}%, lag p95 {worker['loop_lag']['p95_ms']:.3g}ms"
+                      f"{' (overloaded: ' + ', '.join(admission['overloaded']) + ')' if admission['overloaded'] else ''}")
+        for remote_id, index in self.app.routes.items():
+            print(f"  Session with Remote User: {remote_id} on worker {index}")
+        print("--------------------------")
+
+    async def handle_hangup(self):
+        """Handles the logic for hanging up a specific session."""
+        self.show_status()
+        if not self.app.routes:
+            print("There are no active calls to hang up.")
+            return
+
+        try:
+            target_id = await asyncio.to_thread(input, "Enter the full Remote User ID to hang up (or press Enter to cancel): ")
+            target_id = target_id.strip()
+
+            if not target_id:
+                print("Hangup cancelled.")
+                return
+
+            await self.app.hang_up(target_id)
+
+        except (EOFError, KeyboardInterrupt):
+            print("\nHangup cancelled.")
+            return
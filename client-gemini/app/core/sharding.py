@@ -0,0 +1,398 @@
+# app/core/sharding.py
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from collections import Counter
+from app.app import GeminiApp
+from app.core.cli import SupervisorCLIHandler
+from app.core.signaling import SignalingClient
+from app.config.constants import (
+    SHARD_STATS_INTERVAL_S,
+    SHARD_PIN_CPUS,
+    SHARD_READY_TIMEOUT_S,
+    METRICS_ENABLED,
+    METRICS_HOST,
+    METRICS_PORT,
+)
+from app.metrics.loop_lag import get_loop_lag_monitor
+from app.metrics.server import MetricsServer
+
+LOGGER = logging.getLogger(__name__)
+
+# Signaling event -> field holding the remote user the event belongs to
+ROUTED_EVENTS = {
+    "newCall": "callerId",
+    "callAnswered": "callee",
+    "ICEcandidate": "sender",
+    "callEnded": "senderId",
+}
+
+
+class WorkerSignalingClient(SignalingClient):
+    """
+    SignalingClient of a worker process. The supervisor owns the socket:
+    emits are forwarded to it, and it hands over the events of the calls
+    this worker hosts through `dispatch`.
+    """
+
+    def __init__(self, index, outbox):
+        self.index = index
+        self.outbox = outbox
+        self.caller_id = ""
+
+        # Callbacks
+        self.on_connect_callback = None
+        self.on_new_call_callback = None
+        self.on_call_answered_callback = None
+        self.on_ice_candidate_callback = None
+        self.on_call_ended_callback = None
+
+    async def connect(self, caller_id):
+        self.caller_id = caller_id
+
+    async def disconnect(self):
+        pass
+
+    async def emit(self, event, data):
+        self.report("emit", event, data)
+
+    def report(self, kind, *args):
+        """Sends a message to the supervisor."""
+        self.outbox.put((kind, self.index, *args))
+
+    async def dispatch(self, event, data):
+        callback = {
+            "newCall": self.on_new_call_callback,
+            "callAnswered": self.on_call_answered_callback,
+            "ICEcandidate": self.on_ice_candidate_callback,
+            "callEnded": self.on_call_ended_callback,
+        }[event]
+        if callback:
+            await callback(data)
+
+
+class ShardApp(GeminiApp):
+    """GeminiApp hosting the calls of one worker process: no socket of its own and no CLI."""
+
+    def __init__(self, signaling_client):
+        super().__init__(signaling_client=signaling_client, metrics_port=METRICS_PORT + 1 + signaling_client.index)
+
+    async def handle_incoming_call(self, data):
+        return await self._hosting(data.get('callerId'), super().handle_incoming_call(data))
+
+    async def start_call(self, target_id):
+        return await self._hosting(target_id, super().start_call(target_id))
+
+    async def _hosting(self, remote_id, attempt):
+        """Runs a call attempt, telling the supervisor to forget the route if it created no session."""
+        # A repeat of a call this worker already hosts or queues must not drop its route
+        owned = remote_id not in self.active_sessions and not self.admission.is_waiting(remote_id)
+        session = None
+        try:
+            session = await attempt
+        finally:
+            if owned and session is None:
+                # Rejected or failed before a session existed
+                self.signaling_client.report("ended", remote_id)
+        return session
+
+    async def remove_session(self, session_id):
+        await super().remove_session(session_id)
+        self.signaling_client.report("ended", session_id)
+
+    def stats(self):
+        return {"active": len(self.active_sessions), "admission": self.admission.stats(),
+                "loop_lag": get_loop_lag_monitor().stats()}
+
+
+def create_shard_app(signaling_client):
+    return ShardApp(signaling_client)
+
+
+def _worker_main(index, host_factory, inbox, outbox, cpu, log_level):
+    """Entry point of a worker process: hosts the calls the supervisor routes to it."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f"%(asctime)s [%(levelname)s] worker-{index} %(name)s: %(message)s",
+        datefmt="%H:%M:%S",
+    )
+    logging.getLogger("app").setLevel(log_level)
+    if cpu is not None:
+        os.sched_setaffinity(0, {cpu})
+    try:
+        asyncio.run(_serve(index, host_factory, inbox, outbox))
+    except KeyboardInterrupt:
+        pass  # the supervisor shuts workers down through their inbox
+
+
+async def _serve(index, host_factory, inbox, outbox):
+    loop = asyncio.get_running_loop()
+    signaling_client = WorkerSignalingClient(index, outbox)
+    host = host_factory(signaling_client)
+    await host.start()
+
+    messages = asyncio.Queue()
+
+    def read_inbox():
+        while (message := inbox.get()) is not None:
+            loop.call_soon_threadsafe(messages.put_nowait, message)
+        loop.call_soon_threadsafe(messages.put_nowait, None)
+
+    threading.Thread(target=read_inbox, name="shard-inbox", daemon=True).start()
+
+    async def report_stats():
+        while True:
+            signaling_client.report("stats", host.stats())
+            await asyncio.sleep(SHARD_STATS_INTERVAL_S)
+
+    stats_task = asyncio.create_task(report_stats())
+    signaling_client.report("ready")
+    tasks = set()
+    try:
+        while (message := await messages.get()) is not None:
+            kind, data = message
+            if kind == "call":
+                handler = host.start_call(data)
+            elif kind == "hangup":
+                handler = host.hang_up(data)
+            else:
+                handler = signaling_client.dispatch(kind, data)
+            # Like socketio's own handlers, each event runs as its own task
+            task = asyncio.create_task(handler)
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    finally:
+        stats_task.cancel()
+        await host.shutdown()
+
+
+class SessionSupervisor:
+    """
+    Spreads calls over worker processes, each hosting its own GeminiApp
+    with its own event loop, wake word engine and Live session pool.
+
+    The supervisor holds the one signaling connection. A `newCall` goes to
+    the least busy worker that is not overloaded, and the call's later
+    `callAnswered`, `ICEcandidate` and `callEnded` events follow it there.
+    A returning caller may land on any worker: Live resumption handles are
+    kept in the database every worker shares (SessionHandleStore), so each
+    of them can resume the caller's conversation.
+    Everything a worker emits is relayed to the socket in order. Workers
+    report when a call ends and send their load every
+    `SHARD_STATS_INTERVAL_S`. A worker that dies has its callers hung up
+    and is restarted.
+    """
+
+    def __init__(self, workers, signaling_client=None, host_factory=create_shard_app,
+                 pin_cpus=SHARD_PIN_CPUS, log_level=logging.INFO):
+        self.main_caller_id = "666666"
+        self.signaling_client = signaling_client or SignalingClient()
+        self.host_factory = host_factory
+        self.log_level = log_level
+        cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+        # One core per worker, when there are enough to go round
+        self._cpus = cpus if pin_cpus and hasattr(os, "sched_setaffinity") and len(cpus) >= workers else None
+
+        self._ctx = multiprocessing.get_context("spawn")
+        self._outbox = self._ctx.Queue()
+        self._inboxes = [None] * workers
+        self._processes = [None] * workers
+        self._ready = [False] * workers
+        self.worker_stats = [{} for _ in range(workers)]
+
+        self.routes = {}  # remote user id -> worker hosting its call
+        self._emits = asyncio.Queue()
+        self._loop = None
+        self._tasks = []
+        self._all_ready = None
+
+        self.routed = 0
+        self.unroutable = 0
+        self.restarts = 0
+
+        self.cli = SupervisorCLIHandler(self)
+        self.metrics_server = MetricsServer(self.stats, METRICS_HOST, METRICS_PORT) if METRICS_ENABLED else None
+        self._wire_signaling()
+
+    def _wire_signaling(self):
+        self.signaling_client.on_connect_callback = lambda: LOGGER.info(f"Connected to signaling. My main ID is: {self.main_caller_id}")
+        self.signaling_client.on_new_call_callback = lambda data: self.route("newCall", data)
+        self.signaling_client.on_call_answered_callback = lambda data: self.route("callAnswered", data)
+        self.signaling_client.on_ice_candidate_callback = lambda data: self.route("ICEcandidate", data)
+        self.signaling_client.on_call_ended_callback = lambda data: self.route("callEnded", data)
+
+    @property
+    def workers(self):
+        return len(self._processes)
+
+    def _spawn(self, index):
+        self._inboxes[index] = self._ctx.Queue()
+        self._ready[index] = False
+        cpu = self._cpus[index] if self._cpus else None
+        # Not daemonic: a worker may start processes of its own (WAKE_WORD_ENGINE="process");
+        # shutdown() joins or terminates it
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(index, self.host_factory, self._inboxes[index], self._outbox, cpu, self.log_level),
+            name=f"session-worker-{index}", daemon=False,
+        )
+        process.start()
+        self._processes[index] = process
+
+    async def start(self):
+        """Starts the workers and waits until every one can take calls."""
+        self._loop = asyncio.get_running_loop()
+        self._all_ready = asyncio.Event()
+        threading.Thread(target=self._read_outbox, name="shard-outbox", daemon=True).start()
+        for index in range(self.workers):
+            self._spawn(index)
+        deadline = self._loop.time() + SHARD_READY_TIMEOUT_S
+        while not self._all_ready.is_set():
+            dead = [index for index, process in enumerate(self._processes) if not process.is_alive()]
+            if dead:
+                raise RuntimeError(f"Session worker(s) {dead} exited during startup.")
+            if self._loop.time() > deadline:
+                raise TimeoutError(f"Session workers not ready after {SHARD_READY_TIMEOUT_S}s.")
+            await asyncio.sleep(0.1)
+        self._tasks = [asyncio.create_task(self._send_emits()), asyncio.create_task(self._watch_workers())]
+        if self.metrics_server:
+            await self.metrics_server.start()
+        LOGGER.info(f"Started {self.workers} session worker process(es).")
+
+    async def run(self):
+        try:
+            await self.start()
+            await self.signaling_client.connect(self.main_caller_id)
+            await self.cli.loop()
+        except Exception as e:
+            LOGGER.error(f"An error occurred in the supervisor: {e}")
+        finally:
+            await self.shutdown()
+
+    def _pick_worker(self):
+        ready = [index for index in range(self.workers) if self._ready[index]]
+        if not ready:
+            return None
+        load = Counter(self.routes.values())
+        overloaded = lambda index: bool(self.worker_stats[index].get("admission", {}).get("overloaded"))
+        return min(ready, key=lambda index: (overloaded(index), load[index]))
+
+    async def route(self, event, data):
+        """Hands a signaling event to the worker hosting its call."""
+        remote_id = data.get(ROUTED_EVENTS[event])
+        if event == "newCall" and remote_id not in self.routes:
+            index = self._pick_worker()
+            if index is None:
+                LOGGER.warning(f"No session worker ready for call from {remote_id}.")
+                await self.signaling_client.send_hangup(remote_id, reason="busy")
+                return
+            self.routes[remote_id] = index
+            LOGGER.info(f"Call from {remote_id} goes to worker {index}.")
+        index = self.routes.get(remote_id)
+        if index is None:
+            self.unroutable += 1
+            LOGGER.debug(f"Dropping {event} for {remote_id}: no worker hosts that call.")
+            return
+        self._inboxes[index].put((event, data))
+        self.routed += 1
+
+    async def start_call(self, target_id):
+        if target_id in self.routes:
+            LOGGER.warning(f"Already in an active session with {target_id}. Cannot start a new call.")
+            return
+        index = self._pick_worker()
+        if index is None:
+            LOGGER.warning(f"No session worker ready. Cannot call {target_id}.")
+            return
+        self.routes[target_id] = index
+        self._inboxes[index].put(("call", target_id))
+
+    async def hang_up(self, remote_id):
+        index = self.routes.get(remote_id)
+        if index is None:
+            LOGGER.warning(f"No active session found with ID {remote_id}.")
+            return
+        self._inboxes[index].put(("hangup", remote_id))
+
+    def _read_outbox(self):
+        while (message := self._outbox.get()) is not None:
+            self._loop.call_soon_threadsafe(self._handle_report, *message)
+
+    def _handle_report(self, kind, index, *args):
+        if kind == "emit":
+            self._emits.put_nowait(args)
+        elif kind == "ended":
+            if self.routes.get(args[0]) == index:
+                del self.routes[args[0]]
+        elif kind == "stats":
+            self.worker_stats[index] = args[0]
+        elif kind == "ready":
+            self._ready[index] = True
+            if all(self._ready):
+                self._all_ready.set()
+
+    async def _send_emits(self):
+        # One sender keeps a call's answer ahead of its ICE candidates
+        while True:
+            event, data = await self._emits.get()
+            try:
+                await self.signaling_client.emit(event, data)
+            except Exception as e:
+                LOGGER.error(f"Failed to relay {event} from a session worker: {e}")
+
+    async def _watch_workers(self):
+        while True:
+            await asyncio.sleep(SHARD_STATS_INTERVAL_S)
+            for index, process in enumerate(self._processes):
+                if process.is_alive():
+                    continue
+                lost = [remote_id for remote_id, owner in self.routes.items() if owner == index]
+                LOGGER.error(f"Session worker {index} exited with code {process.exitcode}; "
+                             f"hanging up {len(lost)} call(s) and restarting it.")
+                for remote_id in lost:
+                    del self.routes[remote_id]
+                    await self.signaling_client.send_hangup(remote_id, reason="error")
+                self.worker_stats[index] = {}
+                self.restarts += 1
+                self._spawn(index)
+
+    def stats(self):
+        return {
+            "workers": [
+                {
+                    "alive": process.is_alive(),
+                    "ready": ready,
+                    "pid": process.pid,
+                    "calls": sum(owner == index for owner in self.routes.values()),
+                    **stats,
+                }
+                for index, (process, ready, stats) in enumerate(zip(self._processes, self._ready, self.worker_stats))
+            ],
+            "calls": len(self.routes),
+            "routed": self.routed,
+            "unroutable": self.unroutable,
+            "restarts": self.restarts,
+        }
+
+    async def shutdown(self):
+        LOGGER.warning("Shutting down session workers...")
+        await self.signaling_client.disconnect()
+        if self.metrics_server:
+            await self.metrics_server.close()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for inbox, process in zip(self._inboxes, self._processes):
+            if process and process.is_alive():
+                inbox.put(None)
+        for process in self._processes:
+            if process:
+                await asyncio.to_thread(process.join, 10)
+                if process.is_alive():
+                    process.terminate()
+                    await asyncio.to_thread(process.join, 1)
+        self._outbox.put(None)
+        LOGGER.info("Session workers stopped.")
@@ -51,14 +51,17 @@ class SignalingClient:
         if self.sio.connected:
             await self.sio.disconnect()
             
+    async def emit(self, event, data):
+        await self.sio.emit(event, data)
+
     async def send_offer(self, callee_id, sdp):
-        await self.sio.emit('call', {'calleeId': callee_id, 'rtcMessage': {'type': sdp.type, 'sdp': sdp.sdp}})
+        await self.emit('call', {'calleeId': callee_id, 'rtcMessage': {'type': sdp.type, 'sdp': sdp.sdp}})
 
     async def send_answer(self, caller_id, sdp):
-        await self.sio.emit('answerCall', {'callerId': caller_id, 'rtcMessage': {'type': sdp.type, 'sdp': sdp.sdp}})
+        await self.emit('answerCall', {'callerId': caller_id, 'rtcMessage': {'type': sdp.type, 'sdp': sdp.sdp}})
         
     async def send_ice_candidate(self, callee_id, candidate):
-        await self.sio.emit('ICEcandidate', {'calleeId': callee_id, 'rtcMessage': {'label': candidate.sdpMLineIndex, 'id': candidate.sdpMid, 'candidate': candidate.candidate}})
+        await self.emit('ICEcandidate', {'calleeId': callee_id, 'rtcMessage': {'label': candidate.sdpMLineIndex, 'id': candidate.sdpMid, 'candidate': candidate.candidate}})
 
-    # async def send_hangup(self, target_id):
-    #     await self.sio.emit('hangupCall', {'targetId': target_id})
\ No newline at end of file
+    async def send_hangup(self, target_id, reason=None):
+        await self.emit('hangupCall', {'targetId': target_id, 'reason': reason})
\ No newline at end of file
@@ -8,16 +8,16 @@ from aiortc import (
     RTCIceCandidate, 
 )
 
-from app.config.constants import ICE_SERVERS
+from app.config.constants import ICE_SERVERS, VIDEO_ENABLED
 
 
 LOGGER = logging.getLogger(__name__)
 
 
 class WebRTCManager:
-    def __init__(self, audio_queue, output_track):
+    def __init__(self, playback_buffer, output_track):
         self.pc = RTCPeerConnection(RTCConfiguration(iceServers=[RTCIceServer(**s) for s in ICE_SERVERS]))
-        self.output_track = output_track(audio_queue)
+        self.output_track = output_track(playback_buffer)
         
         # Callbacks to be set by the Application class
         self.on_ice_candidate_callback = None
@@ -61,6 +61,11 @@ class WebRTCManager:
     async def handle_remote_offer(self, offer_sdp):
         self.pc.addTrack(self.output_track)
         await self.pc.setRemoteDescription(RTCSessionDescription(**offer_sdp))
+        if not VIDEO_ENABLED:
+            # Decline the caller's camera: no video is sent, so none is decoded
+            for transceiver in self.pc.getTransceivers():
+                if transceiver.kind == "video":
+                    transceiver.direction = "inactive"
         answer = await self.pc.createAnswer()
         await self.pc.setLocalDescription(answer)
         if self.on_answer_created_callback:
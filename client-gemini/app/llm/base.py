@@ -1,11 +1,11 @@
 # app/llm/base.py
 from abc import ABC, abstractmethod
-import asyncio
+from app.media.jitter_buffer import AdaptiveJitterBuffer
 
 class BaseLLMManager(ABC):
     def __init__(self):
-        # All LLMs must expose a playback queue
-        self.audio_playback_queue = asyncio.Queue()
+        # All LLMs must expose a playback buffer
+        self.playback_buffer = AdaptiveJitterBuffer()
 
     @abstractmethod
     async def start_session(self, webrtc_track):
@@ -1,41 +1,53 @@
 # app/gemini.py
 import asyncio
+import contextlib
 import os
+import time
 from google import genai
 from google.genai import types
 from aiortc.contrib.media import MediaStreamError
 from av.audio.resampler import AudioResampler
 import numpy as np
-from openwakeword.model import Model
 from app.llm.base import BaseLLMManager
-from app.services.homeassistant_api import turn_on_light, turn_off_light
+from app.llm.live_pool import LiveSessionPool
+from app.llm.handle_store import get_session_handle_store
+from app.media.ring_buffer import PCMRingBuffer
+from app.media.vad import VoiceGate
+from app.media.uplink import UplinkAggregator
+from app.media.barge_in import BargeInDetector
+from app.media.video import VideoFrameSampler
+from app.wakeword.engine import get_wakeword_engine
+from app.tools.builtin import GEMINI_FUNCTION_TOOLS
+from app.tools.executor import ToolExecutor
+from app.metrics.histogram import LatencyHistogram
+from app.metrics.pipeline import PipelineMetrics
 from app.config.constants import (
     GEMINI_SAMPLE_RATE, 
     CONF_CHAT_MODEL, 
-    CHUNK_SIZE_BYTES,
-    CHUNK_DURATION_MS,
     GEMINI_API_VERSION, 
     GEMINI_VOICE, 
     GEMINI_LANGUAGE,
+    VAD_ENABLED,
+    LIVE_POOL_ENABLED,
+    LIVE_HANDOVER_DRAIN_S,
+    LIVE_HANDLE_STORE_ENABLED,
+    VIDEO_ENABLED,
 )
 
 import logging
 
 LOGGER = logging.getLogger(__name__)
 
-turn_on_the_lights = {'name': 'turn_on_the_lights'}
-turn_off_the_lights = {'name': 'turn_off_the_lights'}
-wake_up = {'name': 'good_bye'}
-
-WAKE_WORD_MODEL = "ok_nabu.onnx"
 WAKE_BUFFER = 560    # Multiple of 80 (Optimize accordingly with wakeword length to debounce)
+WAKE_RING_CAPACITY = WAKE_BUFFER * 8  # Larger ring = rarer wrap-around compaction
 WAKE_THRESHOLD = 0.6
 DEBOUNCE_TIME = 2
+GO_AWAY = "go_away"  # a connection's receive loop ended because the server is retiring it
 
 GEMINI_TOOLS = [
     {'google_search': {}}, 
     {"code_execution": {}},
-    {"function_declarations": [turn_on_the_lights, turn_off_the_lights, wake_up]}
+    {"function_declarations": GEMINI_FUNCTION_TOOLS.declarations()}
 ]
 GEMINI_SYSTEM_PROMPT = """
 I. Core Elements
@@ -70,26 +82,104 @@ Conflict Resolution: If search results present conflicting information, acknowle
 Iterative Search: Conduct multiple searches (up to [Number]) per turn, refining your queries based on user feedback.
 """
  
+_GENAI_CLIENT = None
+_LIVE_POOL = None
+
+
+def get_genai_client():
+    """Process-wide genai client, shared by every call and the Live session pool."""
+    global _GENAI_CLIENT
+    if _GENAI_CLIENT is None:
+        _GENAI_CLIENT = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"), http_options={"api_version": GEMINI_API_VERSION})
+    return _GENAI_CLIENT
+
+
+def build_live_config(session_handle=None):
+    return types.LiveConnectConfig(
+        response_modalities=['AUDIO'],
+        context_window_compression=(
+            types.ContextWindowCompressionConfig(
+                sliding_window=types.SlidingWindow(),
+            )
+        ),
+        session_resumption=types.SessionResumptionConfig(
+            handle=session_handle
+        ),
+        speech_config={
+            "voice_config": {"prebuilt_voice_config": {"voice_name": GEMINI_VOICE}},
+            "language_code": GEMINI_LANGUAGE
+        },
+
+        tools=GEMINI_TOOLS,
+        system_instruction=GEMINI_SYSTEM_PROMPT
+    )
+
+
+def get_live_session_pool(client=None):
+    """Process-wide pool of warm, not-yet-resumed Live sessions (started by the app)."""
+    global _LIVE_POOL
+    if _LIVE_POOL is None:
+        client = client or get_genai_client()
+        _LIVE_POOL = LiveSessionPool(
+            lambda: client.aio.live.connect(model=CONF_CHAT_MODEL, config=build_live_config())
+        )
+    return _LIVE_POOL
+
+
+async def shutdown_live_session_pool():
+    global _LIVE_POOL
+    if _LIVE_POOL is not None:
+        await _LIVE_POOL.close()
+        _LIVE_POOL = None
+
+
 class GeminiClientManager(BaseLLMManager):
-    def __init__(self, remote_user_id):
+    def __init__(self, remote_user_id, genai_client=None, live_pool=None, handle_store=None):
         super().__init__()
         self.llm_name = "gemini"
         self.session = None
         self.remote_user_id = remote_user_id
+        self.genai_client = genai_client
+        self.live_pool = live_pool if live_pool is not None else (get_live_session_pool() if LIVE_POOL_ENABLED else None)
+        self.session_ready_s = None  # start_session -> Live session usable, for the latest connection
+        self._ended = False  # set by stop_session so the reconnect loop exits
         self.tasks = []
-        self.audio_playback_queue = asyncio.Queue(maxsize=10)
-        self.raw_audio_to_play_queue = asyncio.Queue(maxsize=200) # increase to prevent interrupt block
-        self.wakeword_model = None
-        self.session_handle = None
-        self.wake_buffer = np.array([], dtype=np.int16)  # buffer for wake word detection
+        self._connections = set()  # open Live connections: the current one plus any still draining
+        self._draining = set()
+        self._connected = asyncio.Event()
+        self._reply_in_progress = False
+        self._handover_started = None
+        self.handover_gaps = LatencyHistogram()  # go_away -> uplink flowing on the resumed connection
+        self.wakeword_engine = None
+        self.wakeword_stream = None  # this call's own openwakeword buffers
+        self.handle_store = handle_store if handle_store is not None else (get_session_handle_store() if LIVE_HANDLE_STORE_ENABLED else None)
+        # A handle saved by any worker, even before a restart, resumes this caller's conversation
+        self.session_handle = None  # looked up when the session starts
+        self.wake_buffer = PCMRingBuffer(WAKE_RING_CAPACITY)  # buffer for wake word detection
         self.last_wake_time = 0
+        self.voice_gate = VoiceGate() if VAD_ENABLED else None  # drops silent uplink frames
+        self.uplink = UplinkAggregator()  # packs uplink frames into fewer, larger messages
+        self.metrics = PipelineMetrics()  # per-stage latencies, from caller frame to Gemini and back
+        self.uplink.metrics = self.playback_buffer.metrics = self.metrics
+        self.barge_in = BargeInDetector(self.playback_buffer)  # cuts replies the caller talks over
+        self.tool_executor = ToolExecutor(GEMINI_FUNCTION_TOOLS, self, self._send_tool_responses)
+        self.video_sampler = None
+        self.video_task = None
 
         self.is_wake = asyncio.Event()
         self.interrupt_enabled = True
 
-    #TODO: Handle video frames
-    async def start_video_processing(self, webrtc_track): 
-        asyncio.create_task(self._drain_track(webrtc_track))
+    async def start_video_processing(self, webrtc_track):
+        if not VIDEO_ENABLED:
+            # The answer declined video so normally nothing arrives, but never let frames pile up
+            self.video_task = asyncio.create_task(self._drain_track(webrtc_track))
+            return
+        self.video_sampler = VideoFrameSampler(self._send_image, should_send=self._wants_video)
+        self.video_task = asyncio.create_task(self.video_sampler.run(webrtc_track))
+
+    def _wants_video(self):
+        # Only while the caller is talking to the assistant and a connection can take it
+        return self.is_wake.is_set() and self.session is not None and not self.uplink.paused
 
     async def _drain_track(self, track):
         LOGGER.info("Skipping webrtc video tracks.")
@@ -105,56 +195,65 @@ class GeminiClientManager(BaseLLMManager):
         LOGGER.info(">>>>>>> Initializing Gemini Live API session <<<<<<<")
         
         try: 
-            self.wakeword_model = Model(wakeword_model_paths=[os.path.join(os.path.dirname(__file__),"../assets/openwakeword", WAKE_WORD_MODEL)])
-            client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"), http_options={"api_version": GEMINI_API_VERSION})
-            while True:
-                gemini_config = types.LiveConnectConfig(
-                    response_modalities=['AUDIO'],
-                    context_window_compression=(
-                        types.ContextWindowCompressionConfig(
-                            sliding_window=types.SlidingWindow(),
-                        )
-                    ),
-                    session_resumption=types.SessionResumptionConfig(
-                        handle=self.session_handle
-                    ),
-                    speech_config={
-                        "voice_config": {"prebuilt_voice_config": {"voice_name": GEMINI_VOICE}},
-                        "language_code": GEMINI_LANGUAGE
-                    },
- 
-                    tools=GEMINI_TOOLS,
-                    system_instruction=GEMINI_SYSTEM_PROMPT
-                )   
+            self.wakeword_engine = get_wakeword_engine()
+            if self.wakeword_stream is None:
+                self.wakeword_stream = self.wakeword_engine.new_stream()
+            client = self.genai_client or get_genai_client()
+            self._ended = False
+            if self.handle_store and self.session_handle is None:
+                # Read when the call starts: another worker may have saved a newer handle for this caller
+                self.session_handle = await self.handle_store.get(self.remote_user_id)
+
+            # Caller audio is read and queued for the whole call, across Live connections;
+            # the uplink holds it whenever there is no connection to send it to
+            self.uplink.pause()
+            self.tasks = [
+                asyncio.create_task(self._send_to_gemini_task(webrtc_track)),
+                asyncio.create_task(self.uplink.run(self._send_audio)),
+            ]
+            while not self._ended:
+                started = time.perf_counter()
+                self.uplink.pause()
+                # Warm sessions are fresh conversations; resuming needs its own connection
+                warm = self.live_pool.acquire() if self.live_pool and not self.session_handle else None
 
                 if self.session_handle:
                     LOGGER.debug("Attempting to resume handle with handle: %s", self.session_handle)
 
+                connection = contextlib.AsyncExitStack()
                 try:
-                    async with client.aio.live.connect(model=CONF_CHAT_MODEL, config=gemini_config) as session:
-                        self.session = session
+                    live = warm or client.aio.live.connect(model=CONF_CHAT_MODEL, config=build_live_config(self.session_handle))
+                    self.session = await connection.enter_async_context(live)
+                    self._connections.add(connection)
+                    self.session_ready_s = time.perf_counter() - started
+                    self._connected.set()
+                    self.uplink.resume()
+
+                    if self._handover_started is not None:
+                        gap = time.perf_counter() - self._handover_started
+                        self._handover_started = None
+                        self.handover_gaps.observe(gap)
+                        LOGGER.info(f"Handed over to a new Live connection, uplink held for {gap * 1000:.0f}ms.")
+                    else:
+                        LOGGER.info(f"Gemini LiveAPI connection established in {self.session_ready_s * 1000:.0f}ms"
+                                    f"{' (prewarmed)' if warm else ''}.")
 
-                        LOGGER.info("Gemini LiveAPI connection established.")
-                        
-                        send_task = asyncio.create_task(self._send_to_gemini_task(webrtc_track))
-                        receive_task = asyncio.create_task(self._receive_from_gemini_task())
-                        playback_task = asyncio.create_task(self._playback_manager_task())
-
-                        self.tasks = [send_task, receive_task, playback_task]
-                        await asyncio.gather(*self.tasks)
-                         
-                except TimeoutError as e:
-                    LOGGER.error("Session timeout: %s", e)
-                    await self.stop_session()
+                    reason = await self._run_connection()
                 except Exception as e:
-                    error_msg = str(e)
-                    if "BidiGenerateContent session not found" in error_msg:
+                    await self._close_connection(connection)
+                    if "BidiGenerateContent session not found" in str(e):
                         LOGGER.warning("Gemini session invalid. Restarting...")
+                        if self.handle_store:
+                            self.handle_store.discard(self.remote_user_id, self.session_handle)
                         self.session_handle = None
-                        await self.stop_session()
-                    else:
-                        LOGGER.error("Fatal Gemini error: %s", e)
-                        raise
+                        continue
+                    LOGGER.error("Fatal Gemini error: %s", e)
+                    raise
+
+                if reason == GO_AWAY and not self._ended:
+                    self._begin_handover(connection)
+                else:
+                    await self._close_connection(connection)
 
         except Exception as e:
             LOGGER.error("Gemini session has ended unexpectedly: %s", e)
@@ -163,68 +262,116 @@ class GeminiClientManager(BaseLLMManager):
             LOGGER.warning("All gemini tasks have ended.")
             await self.stop_session()
 
+    async def _run_connection(self):
+        """Receives on the current connection until it ends; a failing call task ends the session."""
+        receive_task = asyncio.create_task(self._receive_from_gemini_task(self.session))
+        watched = [receive_task, *self.tasks]
+        self.tasks.append(receive_task)
+        try:
+            while not receive_task.done():
+                done, _ = await asyncio.wait(watched, return_when=asyncio.FIRST_COMPLETED)
+                for task in done - {receive_task}:
+                    watched.remove(task)
+                    if not task.cancelled() and task.exception():
+                        raise task.exception()
+            return None if receive_task.cancelled() else receive_task.result()
+        finally:
+            if receive_task in self.tasks:
+                self.tasks.remove(receive_task)
+
+    def _begin_handover(self, connection):
+        """
+        Make-before-break switch after go_away: the old connection finishes the
+        reply it is playing while start_session resumes on a new one. Caller
+        audio is held in the uplink meanwhile and replayed on the new session.
+        """
+        self._handover_started = time.perf_counter()
+        self._connected.clear()
+        task = asyncio.create_task(self._drain_connection(self.session, connection, self._reply_in_progress))
+        self._draining.add(task)
+        task.add_done_callback(self._draining.discard)
+
+    async def _drain_connection(self, session, connection, reply_in_progress):
+        try:
+            if reply_in_progress:
+                await asyncio.wait_for(self._receive_from_gemini_task(session, draining=True), LIVE_HANDOVER_DRAIN_S)
+            # Make before break: hold on to it until its replacement is up
+            await asyncio.wait_for(self._connected.wait(), LIVE_HANDOVER_DRAIN_S)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            LOGGER.debug(f"Retiring Live connection ended early: {e}")
+        finally:
+            await self._close_connection(connection)
+
+    async def _close_connection(self, connection):
+        self._connections.discard(connection)
+        try:
+            await connection.aclose()
+        except Exception as e:
+            LOGGER.debug(f"Error closing Live connection: {e}")
+
     async def stop_session(self):
-        if self.tasks:
-            for task in self.tasks:
+        """Tears the Live session down for good: start_session stops reconnecting too."""
+        self._ended = True
+        tasks = self.tasks + list(self._draining)
+        if self.video_task:
+            tasks.append(self.video_task)
+            self.video_task = None
+        if tasks:
+            for task in tasks:
                 if not task.done():
                     task.cancel()
-            await asyncio.gather(*self.tasks, return_exceptions=True)
+            await asyncio.gather(*tasks, return_exceptions=True)
             self.tasks = []
-        
-        while not self.audio_playback_queue.empty():
-            self.audio_playback_queue.get_nowait()
 
-        if self.session:
-            await self.session.close()
-            self.session = None
+        await self.tool_executor.close()
 
-        LOGGER.warning("Gemini session cleaning up.")
+        self.uplink.clear()
+        self.playback_buffer.clear()
 
-    async def _playback_manager_task(self):
-        """
-        A dedicated, permanent task that pulls raw audio buffers from a queue
-        and then calls the "slow" chunking function. This decouples playback
-        from the main receive loop.
-        """
-        LOGGER.debug("Playback manager started.")
-        try:
-            while True:
-                raw_buffer = await self.raw_audio_to_play_queue.get()
-                await self._play_audio(raw_buffer)
-                self.raw_audio_to_play_queue.task_done()
-        except asyncio.CancelledError:
-            LOGGER.debug("Playback manager cancelled.")
+        for connection in list(self._connections):
+            await self._close_connection(connection)
+        self.session = None
 
-    async def _play_audio(self, full_audio_buffer: bytes):
+        LOGGER.warning("Gemini session cleaning up.")
+
+    async def _receive_from_gemini_task(self, session, draining=False):
         """
-        Put fix-sized audio chunks to the audio playback queue which is then
-        exposed to webrtc to consume. Without sleep, the webrtc audio parser
-        will not process correctly.
+        Plays out one Live connection. Returns GO_AWAY when the server retires
+        it; a `draining` connection (one that already got go_away) only
+        finishes the reply in flight.
         """
-        for i in range(0, len(full_audio_buffer), CHUNK_SIZE_BYTES):
-            chunk = full_audio_buffer[i:i + CHUNK_SIZE_BYTES]
-            if not chunk:
-                continue
-            await self.audio_playback_queue.put(chunk)
-            await asyncio.sleep(CHUNK_DURATION_MS / 1000)
-
-    async def _receive_from_gemini_task(self):
+        last_audio_at = None
         try:
             while True:
-                turn = self.session.receive()
+                turn = session.receive()
                 async for response in turn:
                     if data := response.data:
                         LOGGER.debug(f"[Audio Bytes] [{self.remote_user_id}] {len(data)}")
-                        await self.raw_audio_to_play_queue.put(bytes(data))
+                        if not draining:
+                            self._reply_in_progress = True
+                        received = time.perf_counter()
+                        if last_audio_at is not None:
+                            self.metrics.observe("receive", received - last_audio_at)
+                        last_audio_at = received
+                        await self.playback_buffer.write(data)
+                        self.metrics.observe("playback_enqueue", time.perf_counter() - received)
                     elif text := response.text:
                         LOGGER.debug(f"Gemini: {text}")
                     elif go_away := response.go_away:
-                        raise TimeoutError(f"Gemini session timeout: {go_away.time_left}")
+                        if draining:
+                            continue
+                        LOGGER.info(f"Gemini session go_away ({go_away.time_left}), handing over.")
+                        return GO_AWAY
                     
-                    if response.session_resumption_update:
+                    # Handles from a draining connection predate the session that replaced it
+                    if response.session_resumption_update and not draining:
                         update = response.session_resumption_update
                         if update.resumable and update.new_handle:
                             self.session_handle = update.new_handle
+                            if self.handle_store:
+                                self.handle_store.put(self.remote_user_id, update.new_handle)
 
                     # The model might generate and execute Python code to use Search
                     if response.server_content:
@@ -237,36 +384,29 @@ class GeminiClientManager(BaseLLMManager):
                                         
                         if response.server_content.interrupted is self.interrupt_enabled:
                             LOGGER.debug("VAD Interrupting.")
-                            while not self.raw_audio_to_play_queue.empty():
-                                self.raw_audio_to_play_queue.get_nowait()
-                            while not self.audio_playback_queue.empty():
-                                self.audio_playback_queue.get_nowait()
+                            self.uplink.flush()
+                            self.barge_in.on_interrupted()
+                            last_audio_at = None
+                            if draining:
+                                return None
+                            self._reply_in_progress = False
                                     
                     elif response.tool_call:
-                        function_responses = []
-                        for fc in response.tool_call.function_calls:
-
-                            if fc.name == "turn_on_the_lights":
-                                result = turn_on_light()
-                            elif fc.name == "turn_off_the_lights":
-                                result = turn_off_light()
-                            elif fc.name == "good_bye":
-                                self.is_wake.clear()
-                                result = True
-                                self.last_wake_time = asyncio.get_event_loop().time() # Reset last wake time
-                            else:
-                                result = {"error": f"Unknown function: {fc.name}"}
-
-                            function_response = types.FunctionResponse(
-                                id=fc.id,
-                                name=fc.name,
-                                response={ "result": result}  
-                            )
-                            function_responses.append(function_response)
-
-                        await self.session.send_tool_response(function_responses=function_responses)
+                        if draining:
+                            # Its response could only go to the new session, which never asked
+                            LOGGER.warning("Dropping a tool call from a retiring Live connection.")
+                        else:
+                            # Runs in the background so audio keeps streaming while tools work
+                            self.tool_executor.submit(response.tool_call.function_calls, session)
+                    elif response.tool_call_cancellation and not draining:
+                        self.tool_executor.cancel(response.tool_call_cancellation.ids or [])
 
                     if response.server_content and response.server_content.turn_complete:
+                        await self.playback_buffer.end_turn()
+                        last_audio_at = None
+                        if draining:
+                            return None
+                        self._reply_in_progress = False
                         break
                         
         except asyncio.CancelledError:
@@ -276,33 +416,54 @@ class GeminiClientManager(BaseLLMManager):
             raise
 
 
+    async def _send_tool_responses(self, function_responses, session):
+        if session is not self.session:
+            # Like tool calls from a draining connection: the session now live never asked
+            LOGGER.warning("Dropping tool responses for a Live connection that was handed over.")
+            return
+        await session.send_tool_response(function_responses=function_responses)
+
+    async def _send_image(self, jpeg_bytes):
+        await self.session.send(
+            input={"data": jpeg_bytes, "mime_type": "image/jpeg"}
+        )
+
+    async def _send_audio(self, audio_bytes):
+        await self.session.send(
+            input={"data": audio_bytes, "mime_type": "audio/pcm"}
+        )
+
     async def _send_to_gemini_task(self, track):
         resampler = AudioResampler(format="s16", layout="mono", rate=GEMINI_SAMPLE_RATE)
         
         try:
             while True:
                 frame = await track.recv()
+                started = time.perf_counter()
                 resampled_frames = resampler.resample(frame)
+                self.metrics.observe("resample", time.perf_counter() - started)
 
                 for r_frame in resampled_frames:
-                    audio_np = r_frame.to_ndarray().astype(np.int16).flatten()
+                    audio_np = r_frame.to_ndarray().astype(np.int16, copy=False).reshape(-1)
 
                     if not self.is_wake.is_set():
-                        # Accumulate audio until we have at least 400 samples
-                        self.wake_buffer = np.concatenate((self.wake_buffer, audio_np))
-
-                        while len(self.wake_buffer) >= WAKE_BUFFER:
-                            chunk = self.wake_buffer[:WAKE_BUFFER]
-                            self.wake_buffer = self.wake_buffer[WAKE_BUFFER:]
-
-                            prediction = await asyncio.to_thread(self.wakeword_model.predict, chunk) # self.wakeword_model.predict(chunk)
-                            for mdl, scores in self.wakeword_model.prediction_buffer.items():
+                        # Accumulate audio until we have a full WAKE_BUFFER chunk
+                        self.wake_buffer.write(audio_np)
+
+                        while (chunk := self.wake_buffer.read(WAKE_BUFFER)) is not None:
+                            started = time.perf_counter()
+                            await self.wakeword_engine.predict(self.wakeword_stream, chunk)
+                            self.metrics.observe("wakeword", time.perf_counter() - started)
+                            for mdl, scores in self.wakeword_stream.prediction_buffer.items():
                                 if scores[-1] > WAKE_THRESHOLD:   
                                     LOGGER.info(f"[Wakeword '{mdl}'] detected with score {scores[-1]:.3f}")
-                                    self.wakeword_model.prediction_buffer.clear()
-                                    self.wake_buffer = np.array([], dtype=np.int16)
+                                    self.wakeword_stream.prediction_buffer.clear()
+                                    self.wake_buffer.clear()
                                     current_time = asyncio.get_event_loop().time()
                                     if current_time - self.last_wake_time > DEBOUNCE_TIME:  # Debounce for 2 seconds
+                                        if self.voice_gate:
+                                            self.voice_gate.reset()
+                                        self.barge_in.reset()
                                         self.is_wake.set()
                                         self.last_wake_time = current_time
                                     else:
@@ -312,11 +473,19 @@ class GeminiClientManager(BaseLLMManager):
                             if self.is_wake.is_set():
                                 break
                     else:
-                        # Send raw audio to Gemini once wake word detected
-                        audio_bytes = audio_np.tobytes()
-                        await self.session.send(
-                            input={"data": audio_bytes, "mime_type": "audio/pcm"}
-                        )
+                        if self.interrupt_enabled:
+                            self.barge_in.process(audio_np)
+
+                        # Send raw audio to Gemini once wake word detected, minus the silence
+                        if self.voice_gate:
+                            was_open = self.voice_gate.is_open
+                            for audio_bytes in self.voice_gate.process(audio_np):
+                                self.uplink.add(audio_bytes)
+                            # Flush at speech boundaries and for lone keep-alive frames
+                            if not was_open or not self.voice_gate.is_open:
+                                self.uplink.flush()
+                        else:
+                            self.uplink.add(audio_np)
 
         except MediaStreamError:
             LOGGER.debug("User audio track ended.")
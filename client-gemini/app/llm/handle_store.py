@@ -0,0 +1,179 @@
+# app/llm/handle_store.py
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.config.constants import LIVE_HANDLE_STORE_PATH, LIVE_HANDLE_TTL_S
+
+LOGGER = logging.getLogger(__name__)
+
+_SHARED_STORE = None
+PRUNE_INTERVAL_S = 60
+
+
+class SessionHandleStore:
+    """
+    Durable Live session-resumption handles, one per remote user.
+
+    The database is the only copy: shard workers share the file, and any of
+    them may have saved a caller's latest handle. A new handle only marks
+    the user dirty; a single writer thread saves the latest handle of every
+    dirty user in one transaction, so updates that pile up while it is
+    writing cost one write between them and sqlite never runs on the event
+    loop. Lookups go through the same thread, after this process's pending
+    writes. A save never replaces a newer handle and a discard only deletes
+    the handle it was given, so a worker with an old handle cannot undo
+    another worker's newer one. The table holds at most one row per user
+    and expired rows are deleted as it goes, so it stays small however
+    often handles churn.
+    """
+
+    def __init__(self, path=LIVE_HANDLE_STORE_PATH, ttl_s=LIVE_HANDLE_TTL_S):
+        self.path = path
+        self.ttl_s = ttl_s
+        self._pending = {}   # remote user id -> (handle, expires_at), or (handle, None) to delete that handle
+        self._lock = threading.Lock()
+        self._flush_scheduled = False
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="handle-store")
+        self._db = None  # only ever touched from the writer thread
+        self._pruned_at = 0
+
+        self.handles = 0  # rows in the table as of the last write
+        self.writes = 0
+        self.flushes = 0
+        self.expired = 0
+
+    async def open(self):
+        """Creates the database if needed and drops the handles that expired meanwhile."""
+        await asyncio.get_running_loop().run_in_executor(self._writer, self._open)
+        LOGGER.info(f"Found {self.handles} Live session handles in {self.path}.")
+
+    async def get(self, remote_user_id):
+        """The caller's latest handle saved by any worker, or None."""
+        return await asyncio.get_running_loop().run_in_executor(self._writer, self._read, remote_user_id)
+
+    def put(self, remote_user_id, handle):
+        self._schedule(remote_user_id, (handle, time.time() + self.ttl_s))
+
+    def discard(self, remote_user_id, handle):
+        """Forgets a handle the server no longer accepts, unless it was replaced since."""
+        self._schedule(remote_user_id, (handle, None))
+
+    def _schedule(self, remote_user_id, entry):
+        self.writes += 1
+        with self._lock:
+            self._pending[remote_user_id] = entry
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        self._writer.submit(self._flush)
+
+    async def close(self):
+        """Writes whatever is still pending and closes the database."""
+        await asyncio.get_running_loop().run_in_executor(self._writer, self._close)
+        self._writer.shutdown(wait=True)
+
+    # --- Writer thread ---
+
+    def _connect(self):
+        if self._db is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._db = sqlite3.connect(self.path)
+            # auto_vacuum only takes effect on a new database, before the first table
+            self._db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            self._db.execute("PRAGMA journal_mode = WAL")
+            self._db.execute("PRAGMA synchronous = NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS handles ("
+                             "remote_user_id TEXT PRIMARY KEY, handle TEXT NOT NULL, expires_at REAL NOT NULL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS handles_expires_at ON handles (expires_at)")
+            self._db.commit()
+        return self._db
+
+    def _open(self):
+        db = self._connect()
+        self._prune(db)
+        self._count(db)
+
+    def _read(self, remote_user_id):
+        self._flush()
+        try:
+            row = self._connect().execute("SELECT handle, expires_at FROM handles WHERE remote_user_id = ?",
+                                          (remote_user_id,)).fetchone()
+        except sqlite3.Error as e:
+            LOGGER.error(f"Could not read the Live session handle of {remote_user_id}: {e}")
+            return None
+        if row is None:
+            return None
+        handle, expires_at = row
+        if expires_at < time.time():
+            self.expired += 1
+            return None
+        return handle
+
+    def _flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flush_scheduled = False
+        if not pending:
+            return
+        try:
+            db = self._connect()
+            with db:
+                db.executemany("INSERT INTO handles VALUES (?, ?, ?) ON CONFLICT (remote_user_id) DO UPDATE "
+                               "SET handle = excluded.handle, expires_at = excluded.expires_at "
+                               "WHERE excluded.expires_at > handles.expires_at",
+                               [(user, handle, expires_at) for user, (handle, expires_at) in pending.items()
+                                if expires_at is not None])
+                db.executemany("DELETE FROM handles WHERE remote_user_id = ? AND handle = ?",
+                               [(user, handle) for user, (handle, expires_at) in pending.items()
+                                if expires_at is None])
+            if time.monotonic() - self._pruned_at > PRUNE_INTERVAL_S:
+                self._prune(db)
+            self._count(db)
+            self.flushes += 1
+        except sqlite3.Error as e:
+            LOGGER.error(f"Could not save Live session handles: {e}")
+
+    def _prune(self, db):
+        self._pruned_at = time.monotonic()
+        with db:
+            deleted = db.execute("DELETE FROM handles WHERE expires_at < ?", (time.time(),)).rowcount
+        if deleted:
+            db.execute("PRAGMA incremental_vacuum").fetchall()  # frees one page per step
+
+    def _count(self, db):
+        self.handles = db.execute("SELECT COUNT(*) FROM handles").fetchone()[0]
+
+    def _close(self):
+        self._flush()
+        if self._db is not None:
+            self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._db.close()
+            self._db = None
+
+    def stats(self):
+        return {
+            "handles": self.handles,
+            "writes": self.writes,
+            "flushes": self.flushes,
+            "expired": self.expired,
+        }
+
+
+def get_session_handle_store():
+    """Process-wide handle store; `open()` it once at startup."""
+    global _SHARED_STORE
+    if _SHARED_STORE is None:
+        _SHARED_STORE = SessionHandleStore()
+    return _SHARED_STORE
+
+
+async def close_session_handle_store():
+    global _SHARED_STORE
+    if _SHARED_STORE is not None:
+        await _SHARED_STORE.close()
+        _SHARED_STORE = None
@@ -0,0 +1,183 @@
+# app/llm/live_pool.py
+import asyncio
+import logging
+import time
+from app.config.constants import MAX_SESSIONS, LIVE_POOL_MAX_AGE_S
+
+LOGGER = logging.getLogger(__name__)
+
+RETRY_MAX_S = 30
+
+
+class WarmLiveSession:
+    """
+    A Live API connection opened ahead of time.
+
+    Wraps the SDK's `connect(...)` context manager so a claimed session is
+    used exactly like a fresh one (`async with warm as session`). While idle
+    it is watched so a `go_away` or a dropped connection retires it.
+    """
+
+    def __init__(self, context, on_release=None):
+        self._context = context
+        self._on_release = on_release
+        self.session = None
+        self.opened_at = None
+        self.expired = False
+        self._watcher = None
+
+    async def open(self):
+        self.session = await self._context.__aenter__()
+        self.opened_at = time.monotonic()
+        self._watcher = asyncio.create_task(self._watch())
+
+    async def _watch(self):
+        try:
+            async for response in self.session.receive():
+                if response.go_away:
+                    LOGGER.debug(f"Warm Live session got go_away ({response.go_away.time_left}), retiring it.")
+                    break
+        except asyncio.CancelledError:
+            return
+        except Exception as e:
+            LOGGER.debug(f"Warm Live session dropped: {e}")
+        self.expired = True
+
+    def age(self):
+        return time.monotonic() - self.opened_at
+
+    async def __aenter__(self):
+        await self._stop_watching()
+        return self.session
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            return await self._context.__aexit__(exc_type, exc, tb)
+        finally:
+            if self._on_release:
+                self._on_release()
+
+    async def close(self):
+        await self._stop_watching()
+        try:
+            await self._context.__aexit__(None, None, None)
+        except Exception as e:
+            LOGGER.debug(f"Error closing warm Live session: {e}")
+
+    async def _stop_watching(self):
+        if self._watcher:
+            self._watcher.cancel()
+            await asyncio.gather(self._watcher, return_exceptions=True)
+            self._watcher = None
+
+
+class LiveSessionPool:
+    """
+    Keeps up to `size` configured Live sessions open so a call can start
+    talking to Gemini without paying for TLS, the websocket and setup.
+
+    `connect` returns a new (not yet entered) `client.aio.live.connect(...)`
+    context manager. Sessions claimed by calls count against `size`, so with
+    every call slot busy nothing extra is held open. Idle sessions are
+    replaced when they hit `max_age_s`, get `go_away` or drop.
+    """
+
+    def __init__(self, connect, size=MAX_SESSIONS, max_age_s=LIVE_POOL_MAX_AGE_S):
+        self.connect = connect
+        self.size = size
+        self.max_age_s = max_age_s
+        self._idle = []
+        self._opening = 0
+        self._in_use = 0
+        self._changed = asyncio.Event()
+        self._task = None
+        self._closing = set()
+
+        self.hits = 0
+        self.misses = 0
+        self.retired = 0
+        self.open_failures = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._maintain())
+
+    def acquire(self):
+        """Claims a warm session, or returns None so the caller connects itself."""
+        while self._idle:
+            warm = self._idle.pop()  # freshest first: the most lifetime left
+            if warm.expired or warm.age() > self.max_age_s:
+                self._retire(warm)
+                continue
+            self.hits += 1
+            self._in_use += 1
+            self._changed.set()
+            return warm
+        self.misses += 1
+        return None
+
+    def _release(self):
+        self._in_use -= 1
+        self._changed.set()
+
+    async def _maintain(self):
+        backoff = 1
+        while True:
+            self._changed.clear()
+            for warm in [w for w in self._idle if w.expired or w.age() > self.max_age_s]:
+                self._idle.remove(warm)
+                self._retire(warm)
+
+            missing = self.size - self._in_use - len(self._idle) - self._opening
+            if missing > 0:
+                results = await asyncio.gather(*(self._open_one() for _ in range(missing)))
+                if not all(results):
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, RETRY_MAX_S)
+                    continue
+                backoff = 1
+
+            try:
+                # Wake up on claims/releases, and regularly to check ages and watchers
+                await asyncio.wait_for(self._changed.wait(), timeout=1)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _open_one(self):
+        self._opening += 1
+        warm = WarmLiveSession(self.connect(), on_release=self._release)
+        try:
+            await warm.open()
+            self._idle.append(warm)
+            return True
+        except Exception as e:
+            self.open_failures += 1
+            LOGGER.warning(f"Could not prewarm a Live session: {e}")
+            return False
+        finally:
+            self._opening -= 1
+
+    def _retire(self, warm):
+        self.retired += 1
+        task = asyncio.create_task(warm.close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        idle, self._idle = self._idle, []
+        await asyncio.gather(*(warm.close() for warm in idle), *self._closing, return_exceptions=True)
+
+    def stats(self):
+        return {
+            "idle": len(self._idle),
+            "opening": self._opening,
+            "in_use": self._in_use,
+            "hits": self.hits,
+            "misses": self.misses,
+            "retired": self.retired,
+            "open_failures": self.open_failures,
+        }
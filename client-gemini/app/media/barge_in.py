@@ -0,0 +1,96 @@
+# app/media/barge_in.py
+import logging
+import time
+from collections import deque
+import numpy as np
+from app.media.vad import EnergyVAD
+from app.config.constants import (
+    BARGE_IN_ENABLED,
+    BARGE_IN_THRESHOLD_DB,
+    BARGE_IN_MIN_SPEECH_MS,
+    BARGE_IN_CONFIRM_MS,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+
+class BargeInDetector:
+    """
+    Cuts the reply locally as soon as the caller talks over it, instead of
+    waiting a round trip for Gemini's `interrupted` event.
+
+    Uplink frames are fed to `process` while the call is awake. Once speech
+    has lasted `min_speech_ms` during playback, the playback buffer is asked
+    to fade out and hold. `on_interrupted` (Gemini confirmed) drops the held
+    reply; unconfirmed cuts are resumed by the buffer itself.
+
+    Onset-to-silence latency is recorded for the local cut and for Gemini's
+    event on every barge-in, so both paths can be compared on live calls.
+    With `enabled=False` nothing is cut, but both are still measured.
+    """
+
+    def __init__(self, playback_buffer, vad=None, frame_ms=20, enabled=BARGE_IN_ENABLED,
+                 min_speech_ms=BARGE_IN_MIN_SPEECH_MS, confirm_ms=BARGE_IN_CONFIRM_MS):
+        self.playback_buffer = playback_buffer
+        self.vad = vad or EnergyVAD(threshold_db=BARGE_IN_THRESHOLD_DB)
+        self.enabled = enabled
+        self.min_speech_frames = max(min_speech_ms // frame_ms, 1)
+        self.confirm_ms = confirm_ms
+
+        self._speech_frames = 0
+        self._run_started_at = None
+        self._onset = None  # start of the speech that triggered the latest barge-in
+
+        self.local_latencies = deque(maxlen=100)   # onset -> silence after a local cut, seconds
+        self.server_latencies = deque(maxlen=100)  # onset -> Gemini's interrupted event, seconds
+
+    def process(self, frame):
+        """Feeds one uplink int16 frame. Returns True if it cut the reply."""
+        if not self.vad.is_speech(frame):
+            self._speech_frames = 0
+            return False
+
+        if self._speech_frames == 0:
+            self._run_started_at = time.monotonic()
+        self._speech_frames += 1
+        if self._speech_frames != self.min_speech_frames or not self.playback_buffer.is_playing:
+            return False
+
+        self._onset = self._run_started_at
+        if not self.enabled:
+            return False
+        LOGGER.debug("Barge-in: caller spoke over the reply, cutting playback.")
+        return self.playback_buffer.cut()
+
+    def on_interrupted(self):
+        """Gemini reported the interruption: drop the reply and record latencies."""
+        now = time.monotonic()
+        if self._onset is not None and now - self._onset <= self.confirm_ms / 1000:
+            self.server_latencies.append(now - self._onset)
+            silenced_at = self.playback_buffer.cut_silenced_at
+            if self.playback_buffer.cut_pending:
+                self.local_latencies.append((silenced_at or now) - self._onset)
+        self._onset = None
+        self.playback_buffer.clear()
+
+    def reset(self):
+        self._speech_frames = 0
+        self._onset = None
+
+    def stats(self):
+        def percentiles_ms(values):
+            if not values:
+                return 0.0, 0.0
+            ms = np.asarray(values) * 1000
+            return float(ms.mean()), float(np.percentile(ms, 95))
+
+        local_mean, local_p95 = percentiles_ms(self.local_latencies)
+        server_mean, server_p95 = percentiles_ms(self.server_latencies)
+        return {
+            "cuts": self.playback_buffer.cuts,
+            "cuts_rolled_back": self.playback_buffer.cuts_rolled_back,
+            "local_ms_mean": local_mean,
+            "local_ms_p95": local_p95,
+            "server_ms_mean": server_mean,
+            "server_ms_p95": server_p95,
+        }
@@ -0,0 +1,192 @@
+# app/media/jitter_buffer.py
+import time
+import numpy as np
+from app.media.playback_buffer import PlaybackBuffer
+from app.config.constants import (
+    GEMINI_WEBRTC_SAMPLE_RATE,
+    BYTES_PER_SAMPLE,
+    CHUNK_DURATION_MS,
+    JITTER_MIN_MS,
+    JITTER_MAX_MS,
+    JITTER_START_MS,
+    BARGE_IN_FADE_MS,
+    BARGE_IN_CONFIRM_MS,
+)
+
+BYTES_PER_MS = GEMINI_WEBRTC_SAMPLE_RATE * BYTES_PER_SAMPLE / 1000
+ADAPT_RATE = 0.2          # weight of the latest reply when updating the target depth
+UNDERRUN_STEP_MS = 2 * CHUNK_DURATION_MS
+SAFETY_MARGIN_MS = CHUNK_DURATION_MS
+
+
+class AdaptiveJitterBuffer(PlaybackBuffer):
+    """
+    PlaybackBuffer that never makes the output track wait.
+
+    `read_frame_nowait` returns None (play silence) while the buffer is empty
+    or still pre-buffering. A reply starts playing `target_ms` after its first
+    chunk arrived. The target follows how bursty Gemini's audio is: for every
+    reply we measure how far behind real time chunks arrived compared with the
+    first one, and move the target towards that lateness. A mid-reply underrun
+    bumps the target and re-buffers until `target_ms` of audio is queued.
+
+    `cut` (local barge-in) fades the reply out without consuming it and holds
+    playback; `clear` confirms the cut, and if nobody does within `confirm_ms`
+    the reply resumes from where it was cut.
+    """
+
+    def __init__(self, min_ms=JITTER_MIN_MS, max_ms=JITTER_MAX_MS, start_ms=JITTER_START_MS,
+                 fade_ms=BARGE_IN_FADE_MS, confirm_ms=BARGE_IN_CONFIRM_MS, **kwargs):
+        super().__init__(**kwargs)
+        self.min_ms = min_ms
+        self.max_ms = max_ms
+        self.target_ms = start_ms
+        self.confirm_ms = confirm_ms
+
+        self.underruns = 0
+        self.overruns = 0
+        self.cuts = 0
+        self.cuts_rolled_back = 0
+        self.metrics = None  # the call's PipelineMetrics, if any
+
+        samples_per_frame = self.frame_bytes // BYTES_PER_SAMPLE
+        fade_frames = max(fade_ms // CHUNK_DURATION_MS, 1)
+        self._fade_ramp = np.linspace(1.0, 0.0, fade_frames * samples_per_frame + 1, dtype=np.float32)[1:]
+        self._fade_ramp = self._fade_ramp.reshape(fade_frames, samples_per_frame)
+        self._fade_out = np.empty(samples_per_frame, dtype=np.int16)
+        self._cut_at = None         # monotonic time of a pending cut
+        self._cut_fade_frames = 0
+        self._cut_fade_pos = 0      # bytes of the reply already faded, relative to the read position
+        self.cut_silenced_at = None  # when the pending cut's fade finished
+
+        self._playing = False
+        self._rebuffering = False
+        self._turn_ended = False
+        self._epoch_start = None    # arrival of the first chunk of the current reply
+        self._epoch_media_ms = 0.0  # audio received so far in the current reply
+        self._epoch_lateness_ms = 0.0
+
+    @property
+    def is_playing(self):
+        """True while reply audio is audible (not pre-buffering, not cut)."""
+        return self._playing and self._cut_at is None
+
+    @property
+    def cut_pending(self):
+        return self._cut_at is not None
+
+    @property
+    def depth_ms(self):
+        return len(self) / BYTES_PER_MS
+
+    async def write(self, data):
+        now = time.monotonic()
+        if self._epoch_start is None:
+            self._epoch_start = now
+            self._epoch_media_ms = 0.0
+            self._epoch_lateness_ms = 0.0
+        else:
+            lateness = (now - self._epoch_start) * 1000 - self._epoch_media_ms
+            self._epoch_lateness_ms = max(self._epoch_lateness_ms, lateness)
+        self._epoch_media_ms += len(data) / BYTES_PER_MS
+        self._turn_ended = False
+
+        if len(self) + len(data) > self.capacity:
+            self.overruns += 1
+        await super().write(data)
+
+    async def end_turn(self):
+        # Padding goes straight to the ring so it does not skew the lateness measurement
+        remainder = len(self) % self.frame_bytes
+        if remainder:
+            await super().write(bytes(self.frame_bytes - remainder))
+        self._turn_ended = True
+
+    def read_frame_nowait(self):
+        """Returns the next frame as a memoryview, or None when silence should be played instead."""
+        if self._cut_at is not None:
+            frame = self._fade_frame()
+            if frame is not None or time.monotonic() - self._cut_at < self.confirm_ms / 1000:
+                return frame
+            # Nobody confirmed the barge-in: replay the reply from the cut point
+            self._reset_cut()
+            self.cuts_rolled_back += 1
+
+        if not self._playing:
+            if len(self) < self.frame_bytes:
+                return None
+            if not self._turn_ended:
+                if self._rebuffering:
+                    ready = self.depth_ms >= self.target_ms
+                else:
+                    ready = (time.monotonic() - self._epoch_start) * 1000 >= self.target_ms
+                if not ready:
+                    return None  # still pre-buffering
+            self._playing = True
+            if self.metrics and not self._rebuffering and self._epoch_start is not None:
+                self.metrics.observe("playback_start", time.monotonic() - self._epoch_start)
+            self._rebuffering = False
+
+        if len(self) < self.frame_bytes:
+            self._playing = False
+            if self._turn_ended:
+                self._finish_epoch()
+            else:
+                # Gemini is still talking but fell behind playback
+                self.underruns += 1
+                self.target_ms = min(self.max_ms, self.target_ms + UNDERRUN_STEP_MS)
+                self._rebuffering = True
+            return None
+        return self._take_frame()
+
+    def cut(self):
+        """Starts fading the reply out and holds playback. Returns False if nothing is queued."""
+        if self._cut_at is not None or len(self) < self.frame_bytes:
+            return False
+        self._cut_at = time.monotonic()
+        # Audio that has not been heard yet needs no fade
+        self._cut_fade_frames = len(self._fade_ramp) if self._playing else 0
+        self.cuts += 1
+        return True
+
+    def _fade_frame(self):
+        index = self._cut_fade_pos // self.frame_bytes
+        if index >= self._cut_fade_frames or self._cut_fade_pos + self.frame_bytes > len(self):
+            if self.cut_silenced_at is None:
+                self.cut_silenced_at = time.monotonic()
+            return None
+        start = self._read_pos + self._cut_fade_pos
+        samples = np.frombuffer(self._view[start:start + self.frame_bytes], dtype=np.int16)
+        np.multiply(samples, self._fade_ramp[index], out=self._fade_out, casting="unsafe")
+        self._cut_fade_pos += self.frame_bytes
+        return memoryview(self._fade_out).cast("B")
+
+    def _reset_cut(self):
+        self._cut_at = None
+        self._cut_fade_pos = 0
+        self.cut_silenced_at = None
+
+    def _finish_epoch(self):
+        observed = self._epoch_lateness_ms + SAFETY_MARGIN_MS
+        target = (1 - ADAPT_RATE) * self.target_ms + ADAPT_RATE * observed
+        self.target_ms = min(self.max_ms, max(self.min_ms, target))
+        self._epoch_start = None
+        self._turn_ended = False
+
+    def clear(self):
+        super().clear()
+        self._playing = False
+        self._rebuffering = False
+        self._turn_ended = False
+        self._epoch_start = None
+        self._reset_cut()
+
+    def stats(self):
+        return {
+            "depth_ms": self.depth_ms,
+            "target_ms": self.target_ms,
+            "underruns": self.underruns,
+            "overruns": self.overruns,
+            "cuts": self.cuts,
+            "cuts_rolled_back": self.cuts_rolled_back,
+        }
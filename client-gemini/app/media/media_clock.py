@@ -0,0 +1,52 @@
+# app/media/media_clock.py
+import time
+from app.config.constants import MEDIA_CLOCK_MAX_LAG_MS
+
+
+class MediaClock:
+    """
+    Drift-free pacing for fixed-size audio frames.
+
+    Deadlines are computed in integer nanoseconds from `time.monotonic_ns`
+    as `start + frames * frame_duration`, so rounding never accumulates and
+    wall-clock steps have no effect. The clock starts on the first
+    `wait_time` call, not when the track is built. Falling behind by a few
+    frames is caught up by sending them back to back; a stall longer than
+    `max_lag_ms` skips the clock (and the RTP timestamp) forward instead of
+    bursting a backlog at the receiver.
+    """
+
+    def __init__(self, sample_rate, samples_per_frame, max_lag_ms=MEDIA_CLOCK_MAX_LAG_MS, now_ns=time.monotonic_ns):
+        self.sample_rate = sample_rate
+        self.samples_per_frame = samples_per_frame
+        self.max_lag_ns = max_lag_ms * 1_000_000
+        self._now_ns = now_ns
+        self._start_ns = None
+        self.frames = 0
+        self.skipped_frames = 0
+
+    @property
+    def pts(self):
+        """RTP timestamp (in samples) of the frame about to be sent."""
+        return self.frames * self.samples_per_frame
+
+    def deadline_ns(self, frames):
+        return self._start_ns + frames * self.samples_per_frame * 1_000_000_000 // self.sample_rate
+
+    def wait_time(self):
+        """Seconds to wait before the next frame is due (0 when already late)."""
+        now = self._now_ns()
+        if self._start_ns is None:
+            self._start_ns = now
+
+        lag = now - self.deadline_ns(self.frames)
+        if lag > self.max_lag_ns:
+            # Resync: jump to the frame that is due now
+            behind = lag * self.sample_rate // (self.samples_per_frame * 1_000_000_000)
+            self.frames += behind
+            self.skipped_frames += behind
+            lag = now - self.deadline_ns(self.frames)
+        return max(0, -lag) / 1_000_000_000
+
+    def advance(self):
+        self.frames += 1
@@ -0,0 +1,87 @@
+# app/media/playback_buffer.py
+import asyncio
+from app.config.constants import (
+    CHUNK_SIZE_BYTES,
+    GEMINI_WEBRTC_SAMPLE_RATE,
+    BYTES_PER_SAMPLE,
+    PLAYBACK_BUFFER_SECONDS,
+)
+
+PLAYBACK_BUFFER_BYTES = GEMINI_WEBRTC_SAMPLE_RATE * BYTES_PER_SAMPLE * PLAYBACK_BUFFER_SECONDS
+
+
+class PlaybackBuffer:
+    """
+    Byte ring between the LLM receive task (writer) and the WebRTC output
+    track (reader).
+
+    Replies are appended as they arrive; the track pulls fixed 20ms frames
+    as memoryviews straight out of the ring, so audio is copied once on the
+    way in and once into the outgoing AudioFrame. Pacing is left entirely to
+    the track. A view returned by `read_frame` must be consumed before the
+    next await.
+    """
+
+    def __init__(self, capacity_bytes=PLAYBACK_BUFFER_BYTES, frame_bytes=CHUNK_SIZE_BYTES):
+        self.capacity = capacity_bytes
+        self.frame_bytes = frame_bytes
+        self._buf = bytearray(capacity_bytes)
+        self._view = memoryview(self._buf)
+        self._read_pos = 0
+        self._write_pos = 0
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._writable.set()
+
+    def __len__(self):
+        return self._write_pos - self._read_pos
+
+    async def write(self, data):
+        """Appends audio, waiting for the reader if the ring is full."""
+        view = memoryview(data).cast("B")
+        while view:
+            if len(self) == self.capacity:
+                self._writable.clear()
+                await self._writable.wait()
+                continue
+            if self._write_pos == self.capacity:
+                self._compact()
+            n = min(len(view), self.capacity - self._write_pos)
+            self._view[self._write_pos:self._write_pos + n] = view[:n]
+            self._write_pos += n
+            view = view[n:]
+            if len(self) >= self.frame_bytes:
+                self._readable.set()
+
+    async def end_turn(self):
+        """Called when a reply is complete: pads a trailing partial frame with silence."""
+        remainder = len(self) % self.frame_bytes
+        if remainder:
+            await self.write(bytes(self.frame_bytes - remainder))
+
+    async def read_frame(self):
+        """Returns the next frame as a memoryview, waiting until one is available."""
+        while len(self) < self.frame_bytes:
+            self._readable.clear()
+            await self._readable.wait()
+        return self._take_frame()
+
+    def _take_frame(self):
+        start = self._read_pos
+        self._read_pos += self.frame_bytes
+        if self._read_pos == self._write_pos:
+            self._read_pos = self._write_pos = 0
+        self._writable.set()
+        return self._view[start:start + self.frame_bytes]
+
+    def clear(self):
+        """Drops everything buffered, e.g. when the caller interrupts."""
+        self._read_pos = self._write_pos = 0
+        self._readable.clear()
+        self._writable.set()
+
+    def _compact(self):
+        # Move the unread tail to the front so writes stay contiguous
+        unread = len(self)
+        self._view[:unread] = self._view[self._read_pos:self._write_pos]
+        self._read_pos, self._write_pos = 0, unread
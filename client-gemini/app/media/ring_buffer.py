@@ -0,0 +1,54 @@
+# app/media/ring_buffer.py
+import numpy as np
+
+
+class PCMRingBuffer:
+    """
+    Preallocated, fixed-capacity ring buffer for mono PCM samples.
+
+    Reads hand out numpy views into the backing array instead of copies.
+    Rather than splitting windows at the end of the array, the buffer wraps
+    by moving the (small) unread tail back to the front, so every window is
+    contiguous. A view returned by `read` stays valid until the next `write`.
+    """
+
+    def __init__(self, capacity, dtype=np.int16):
+        if capacity <= 0:
+            raise ValueError("Ring buffer capacity must be positive.")
+        self.capacity = capacity
+        self._buf = np.zeros(capacity, dtype=dtype)
+        self._read_pos = 0
+        self._write_pos = 0
+        self.dropped_samples = 0
+
+    def __len__(self):
+        return self._write_pos - self._read_pos
+
+    def write(self, samples):
+        """Appends samples, discarding the oldest ones if the buffer is full."""
+        n = len(samples)
+        if n > self.capacity:
+            self.dropped_samples += len(self) + n - self.capacity
+            samples = samples[-self.capacity:]
+            n = self.capacity
+            self._read_pos = self._write_pos = 0
+        elif self._write_pos + n > self.capacity:
+            # Wrap: keep only what has not been read yet, dropping the oldest on overflow
+            keep = min(len(self), self.capacity - n)
+            self.dropped_samples += len(self) - keep
+            self._buf[:keep] = self._buf[self._write_pos - keep:self._write_pos]
+            self._read_pos, self._write_pos = 0, keep
+
+        self._buf[self._write_pos:self._write_pos + n] = samples
+        self._write_pos += n
+
+    def read(self, n):
+        """Consumes `n` samples and returns them as a view, or None if not enough are buffered."""
+        if len(self) < n:
+            return None
+        start = self._read_pos
+        self._read_pos += n
+        return self._buf[start:start + n]
+
+    def clear(self):
+        self._read_pos = self._write_pos = 0
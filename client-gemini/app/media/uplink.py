@@ -0,0 +1,118 @@
+# app/media/uplink.py
+import asyncio
+import logging
+import time
+from collections import deque
+from app.config.constants import (
+    GEMINI_SAMPLE_RATE,
+    BYTES_PER_SAMPLE,
+    UPLINK_CHUNK_MS,
+    UPLINK_MAX_QUEUE,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+
+class UplinkAggregator:
+    """
+    Packs 20ms uplink frames into larger Gemini messages.
+
+    PCM is copied into a preallocated buffer of `chunk_ms` worth of audio and
+    queued as one message when it fills up, or earlier on `flush` (speech
+    boundaries, interrupts). A sender task drains the queue so a slow
+    websocket never blocks the resampling loop.
+    """
+
+    def __init__(self, chunk_ms=UPLINK_CHUNK_MS, sample_rate=GEMINI_SAMPLE_RATE, max_queue=UPLINK_MAX_QUEUE):
+        self.chunk_bytes = int(sample_rate * chunk_ms / 1000) * BYTES_PER_SAMPLE
+        self._buf = bytearray(self.chunk_bytes)
+        self._fill = 0
+        self._first_frame_at = None
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.metrics = None  # the call's PipelineMetrics, if any
+        self._open = asyncio.Event()  # cleared while there is no Live session to send to
+        self._open.set()
+
+        self.messages_sent = 0
+        self.bytes_sent = 0
+        self.messages_dropped = 0
+        self.max_queue_depth = 0
+        self.send_latencies = deque(maxlen=500)    # time spent in session.send, seconds
+        self.buffer_latencies = deque(maxlen=500)  # age of a message's first frame when sent, seconds
+
+    def add(self, data):
+        """Buffers one PCM chunk, queueing a message each time the buffer fills."""
+        view = memoryview(data).cast("B")
+        while view:
+            if self._fill == 0:
+                self._first_frame_at = time.perf_counter()
+            n = min(len(view), self.chunk_bytes - self._fill)
+            self._buf[self._fill:self._fill + n] = view[:n]
+            self._fill += n
+            view = view[n:]
+            if self._fill == self.chunk_bytes:
+                self.flush()
+
+    def flush(self):
+        """Queues whatever is buffered as a (possibly short) message."""
+        if not self._fill:
+            return
+        payload = bytes(self._buf[:self._fill])
+        self._fill = 0
+        if self.queue.full():
+            # Gemini is not keeping up: drop the oldest audio rather than grow without bound
+            self.queue.get_nowait()
+            self.messages_dropped += 1
+        self.queue.put_nowait((payload, self._first_frame_at))
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+
+    def clear(self):
+        self._fill = 0
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+    def pause(self):
+        """Holds queued messages (e.g. while the Live session is switched); capture keeps going."""
+        self._open.clear()
+
+    def resume(self):
+        """Sends everything held since `pause`, oldest first."""
+        self._open.set()
+
+    @property
+    def paused(self):
+        return not self._open.is_set()
+
+    async def run(self, send):
+        """Sender task: awaits `send(payload)` for every queued message."""
+        try:
+            while True:
+                payload, first_frame_at = await self.queue.get()
+                await self._open.wait()
+                started = time.perf_counter()
+                await send(payload)
+                finished = time.perf_counter()
+                self.send_latencies.append(finished - started)
+                self.buffer_latencies.append(finished - first_frame_at)
+                if self.metrics:
+                    self.metrics.observe("uplink_buffer", started - first_frame_at)
+                    self.metrics.observe("send", finished - started)
+                self.messages_sent += 1
+                self.bytes_sent += len(payload)
+        except asyncio.CancelledError:
+            LOGGER.debug("Uplink sender cancelled.")
+
+    def stats(self):
+        def mean_ms(values):
+            return 1000 * sum(values) / len(values) if values else 0.0
+
+        return {
+            "messages_sent": self.messages_sent,
+            "bytes_sent": self.bytes_sent,
+            "messages_dropped": self.messages_dropped,
+            "queue_depth": self.queue.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "send_latency_ms_mean": mean_ms(self.send_latencies),
+            "send_latency_ms_max": 1000 * max(self.send_latencies, default=0.0),
+            "added_latency_ms_mean": mean_ms(self.buffer_latencies),
+        }
@@ -0,0 +1,117 @@
+# app/media/vad.py
+from collections import deque
+import numpy as np
+from app.config.constants import (
+    VAD_ENERGY_THRESHOLD_DB,
+    VAD_NOISE_MARGIN_DB,
+    VAD_MAX_ZERO_CROSSING_RATE,
+    VAD_PRE_ROLL_MS,
+    VAD_HANGOVER_MS,
+    VAD_KEEPALIVE_MS,
+)
+
+FULL_SCALE_ENERGY = 32768.0 ** 2
+
+
+class EnergyVAD:
+    """
+    Vectorised energy / zero-crossing voice activity detector for int16 frames.
+
+    A frame is speech when its energy clears both the absolute threshold and an
+    adaptive noise floor. Frames with a very high zero-crossing rate (hiss,
+    fans) need an extra margin to count as speech.
+    """
+
+    def __init__(self, threshold_db=VAD_ENERGY_THRESHOLD_DB, noise_margin_db=VAD_NOISE_MARGIN_DB,
+                 max_zero_crossing_rate=VAD_MAX_ZERO_CROSSING_RATE):
+        self.threshold_db = threshold_db
+        self.noise_margin_db = noise_margin_db
+        self.max_zero_crossing_rate = max_zero_crossing_rate
+        self.noise_floor_db = threshold_db
+
+    def is_speech(self, frame):
+        samples = frame.astype(np.float32)
+        energy = np.dot(samples, samples) / max(len(samples), 1)
+        energy_db = 10 * np.log10(energy / FULL_SCALE_ENERGY + 1e-12)
+        zero_crossing_rate = np.count_nonzero(np.diff(np.signbit(frame))) / max(len(frame) - 1, 1)
+
+        required_db = max(self.threshold_db, self.noise_floor_db + self.noise_margin_db)
+        if zero_crossing_rate > self.max_zero_crossing_rate:
+            required_db += self.noise_margin_db
+        speech = energy_db > required_db
+
+        if not speech:
+            # Follow the background level slowly so a noisy room does not read as speech
+            self.noise_floor_db += 0.05 * (energy_db - self.noise_floor_db)
+        return speech
+
+
+class VoiceGate:
+    """
+    Sits between the uplink resampler and the Gemini send call and drops
+    silent frames.
+
+    The last `pre_roll_ms` of silence is kept and released in front of the
+    first speech frame so word onsets are not clipped. Sending continues for
+    `hangover_ms` after speech so Gemini's own VAD still sees the end of the
+    utterance; during longer silences one frame every `keepalive_ms` is sent.
+    `vad` is any object with an `is_speech(frame) -> bool` method.
+    """
+
+    def __init__(self, vad=None, frame_ms=20, pre_roll_ms=VAD_PRE_ROLL_MS, hangover_ms=VAD_HANGOVER_MS,
+                 keepalive_ms=VAD_KEEPALIVE_MS):
+        self.vad = vad or EnergyVAD()
+        self.hangover_frames = hangover_ms // frame_ms
+        self.keepalive_frames = keepalive_ms // frame_ms if keepalive_ms else 0
+        self.pre_roll = deque(maxlen=max(pre_roll_ms // frame_ms, 1))
+        self._silent_frames = self.hangover_frames  # start closed
+
+        self.frames_in = 0
+        self.frames_sent = 0
+        self.bytes_in = 0
+        self.bytes_sent = 0
+
+    @property
+    def is_open(self):
+        """True while speech (or its hangover) is being passed through."""
+        return self._silent_frames <= self.hangover_frames
+
+    def process(self, frame):
+        """Returns the list of PCM byte chunks to send for this int16 frame (possibly empty)."""
+        data = frame.tobytes()
+        self.frames_in += 1
+        self.bytes_in += len(data)
+
+        if self.vad.is_speech(frame):
+            out = list(self.pre_roll)
+            out.append(data)
+            self.pre_roll.clear()
+            self._silent_frames = 0
+        else:
+            self._silent_frames += 1
+            if self._silent_frames <= self.hangover_frames:
+                out = [data]
+            elif self.keepalive_frames and (self._silent_frames - self.hangover_frames) % self.keepalive_frames == 0:
+                # Older pre-roll frames must not be sent after this one
+                out = [data]
+                self.pre_roll.clear()
+            else:
+                self.pre_roll.append(data)
+                out = []
+
+        self.frames_sent += len(out)
+        self.bytes_sent += sum(len(chunk) for chunk in out)
+        return out
+
+    def reset(self):
+        """Closes the gate and forgets buffered audio, e.g. when the call wakes up."""
+        self.pre_roll.clear()
+        self._silent_frames = self.hangover_frames
+
+    def stats(self):
+        return {
+            "frames_in": self.frames_in,
+            "frames_sent": self.frames_sent,
+            "frames_saved": self.frames_in - self.frames_sent,
+            "bytes_saved": self.bytes_in - self.bytes_sent,
+        }
@@ -0,0 +1,132 @@
+# app/media/video.py
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
+import av
+from aiortc.contrib.media import MediaStreamError
+from app.config.constants import (
+    VIDEO_SAMPLE_FPS,
+    VIDEO_MAX_SIDE,
+    VIDEO_JPEG_QSCALE,
+    VIDEO_ENCODE_WORKERS,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+_ENCODE_POOL = None
+_ENCODERS = threading.local()  # per worker thread: (width, height, qscale) -> mjpeg CodecContext
+
+
+def get_video_encode_pool():
+    """Process-wide threads that downscale and JPEG-encode sampled frames."""
+    global _ENCODE_POOL
+    if _ENCODE_POOL is None:
+        _ENCODE_POOL = ThreadPoolExecutor(max_workers=VIDEO_ENCODE_WORKERS, thread_name_prefix="video-encode")
+    return _ENCODE_POOL
+
+
+def shutdown_video_encode_pool():
+    global _ENCODE_POOL
+    if _ENCODE_POOL is not None:
+        _ENCODE_POOL.shutdown(wait=False, cancel_futures=True)
+        _ENCODE_POOL = None
+
+
+def _scaled_size(width, height, max_side):
+    scale = min(1.0, max_side / max(width, height))
+    # 4:2:0 chroma needs even dimensions
+    return max(2, int(width * scale) & ~1), max(2, int(height * scale) & ~1)
+
+
+def encode_jpeg(frame, max_side=VIDEO_MAX_SIDE, qscale=VIDEO_JPEG_QSCALE):
+    """Downscales a decoded VideoFrame and returns it as JPEG bytes. Runs in a worker thread."""
+    width, height = _scaled_size(frame.width, frame.height, max_side)
+    small = frame.reformat(width=width, height=height, format="yuvj420p")
+
+    encoders = getattr(_ENCODERS, "contexts", None)
+    if encoders is None:
+        encoders = _ENCODERS.contexts = {}
+    key = (width, height, qscale)
+    if (encoder := encoders.get(key)) is None:
+        encoder = av.CodecContext.create("mjpeg", "w")
+        encoder.width, encoder.height = width, height
+        encoder.pix_fmt = "yuvj420p"
+        encoder.time_base = Fraction(1, VIDEO_SAMPLE_FPS or 1)
+        encoder.qmin = encoder.qmax = qscale
+        encoders[key] = encoder
+    small.pts = None
+    return b"".join(bytes(packet) for packet in encoder.encode(small))
+
+
+class VideoFrameSampler:
+    """
+    Turns a remote video track into ~`fps` JPEG images for Gemini.
+
+    aiortc decodes every incoming frame on its own thread whatever we do, so
+    this loop only takes frames off the track and keeps one per interval.
+    Scaling and encoding run in the shared worker pool, never on the event
+    loop, and at most one frame per call is in there at a time: if encoding
+    or sending falls behind, frames are skipped rather than queued.
+    `should_send()` gates sampling (e.g. only while the assistant is awake)
+    so no work is done for frames nobody will see.
+    """
+
+    def __init__(self, send, should_send=None, fps=VIDEO_SAMPLE_FPS, max_side=VIDEO_MAX_SIDE,
+                 qscale=VIDEO_JPEG_QSCALE, executor=None):
+        self.send = send
+        self.should_send = should_send
+        self.interval = 1 / fps
+        self.max_side = max_side
+        self.qscale = qscale
+        self.executor = executor
+
+        self.frames_received = 0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.encode_seconds = 0.0
+
+    async def run(self, track):
+        loop = asyncio.get_running_loop()
+        executor = self.executor or get_video_encode_pool()
+        next_at = 0
+        sending = None
+        try:
+            while True:
+                frame = await track.recv()
+                self.frames_received += 1
+                now = time.monotonic()
+                if now < next_at or (sending and not sending.done()):
+                    continue
+                if self.should_send and not self.should_send():
+                    continue
+                next_at = now + self.interval
+                sending = asyncio.create_task(self._encode_and_send(loop, executor, frame))
+        except MediaStreamError:
+            LOGGER.debug("Video track ended.")
+        except asyncio.CancelledError:
+            LOGGER.debug("Video sampler cancelled.")
+        finally:
+            if sending and not sending.done():
+                sending.cancel()
+
+    async def _encode_and_send(self, loop, executor, frame):
+        started = time.perf_counter()
+        try:
+            jpeg = await loop.run_in_executor(executor, encode_jpeg, frame, self.max_side, self.qscale)
+            self.encode_seconds += time.perf_counter() - started
+            await self.send(jpeg)
+            self.frames_sent += 1
+            self.bytes_sent += len(jpeg)
+        except Exception as e:
+            LOGGER.warning(f"Could not send a video frame: {e}")
+
+    def stats(self):
+        return {
+            "frames_received": self.frames_received,
+            "frames_sent": self.frames_sent,
+            "kib_sent": self.bytes_sent / 1024,
+            "encode_ms_mean": 1000 * self.encode_seconds / self.frames_sent if self.frames_sent else 0.0,
+        }
@@ -0,0 +1,62 @@
+# app/metrics/loop_lag.py
+import asyncio
+import logging
+from app.metrics.histogram import LatencyHistogram
+from app.metrics.pipeline import STAGE_BUCKETS_MS
+from app.config.constants import LOOP_LAG_INTERVAL_S
+
+LOGGER = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag: how much later than asked a short sleep wakes
+    up. Every callback that holds the loop (resampling, Opus, a slow tool)
+    shows up here, and every call's 20ms deadlines slip by as much.
+    """
+
+    def __init__(self, interval_s=LOOP_LAG_INTERVAL_S):
+        self.interval_s = interval_s
+        self.histogram = LatencyHistogram(STAGE_BUCKETS_MS)
+        self.last_ms = 0.0
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            due = loop.time() + self.interval_s
+            await asyncio.sleep(self.interval_s)
+            lag = max(0.0, loop.time() - due)
+            self.last_ms = lag * 1000
+            self.histogram.observe(lag)
+
+    def stats(self):
+        return {"last_ms": self.last_ms, **self.histogram.stats()}
+
+
+_MONITOR = None
+
+
+def get_loop_lag_monitor():
+    """Returns the process-wide loop lag monitor."""
+    global _MONITOR
+    if _MONITOR is None:
+        _MONITOR = LoopLagMonitor()
+    return _MONITOR
+
+
+async def close_loop_lag_monitor():
+    global _MONITOR
+    if _MONITOR is not None:
+        await _MONITOR.close()
+        _MONITOR = None
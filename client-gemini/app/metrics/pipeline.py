@@ -0,0 +1,34 @@
+# app/metrics/pipeline.py
+from app.metrics.histogram import LatencyHistogram
+
+# Audio stages take well under a millisecond, so the buckets start much lower than BUCKETS_MS
+STAGE_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+STAGES = (
+    "resample",          # caller frame -> 16kHz PCM
+    "wakeword",          # wake word inference round trip, per chunk
+    "uplink_buffer",     # first frame of a message buffered -> handed to session.send
+    "send",              # session.send
+    "receive",           # gap between consecutive audio chunks of a Gemini reply
+    "playback_enqueue",  # reply chunk written into the playback buffer
+    "playback_start",    # first chunk of a reply -> its first frame played
+    "frame_emit",        # output frame returned by recv, past its media clock deadline
+)
+
+
+class PipelineMetrics:
+    """
+    Latency histograms for each stage of one call's audio pipeline.
+
+    Every histogram is allocated up front; `observe` is a dict lookup, a
+    bisect and a few additions, cheap enough for every 20ms frame.
+    """
+
+    def __init__(self, stages=STAGES, buckets_ms=STAGE_BUCKETS_MS):
+        self.stages = {stage: LatencyHistogram(buckets_ms) for stage in stages}
+
+    def observe(self, stage, seconds):
+        self.stages[stage].observe(seconds)
+
+    def stats(self):
+        return {stage: histogram.stats() for stage, histogram in self.stages.items()}
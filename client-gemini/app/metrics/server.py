@@ -0,0 +1,42 @@
+# app/metrics/server.py
+import json
+import logging
+from aiohttp import web
+
+LOGGER = logging.getLogger(__name__)
+
+
+class MetricsServer:
+    """
+    Local HTTP endpoint serving `collect()` as JSON at /metrics.
+
+    Binds to localhost by default: it is for dashboards and curl on the
+    box itself, not for the outside world.
+    """
+
+    def __init__(self, collect, host, port):
+        self.collect = collect
+        self.host = host
+        self.port = port
+        self._runner = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        try:
+            await web.TCPSite(self._runner, self.host, self.port).start()
+        except OSError as e:
+            LOGGER.error(f"Metrics endpoint could not listen on {self.host}:{self.port}: {e}")
+            await self.close()
+            return
+        LOGGER.info(f"Metrics at http://{self.host}:{self.port}/metrics")
+
+    async def _handle_metrics(self, request):
+        return web.json_response(self.collect(), dumps=lambda data: json.dumps(data, default=str))
+
+    async def close(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
@@ -7,37 +7,51 @@ from aiortc import (
 )
 from aiortc.contrib.media import MediaStreamError
 from av.audio.frame import AudioFrame
+from app.media.media_clock import MediaClock
 from app.config.constants import (
     GEMINI_WEBRTC_SAMPLE_RATE, 
     SAMPLES_PER_FRAME, 
-    WEBRTC_TIME_BASE
+    WEBRTC_TIME_BASE,
+    COMFORT_NOISE_AMPLITUDE,
 )
 
 class GeminiOutputTrack(AudioStreamTrack):
     kind = "audio"
 
-    def __init__(self, audio_queue):
+    def __init__(self, playback_buffer):
         super().__init__()
-        self.audio_queue = audio_queue
+        self.playback_buffer = playback_buffer
         self.samplerate = GEMINI_WEBRTC_SAMPLE_RATE
         self.samples_per_frame = SAMPLES_PER_FRAME
-        self._start_time = time.time()
-        self._timestamp = 0
+        # Started by the first recv, so setup time is not burst out as catch-up frames
+        self.clock = MediaClock(self.samplerate, self.samples_per_frame)
+        self._silence = np.zeros(self.samples_per_frame, dtype=np.int16)
+        self._rng = np.random.default_rng()
+        self.metrics = getattr(playback_buffer, "metrics", None)
+
+    def _filler_samples(self):
+        """Comfort noise (or silence) played on time while there is no reply audio."""
+        if COMFORT_NOISE_AMPLITUDE:
+            return self._rng.integers(-COMFORT_NOISE_AMPLITUDE, COMFORT_NOISE_AMPLITUDE + 1,
+                                      self.samples_per_frame, dtype=np.int16)
+        return self._silence
 
     async def recv(self):
-        wait_until = self._start_time + (self._timestamp + self.samples_per_frame) / self.samplerate
-        await asyncio.sleep(max(0, wait_until - time.time()))
+        await asyncio.sleep(self.clock.wait_time())
         try:
-            data_bytes = await self.audio_queue.get()
+            # A view into the playback ring: copied into the frame before the next await
+            data = self.playback_buffer.read_frame_nowait()
+            samples = self._filler_samples() if data is None else np.frombuffer(data, dtype=np.int16)
             frame = AudioFrame.from_ndarray(
-                np.frombuffer(data_bytes, dtype=np.int16).reshape(1, -1),
+                samples.reshape(1, -1),
                 format='s16', layout='mono'
             )
-            frame.pts = self._timestamp
+            frame.pts = self.clock.pts
             frame.sample_rate = self.samplerate
             frame.time_base = WEBRTC_TIME_BASE
-            self._timestamp += frame.samples
-            self.audio_queue.task_done()
+            if self.metrics:
+                self.metrics.observe("frame_emit", max(0, time.monotonic_ns() - self.clock.deadline_ns(self.clock.frames)) / 1e9)
+            self.clock.advance()
             return frame
         except asyncio.CancelledError:
             raise MediaStreamError
\ No newline at end of file
@@ -1,27 +1,138 @@
-import requests
+# app/services/homeassistant_api.py
+import asyncio
+import logging
 import os
+import aiohttp
+from app.services.homeassistant_state import HomeAssistantStateCache
+from app.config.constants import (
+    HASS_URL,
+    HASS_LIGHT_ENTITY_ID,
+    HASS_TIMEOUT_S,
+    HASS_MAX_CONNECTIONS,
+    HASS_STATE_CACHE_ENABLED,
+)
 
-def turn_on_light():
-    url = f"http://10.10.10.142:8123/api/services/switch/turn_on"
-    headers = {
-        "Authorization": f"Bearer {os.getenv("HASS_API_KEY")}",
-        "Content-Type": "application/json",
-    } 
-    data = {
-        "entity_id":"switch.power_monitor_switch_1"
-    }
-    response = requests.post(url, headers=headers, json=data)
-    return response.status_code  if response.ok else response.text
- 
-def turn_off_light():
-    url = f"http://10.10.10.142:8123/api/services/switch/turn_off"
-    headers = {
-        "Authorization": f"Bearer {os.getenv("HASS_API_KEY")}",
-        "Content-Type": "application/json",
-    }
-    data = {
-        "entity_id":"switch.power_monitor_switch_1"
-    }
-    response = requests.post(url, headers=headers, json=data)
-    return response.status_code if response.ok else response.text
- 
+LOGGER = logging.getLogger(__name__)
+
+_SHARED_CLIENT = None
+
+
+class HomeAssistantClient:
+    """
+    Async Home Assistant REST client.
+
+    One aiohttp session (and its keep-alive connection pool) is shared by
+    every call, so a tool call costs a request on a warm connection instead
+    of a new TCP handshake, and never blocks the event loop. Every request is
+    bounded by `timeout_s`. Failures are returned as `{"error": ...}` so they
+    can be handed straight back to the model.
+
+    With the state cache on, reads come from memory and service calls that
+    would not change anything (or duplicate one already in flight) are not
+    sent.
+    """
+
+    def __init__(self, base_url=HASS_URL, token=None, timeout_s=HASS_TIMEOUT_S, max_connections=HASS_MAX_CONNECTIONS,
+                 state_cache=HASS_STATE_CACHE_ENABLED):
+        self.base_url = base_url.rstrip("/")
+        self.token = token if token is not None else os.getenv("HASS_API_KEY")
+        self.timeout = aiohttp.ClientTimeout(total=timeout_s)
+        self.max_connections = max_connections
+        self._session = None
+        self._in_flight = {}  # (domain, service, entity_id) -> task shared by identical concurrent calls
+        self.state_cache = HomeAssistantStateCache(self.base_url, self.token, self._get_session) if state_cache else None
+
+    def start(self):
+        """Starts mirroring entity states; call from the running loop."""
+        if self.state_cache:
+            self.state_cache.start()
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                headers={
+                    "Authorization": f"Bearer {self.token}",
+                    "Content-Type": "application/json",
+                },
+                timeout=self.timeout,
+            )
+        return self._session
+
+    async def call_service(self, domain, service, entity_id):
+        """POSTs /api/services/<domain>/<service>; returns the status code, or the error body/reason."""
+        if self.state_cache and self.state_cache.is_redundant(service, entity_id):
+            return f"{entity_id} is already {self.state_cache.states[entity_id]['state']}"
+
+        key = (domain, service, entity_id)
+        if key not in self._in_flight:
+            task = asyncio.create_task(self._post_service(domain, service, entity_id))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        elif self.state_cache:
+            self.state_cache.deduplicated += 1
+        # Shielded so one caller timing out does not cancel the request for the others
+        return await asyncio.shield(self._in_flight[key])
+
+    async def _post_service(self, domain, service, entity_id):
+        url = f"{self.base_url}/api/services/{domain}/{service}"
+        try:
+            async with self._get_session().post(url, json={"entity_id": entity_id}) as response:
+                if response.ok:
+                    return response.status
+                return await response.text()
+        except asyncio.TimeoutError:
+            LOGGER.warning(f"Home Assistant {domain}.{service} timed out after {self.timeout.total}s")
+            return {"error": f"Home Assistant did not answer within {self.timeout.total}s"}
+        except aiohttp.ClientError as e:
+            LOGGER.warning(f"Home Assistant {domain}.{service} failed: {e}")
+            return {"error": f"Home Assistant request failed: {e}"}
+
+    async def get_state(self, entity_id):
+        """Entity state object from the cache, or from GET /api/states/<entity_id> on a miss."""
+        if self.state_cache and (state := self.state_cache.get(entity_id)) is not None:
+            return state
+        try:
+            async with self._get_session().get(f"{self.base_url}/api/states/{entity_id}") as response:
+                if response.ok:
+                    return await response.json()
+                return {"error": await response.text()}
+        except asyncio.TimeoutError:
+            return {"error": f"Home Assistant did not answer within {self.timeout.total}s"}
+        except aiohttp.ClientError as e:
+            return {"error": f"Home Assistant request failed: {e}"}
+
+    async def close(self):
+        if self.state_cache:
+            await self.state_cache.close()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+def get_homeassistant_client():
+    """Returns the process-wide client; its session is created on the running loop at first use."""
+    global _SHARED_CLIENT
+    if _SHARED_CLIENT is None:
+        _SHARED_CLIENT = HomeAssistantClient()
+    return _SHARED_CLIENT
+
+
+async def close_homeassistant_client():
+    global _SHARED_CLIENT
+    if _SHARED_CLIENT is not None:
+        await _SHARED_CLIENT.close()
+        _SHARED_CLIENT = None
+
+
+async def turn_on_light():
+    return await get_homeassistant_client().call_service("switch", "turn_on", HASS_LIGHT_ENTITY_ID)
+
+
+async def turn_off_light():
+    return await get_homeassistant_client().call_service("switch", "turn_off", HASS_LIGHT_ENTITY_ID)
+
+
+async def get_light_state():
+    state = await get_homeassistant_client().get_state(HASS_LIGHT_ENTITY_ID)
+    return state.get("state", state)
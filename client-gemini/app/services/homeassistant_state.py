@@ -0,0 +1,150 @@
+# app/services/homeassistant_state.py
+import asyncio
+import logging
+import aiohttp
+
+LOGGER = logging.getLogger(__name__)
+
+RECONNECT_MAX_S = 30
+STATE_CHANGED_SUBSCRIPTION_ID = 1
+GET_STATES_ID = 2
+
+# Service calls that are no-ops when the entity is already in the resulting state
+SERVICE_TARGET_STATE = {"turn_on": "on", "turn_off": "off"}
+
+
+class HomeAssistantStateCache:
+    """
+    In-memory index of Home Assistant entity states.
+
+    Subscribes once to `state_changed` over HA's websocket API, then loads a
+    `get_states` snapshot, and applies every event after that, so reads cost
+    a dict lookup instead of a REST round trip. Reconnects with backoff and
+    reloads the snapshot after any disconnect; while disconnected `get` is
+    a miss and callers fall back to REST.
+    """
+
+    def __init__(self, base_url, token, get_session):
+        self.ws_url = base_url.replace("http", "ws", 1) + "/api/websocket"
+        self.token = token
+        self._get_session = get_session
+        self.states = {}
+        self.ready = asyncio.Event()
+        self._early_events = {}  # entity_id -> state_changed data received before this connection's snapshot
+        self._task = None
+
+        self.hits = 0
+        self.misses = 0
+        self.deduplicated = 0
+        self.events = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def get(self, entity_id):
+        """Cached state object for `entity_id`, or None on a miss."""
+        state = self.states.get(entity_id) if self.ready.is_set() else None
+        if state is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return state
+
+    def is_redundant(self, service, entity_id):
+        """True if `service` would leave `entity_id` in the state it is already in."""
+        target = SERVICE_TARGET_STATE.get(service)
+        if target is None:
+            return False
+        state = self.get(entity_id)
+        if state is None or state.get("state") != target:
+            return False
+        self.deduplicated += 1
+        return True
+
+    async def run(self):
+        backoff = 1
+        while True:
+            try:
+                await self._listen()
+                backoff = 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                LOGGER.warning(f"Home Assistant websocket error: {e}")
+            self.ready.clear()
+            LOGGER.info(f"Home Assistant state cache reconnecting in {backoff}s.")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, RECONNECT_MAX_S)
+
+    async def _listen(self):
+        self._early_events = {}
+        async with self._get_session().ws_connect(self.ws_url, heartbeat=30) as ws:
+            await ws.receive_json()  # auth_required
+            await ws.send_json({"type": "auth", "access_token": self.token})
+            reply = await ws.receive_json()
+            if reply.get("type") != "auth_ok":
+                raise RuntimeError(f"authentication failed: {reply.get('message', reply.get('type'))}")
+
+            # Subscribe before the snapshot so no change can fall between the two
+            await ws.send_json({"id": STATE_CHANGED_SUBSCRIPTION_ID, "type": "subscribe_events",
+                                "event_type": "state_changed"})
+            await ws.send_json({"id": GET_STATES_ID, "type": "get_states"})
+
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    break
+                data = msg.json()
+                if data.get("type") == "event":
+                    self._apply_event(data["event"])
+                elif data.get("type") == "result" and data.get("id") == GET_STATES_ID:
+                    self._apply_snapshot(data.get("result") or [])
+
+    def _apply_snapshot(self, states):
+        # Rebuilt, not merged: entities removed while disconnected must go too
+        snapshot = {state["entity_id"]: state for state in states}
+        # An event received before the snapshot may already be newer
+        for entity_id, data in self._early_events.items():
+            current = snapshot.get(entity_id)
+            new_state, old_state = data.get("new_state"), data.get("old_state") or {}
+            if new_state is not None:
+                if current is None or new_state.get("last_updated", "") > current.get("last_updated", ""):
+                    snapshot[entity_id] = new_state
+            elif current is not None and current.get("last_updated", "") <= old_state.get("last_updated", ""):
+                del snapshot[entity_id]  # removed after the snapshot was taken
+        self.states = snapshot
+        self._early_events = {}
+        self.ready.set()
+        LOGGER.info(f"Home Assistant state cache loaded {len(self.states)} entities.")
+
+    def _apply_event(self, event):
+        if event.get("event_type") != "state_changed":
+            return
+        data = event.get("data", {})
+        self.events += 1
+        if not self.ready.is_set():
+            self._early_events[data.get("entity_id")] = data
+            return
+        new_state = data.get("new_state")
+        if new_state is None:
+            self.states.pop(data.get("entity_id"), None)  # entity removed
+        else:
+            self.states[data["entity_id"]] = new_state
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "connected": self.ready.is_set(),
+            "entities": len(self.states),
+            "events": self.events,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "deduplicated": self.deduplicated,
+        }
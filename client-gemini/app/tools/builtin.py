@@ -0,0 +1,34 @@
+# app/tools/builtin.py
+import asyncio
+from app.tools.registry import ToolRegistry
+from app.services.homeassistant_api import turn_on_light, turn_off_light, get_light_state
+from app.config.constants import HASS_TIMEOUT_S, TOOL_NON_BLOCKING_HOME_ASSISTANT
+
+GEMINI_FUNCTION_TOOLS = ToolRegistry()
+
+
+@GEMINI_FUNCTION_TOOLS.register("turn_on_the_lights", timeout_s=HASS_TIMEOUT_S + 1,
+                                non_blocking=TOOL_NON_BLOCKING_HOME_ASSISTANT)
+async def turn_on_the_lights(manager):
+    return await turn_on_light()
+
+
+@GEMINI_FUNCTION_TOOLS.register("turn_off_the_lights", timeout_s=HASS_TIMEOUT_S + 1,
+                                non_blocking=TOOL_NON_BLOCKING_HOME_ASSISTANT)
+async def turn_off_the_lights(manager):
+    return await turn_off_light()
+
+
+@GEMINI_FUNCTION_TOOLS.register("get_the_lights_state", timeout_s=HASS_TIMEOUT_S + 1)
+async def get_the_lights_state(manager):
+    # Answered from the state cache when it is connected
+    return await get_light_state()
+
+
+@GEMINI_FUNCTION_TOOLS.register("good_bye", timeout_s=1)
+async def good_bye(manager):
+    # Back to sleep mode: uplink stops until the wake word is heard again
+    manager.is_wake.clear()
+    manager.uplink.flush()
+    manager.last_wake_time = asyncio.get_event_loop().time() # Reset last wake time
+    return True
@@ -0,0 +1,147 @@
+# app/tools/executor.py
+import asyncio
+import logging
+import time
+from google.genai import types
+from app.metrics.histogram import LatencyHistogram
+from app.config.constants import TOOL_CALL_DEADLINE_S
+
+LOGGER = logging.getLogger(__name__)
+
+
+class ToolExecutor:
+    """
+    Runs the model's function calls off the receive loop.
+
+    `submit` returns immediately, so audio keeps flowing while tools run.
+    Blocking calls from one tool_call message run concurrently, each under
+    its tool's timeout, and are answered together; whatever has not
+    finished by `deadline_s` is cancelled and answered with an error, so
+    the model always gets a (partial) response. Non-blocking tools answer
+    on their own as soon as they finish, with the tool's scheduling.
+    Responses go back with the `origin` the calls were submitted with, so
+    they can be sent to the connection that issued them.
+    """
+
+    def __init__(self, registry, context, send_responses, deadline_s=TOOL_CALL_DEADLINE_S):
+        self.registry = registry
+        self.context = context
+        self.send_responses = send_responses  # async callable taking a list of FunctionResponse and the origin
+        self.deadline_s = deadline_s
+        self._calls = {}     # function call id -> running invocation
+        self._batches = set()
+        self.histograms = {}
+        self.timeouts = {}
+        self.errors = {}
+
+    def submit(self, function_calls, origin=None):
+        blocking = []
+        for fc in function_calls:
+            tool = self.registry.get(fc.name)
+            if tool and tool.non_blocking:
+                self._spawn(self._run_non_blocking(fc, tool, origin))
+            else:
+                blocking.append(fc)
+        if blocking:
+            self._spawn(self._run_blocking(blocking, origin))
+
+    def cancel(self, ids):
+        """Handles Gemini's tool_call_cancellation: no response is sent for these calls."""
+        for call_id in ids:
+            task = self._calls.pop(call_id, None)
+            if task:
+                LOGGER.debug(f"Tool call {call_id} cancelled by the model.")
+                task.cancel()
+
+    async def close(self):
+        tasks = list(self._batches) + list(self._calls.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._calls.clear()
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _run_blocking(self, function_calls, origin):
+        tasks = [self._start_call(fc) for fc in function_calls]
+        await asyncio.wait(tasks, timeout=self.deadline_s)
+
+        responses = []
+        for fc, task in zip(function_calls, tasks):
+            if self._calls.pop(fc.id, None) is None:
+                continue  # cancelled by the model
+            if task.done():
+                responses.append(task.result())
+            else:
+                task.cancel()
+                self._count(self.timeouts, fc.name)
+                LOGGER.warning(f"Tool call {fc.name} missed the {self.deadline_s}s deadline.")
+                responses.append(self._response(fc, {"error": f"{fc.name} did not finish within {self.deadline_s}s"}))
+        if responses:
+            await self._send(responses, origin)
+
+    async def _run_non_blocking(self, fc, tool, origin):
+        task = self._start_call(fc)
+        try:
+            response = await task
+        except asyncio.CancelledError:
+            if self._calls.pop(fc.id, None) is None:
+                return  # cancelled by the model
+            raise
+        self._calls.pop(fc.id, None)
+        response.scheduling = tool.scheduling
+        await self._send([response], origin)
+
+    def _start_call(self, fc):
+        task = asyncio.create_task(self._invoke(fc))
+        self._calls[fc.id] = task
+        return task
+
+    async def _invoke(self, fc):
+        tool = self.registry.get(fc.name)
+        if tool is None:
+            return self._response(fc, {"error": f"Unknown function: {fc.name}"})
+
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(tool.handler(self.context, **(fc.args or {})), tool.timeout_s)
+            payload = {"result": result}
+        except asyncio.TimeoutError:
+            self._count(self.timeouts, fc.name)
+            LOGGER.warning(f"Tool {fc.name} timed out after {tool.timeout_s}s.")
+            payload = {"error": f"{fc.name} timed out after {tool.timeout_s}s"}
+        except Exception as e:
+            self._count(self.errors, fc.name)
+            LOGGER.error(f"Tool {fc.name} failed: {e}")
+            payload = {"error": f"{fc.name} failed: {e}"}
+        self.histograms.setdefault(fc.name, LatencyHistogram()).observe(time.perf_counter() - started)
+        return self._response(fc, payload)
+
+    async def _send(self, responses, origin):
+        try:
+            await self.send_responses(responses, origin)
+        except Exception as e:
+            LOGGER.error(f"Could not send tool responses: {e}")
+
+    @staticmethod
+    def _response(fc, payload):
+        return types.FunctionResponse(id=fc.id, name=fc.name, response=payload)
+
+    @staticmethod
+    def _count(counter, name):
+        counter[name] = counter.get(name, 0) + 1
+
+    def stats(self):
+        """Per-tool latency histogram plus timeout and error counts."""
+        names = set(self.histograms) | set(self.timeouts) | set(self.errors)
+        return {
+            name: {
+                **(self.histograms[name].stats() if name in self.histograms else LatencyHistogram().stats()),
+                "timeouts": self.timeouts.get(name, 0),
+                "errors": self.errors.get(name, 0),
+            }
+            for name in sorted(names)
+        }
@@ -0,0 +1,48 @@
+# app/tools/registry.py
+from google.genai import types
+from app.config.constants import TOOL_TIMEOUT_S
+
+
+class Tool:
+    def __init__(self, name, handler, timeout_s=TOOL_TIMEOUT_S, non_blocking=False,
+                 scheduling=types.FunctionResponseScheduling.WHEN_IDLE):
+        self.name = name
+        self.handler = handler
+        self.timeout_s = timeout_s
+        self.non_blocking = non_blocking
+        self.scheduling = scheduling  # how Gemini should deliver a non-blocking result
+
+    def declaration(self):
+        declaration = {"name": self.name}
+        if self.non_blocking:
+            declaration["behavior"] = "NON_BLOCKING"
+        return declaration
+
+
+class ToolRegistry:
+    """
+    Function tools exposed to the model, by name.
+
+    Handlers are coroutines called as `handler(context, **args)`, where the
+    context is whatever the executor was built with (the LLM manager).
+    """
+
+    def __init__(self):
+        self._tools = {}
+
+    def register(self, name, timeout_s=TOOL_TIMEOUT_S, non_blocking=False, **kwargs):
+        """Decorator registering an async handler under `name`."""
+        def decorator(handler):
+            self._tools[name] = Tool(name, handler, timeout_s=timeout_s, non_blocking=non_blocking, **kwargs)
+            return handler
+        return decorator
+
+    def get(self, name):
+        return self._tools.get(name)
+
+    def names(self):
+        return list(self._tools)
+
+    def declarations(self):
+        """Entries for the `function_declarations` tool of the Live config."""
+        return [tool.declaration() for tool in self._tools.values()]
@@ -0,0 +1,192 @@
+# app/wakeword/batcher.py
+import asyncio
+import logging
+from collections import defaultdict
+import numpy as np
+from app.config.constants import WAKE_WORD_BATCH_TICK_MS
+from app.wakeword.pool import WAKE_WORD_MODEL_PATH, WakeWordStream, load_model
+
+LOGGER = logging.getLogger(__name__)
+
+FEATURE_STEP = 1280          # openwakeword computes features every 80ms of audio
+MELSPEC_CONTEXT = 160 * 3    # extra samples fed to the melspectrogram for window overlap
+MELSPEC_WINDOW = 76          # melspectrogram frames per embedding
+MELSPEC_MAX_LEN = 10 * 97
+FEATURE_MAX_LEN = 120
+WARMUP_PREDICTIONS = 5       # openwakeword zeroes the first predictions of a stream
+
+
+class BatchedWakeWordEngine:
+    """
+    Central wake-word scheduler shared by every sleeping call.
+
+    Sessions submit their WAKE_BUFFER chunks with `predict`; every tick the
+    pending chunks of all sessions are scored together: one batched
+    melspectrogram run, one batched embedding run and the (batch-size 1)
+    classifier per stream, all in a single thread-pool hop. Streaming maths
+    follows openwakeword's AudioFeatures so scores match Model.predict.
+    """
+
+    def __init__(self, model_path=WAKE_WORD_MODEL_PATH, tick_ms=WAKE_WORD_BATCH_TICK_MS):
+        self.tick = tick_ms / 1000
+        self._model = load_model(model_path)
+        self._melspec = self._model.preprocessor.melspec_model
+        self._embedding = self._model.preprocessor.embedding_model
+        self._initial_features = self._model.preprocessor.feature_buffer
+        LOGGER.info(f"Loaded batched wake word engine (tick {tick_ms}ms).")
+
+        self._pending = []
+        self._has_work = asyncio.Event()
+        self._scheduler = None
+
+        self.in_flight = 0
+        self.total_inferences = 0
+        self.total_batches = 0
+
+    def new_stream(self):
+        """Creates the wake-word state for a new call."""
+        return WakeWordStream({
+            "raw_tail": np.zeros(0, dtype=np.int16),
+            "accumulated_samples": 0,
+            "raw_data_remainder": np.zeros(0, dtype=np.int16),
+            "melspectrogram_buffer": np.ones((MELSPEC_WINDOW, 32)),
+            "feature_buffer": self._initial_features,
+        })
+
+    async def predict(self, stream, chunk):
+        """Queues `chunk` for the next tick and returns openwakeword's {model_name: score} dict."""
+        if self._scheduler is None or self._scheduler.done():
+            self._scheduler = asyncio.create_task(self._scheduler_task())
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((stream, chunk, future))
+        self._has_work.set()
+        return await future
+
+    async def _scheduler_task(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        try:
+            while True:
+                await self._has_work.wait()
+                # Fixed cadence: a slow batch is followed immediately by the next one
+                await asyncio.sleep(max(0, next_tick - loop.time()))
+                next_tick = loop.time() + self.tick
+                batch, self._pending = self._pending, []
+                self._has_work.clear()
+
+                self.in_flight = len(batch)
+                try:
+                    results = await asyncio.to_thread(self._run_batch, [(s, c) for s, c, _ in batch])
+                except Exception as e:
+                    LOGGER.error(f"Batched wake word inference failed: {e}")
+                    for _, _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                finally:
+                    self.in_flight = 0
+
+                self.total_inferences += len(batch)
+                self.total_batches += 1
+                for (_, _, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+        except asyncio.CancelledError:
+            LOGGER.debug("Wake word scheduler cancelled.")
+
+    def _run_batch(self, batch):
+        # A stream may have several chunks queued; score them in arrival order, one round at a time
+        rounds = defaultdict(list)
+        seen = defaultdict(int)
+        for index, (stream, chunk) in enumerate(batch):
+            rounds[seen[id(stream)]].append(index)
+            seen[id(stream)] += 1
+
+        results = [None] * len(batch)
+        for indices in rounds.values():
+            for index, prediction in zip(indices, self._run_round([batch[i] for i in indices])):
+                results[index] = prediction
+        return results
+
+    def _run_round(self, items):
+        ready = defaultdict(list)   # melspectrogram input length -> streams
+        prepared = []               # samples turned into features this round, per item
+        for stream, chunk in items:
+            state = stream.preprocessor_state
+            # Only whole 80ms steps are buffered; the rest waits for the next chunk
+            audio = np.concatenate((state["raw_data_remainder"], chunk))
+            pending = state["accumulated_samples"] + len(audio)
+            remainder = pending % FEATURE_STEP if pending >= FEATURE_STEP else 0
+            audio, state["raw_data_remainder"] = audio[:len(audio) - remainder], audio[len(audio) - remainder:]
+            state["accumulated_samples"] += len(audio)
+            keep = state["accumulated_samples"] + MELSPEC_CONTEXT
+            state["raw_tail"] = np.concatenate((state["raw_tail"], audio))[-keep:]
+            if state["accumulated_samples"] >= FEATURE_STEP and state["accumulated_samples"] % FEATURE_STEP == 0:
+                ready[len(state["raw_tail"])].append(stream)
+                prepared.append(state["accumulated_samples"])
+            else:
+                prepared.append(0)
+
+        # Batched melspectrogram, one run per distinct input length
+        windows, owners = [], []
+        for streams in ready.values():
+            audio = np.stack([s.preprocessor_state["raw_tail"] for s in streams]).astype(np.float32)
+            specs = self._melspec.run(None, {"input": audio})[0]
+            specs = specs.reshape(len(streams), -1, 32) / 10 + 2
+            for stream, spec in zip(streams, specs):
+                state = stream.preprocessor_state
+                melspec = np.vstack((state["melspectrogram_buffer"], spec))[-MELSPEC_MAX_LEN:]
+                state["melspectrogram_buffer"] = melspec
+                for i in range(state["accumulated_samples"] // FEATURE_STEP - 1, -1, -1):
+                    end = -8 * i if i else len(melspec)
+                    window = melspec[-MELSPEC_WINDOW + end:end]
+                    if window.shape[0] == MELSPEC_WINDOW:
+                        windows.append(window)
+                        owners.append(stream)
+                state["accumulated_samples"] = 0
+                state["raw_tail"] = state["raw_tail"][-MELSPEC_CONTEXT:]
+
+        # Batched embedding over every new window of every stream
+        if windows:
+            batch = np.stack(windows).astype(np.float32)[:, :, :, None]
+            embeddings = self._embedding.run(None, {"input_1": batch})[0].reshape(len(windows), -1)
+            for stream, embedding in zip(owners, embeddings):
+                state = stream.preprocessor_state
+                state["feature_buffer"] = np.vstack((state["feature_buffer"], embedding))[-FEATURE_MAX_LEN:]
+
+        # Classifier (fixed batch size of 1 in the exported models)
+        predictions = []
+        for (stream, _), n_samples in zip(items, prepared):
+            features = stream.preprocessor_state["feature_buffer"]
+            scores = {}
+            for name, session in self._model.models.items():
+                buffer = stream.prediction_buffer[name]
+                if n_samples:
+                    # Several new steps are scored one window each and the best one kept
+                    n_frames = self._model.model_inputs[name]
+                    input_name = session.get_inputs()[0].name
+                    steps = [features[len(features) - n_frames - i:len(features) - i]
+                             for i in range(n_samples // FEATURE_STEP)]
+                    score = max(session.run(None, {input_name: x[None, ].astype(np.float32)})[0][0][0] for x in steps)
+                else:
+                    # No new features: openwakeword repeats the stream's last score
+                    score = buffer[-1] if buffer else 0.0
+                if len(buffer) < WARMUP_PREDICTIONS:
+                    score = 0.0
+                buffer.append(score)
+                scores[name] = score
+            predictions.append(scores)
+        return predictions
+
+    def close(self):
+        if self._scheduler and not self._scheduler.done():
+            self._scheduler.cancel()
+
+    def stats(self):
+        return {
+            "in_flight": self.in_flight,
+            "waiting": len(self._pending),
+            "total_inferences": self.total_inferences,
+            "mean_batch_size": self.total_inferences / self.total_batches if self.total_batches else 0.0,
+        }
@@ -0,0 +1,37 @@
+# app/wakeword/engine.py
+import threading
+from app.config.constants import WAKE_WORD_ENGINE
+from app.wakeword.batcher import BatchedWakeWordEngine
+from app.wakeword.pool import get_wakeword_pool
+from app.wakeword.process_pool import ProcessWakeWordEngine
+
+_SHARED_ENGINE = None
+_SHARED_ENGINE_LOCK = threading.Lock()
+
+
+def create_wakeword_engine(name=WAKE_WORD_ENGINE):
+    if name == "batched":
+        return BatchedWakeWordEngine()
+    if name == "pooled":
+        return get_wakeword_pool()
+    if name == "process":
+        return ProcessWakeWordEngine()
+    raise ValueError(f"Unknown wake word engine: {name}")
+
+
+def get_wakeword_engine():
+    """Returns the process-wide wake word engine selected by WAKE_WORD_ENGINE, loading it on first use."""
+    global _SHARED_ENGINE
+    with _SHARED_ENGINE_LOCK:
+        if _SHARED_ENGINE is None:
+            _SHARED_ENGINE = create_wakeword_engine()
+    return _SHARED_ENGINE
+
+
+def shutdown_wakeword_engine():
+    """Releases the shared engine (worker processes, shared memory) if it was ever loaded."""
+    global _SHARED_ENGINE
+    with _SHARED_ENGINE_LOCK:
+        if _SHARED_ENGINE is not None:
+            _SHARED_ENGINE.close()
+            _SHARED_ENGINE = None
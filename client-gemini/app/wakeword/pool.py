@@ -0,0 +1,128 @@
+# app/wakeword/pool.py
+import asyncio
+import logging
+import os
+import threading
+from collections import defaultdict, deque
+from functools import partial
+from openwakeword.model import Model
+from app.config.constants import WAKE_WORD_MODEL, WAKE_WORD_POOL_SIZE
+
+LOGGER = logging.getLogger(__name__)
+
+WAKE_WORD_MODEL_PATH = os.path.join(os.path.dirname(__file__), "../assets/openwakeword", WAKE_WORD_MODEL)
+
+# Streaming buffers openwakeword keeps on its AudioFeatures preprocessor.
+# Not every openwakeword release has all of them, missing ones are skipped.
+PREPROCESSOR_STATE = (
+    "raw_data_buffer",
+    "melspectrogram_buffer",
+    "accumulated_samples",
+    "raw_data_remainder",
+    "feature_buffer",
+)
+
+
+def load_model(model_path=WAKE_WORD_MODEL_PATH):
+    """Loads an openwakeword model on onnxruntime (the shipped models are ONNX)."""
+    return Model(wakeword_models=[model_path], inference_framework="onnx")
+
+
+class WakeWordStream:
+    """
+    Per-call wake-word state: the audio feature buffers and the prediction
+    buffer that openwakeword would otherwise keep on its Model object.
+    """
+
+    def __init__(self, preprocessor_state):
+        self.preprocessor_state = preprocessor_state
+        self.prediction_buffer = defaultdict(partial(deque, maxlen=30))
+
+
+class WakeWordModelPool:
+    """
+    A process-wide pool of preloaded openwakeword models.
+
+    The ONNX sessions are loaded once and shared by every call. A call borrows
+    a model for the duration of one prediction, during which its own
+    WakeWordStream state is swapped onto the model.
+    """
+
+    def __init__(self, model_path=WAKE_WORD_MODEL_PATH, size=WAKE_WORD_POOL_SIZE):
+        self.size = size
+        self.in_flight = 0
+        self.waiting = 0
+        self.total_inferences = 0
+        self._idle_models = asyncio.Queue()
+
+        models = [load_model(model_path) for _ in range(size)]
+        for model in models:
+            self._idle_models.put_nowait(model)
+        LOGGER.info(f"Loaded {size} wake word model(s) from {os.path.basename(model_path)}.")
+
+        # Snapshot of a freshly initialised preprocessor, used to seed new streams
+        preprocessor = models[0].preprocessor
+        self._initial_state = {
+            attr: getattr(preprocessor, attr) for attr in PREPROCESSOR_STATE if hasattr(preprocessor, attr)
+        }
+
+    def new_stream(self):
+        """Creates the wake-word state for a new call."""
+        state = {
+            attr: deque(value, maxlen=value.maxlen) if isinstance(value, deque) else value
+            for attr, value in self._initial_state.items()
+        }
+        return WakeWordStream(state)
+
+    async def predict(self, stream, chunk):
+        """Scores `chunk` for `stream`, returning openwakeword's {model_name: score} dict."""
+        self.waiting += 1
+        try:
+            model = await self._idle_models.get()
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            return await asyncio.to_thread(self._predict_with, model, stream, chunk)
+        finally:
+            self.in_flight -= 1
+            self.total_inferences += 1
+            self._idle_models.put_nowait(model)
+
+    @staticmethod
+    def _predict_with(model, stream, chunk):
+        preprocessor = model.preprocessor
+        for attr, value in stream.preprocessor_state.items():
+            setattr(preprocessor, attr, value)
+        model.prediction_buffer = stream.prediction_buffer
+        try:
+            return model.predict(chunk)
+        finally:
+            # Buffers are replaced (not mutated) by openwakeword, so read them back
+            for attr in stream.preprocessor_state:
+                stream.preprocessor_state[attr] = getattr(preprocessor, attr)
+
+    def close(self):
+        pass
+
+    def stats(self):
+        return {
+            "size": self.size,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "total_inferences": self.total_inferences,
+        }
+
+
+_SHARED_POOL = None
+_SHARED_POOL_LOCK = threading.Lock()
+
+
+def get_wakeword_pool():
+    """Returns the process-wide wake word pool, loading the models on first use."""
+    global _SHARED_POOL
+    with _SHARED_POOL_LOCK:
+        if _SHARED_POOL is None:
+            _SHARED_POOL = WakeWordModelPool()
+    return _SHARED_POOL
@@ -0,0 +1,225 @@
+# app/wakeword/process_pool.py
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import threading
+import time
+import weakref
+from collections import defaultdict, deque
+from functools import partial
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+from app.config.constants import WAKE_WORD_PROCESS_WORKERS
+from app.wakeword.pool import WAKE_WORD_MODEL_PATH, PREPROCESSOR_STATE, WakeWordStream, load_model
+
+LOGGER = logging.getLogger(__name__)
+
+MAX_STREAMS = 64            # Shared memory slots, one per live stream
+SLOT_SAMPLES = 4096         # Largest chunk a stream may submit
+RESULT_TIMEOUT = 5          # Seconds before a chunk is considered lost
+SLOTS_BYTES = MAX_STREAMS * SLOT_SAMPLES * np.dtype(np.int16).itemsize
+
+
+class ProcessWakeWordStream(WakeWordStream):
+    """Wake-word state of one call; its feature buffers live in the owning worker process."""
+
+    def __init__(self, stream_id, slot, worker):
+        super().__init__(None)
+        self.stream_id = stream_id
+        self.slot = slot
+        self.worker = worker
+
+
+def _worker_main(model_path, shm_name, requests, results):
+    """Entry point of a worker process: scores chunks read from shared memory."""
+    shm = SharedMemory(name=shm_name)
+    slots = np.ndarray((MAX_STREAMS, SLOT_SAMPLES), dtype=np.int16, buffer=shm.buf)
+    tags = np.ndarray((MAX_STREAMS,), dtype=np.int64, buffer=shm.buf, offset=SLOTS_BYTES)
+    model = load_model(model_path)
+    preprocessor = model.preprocessor
+    initial_state = {attr: getattr(preprocessor, attr) for attr in PREPROCESSOR_STATE if hasattr(preprocessor, attr)}
+    states = {}
+    prediction_buffers = {}  # stream_id -> openwakeword's per-model score history
+    results.put(("ready", None, None))
+
+    try:
+        while (message := requests.get()) is not None:
+            kind, *args = message
+            if kind == "release":
+                states.pop(args[0], None)
+                prediction_buffers.pop(args[0], None)
+                continue
+
+            request_id, stream_id, slot, n_samples, reset = args
+            # Copied out of the slot: openwakeword may hold on to part of the chunk
+            # (its remainder of a partial 80ms step) while the parent writes the next one
+            chunk = slots[slot, :n_samples].copy()
+            if tags[slot] != request_id:
+                # The parent gave up on this chunk and has reused the slot since
+                continue
+            state = states.get(stream_id)
+            if state is None:
+                state = {
+                    attr: deque(value, maxlen=value.maxlen) if isinstance(value, deque) else value
+                    for attr, value in initial_state.items()
+                }
+                states[stream_id] = state
+            try:
+                for attr, value in state.items():
+                    setattr(preprocessor, attr, value)
+                # The stream's own scores drive openwakeword's warm-up zeroing and the
+                # score it repeats for chunks too short to complete a feature frame
+                if reset or stream_id not in prediction_buffers:
+                    prediction_buffers[stream_id] = defaultdict(partial(deque, maxlen=30))
+                model.prediction_buffer = prediction_buffers[stream_id]
+                scores = model.predict(chunk)
+                for attr in state:
+                    state[attr] = getattr(preprocessor, attr)
+                results.put((request_id, {name: float(score) for name, score in scores.items()}, None))
+            except Exception as e:
+                results.put((request_id, None, str(e)))
+    finally:
+        del slots, tags
+        shm.close()
+
+
+class ProcessWakeWordEngine:
+    """
+    Runs openwakeword in a pool of worker processes so feature extraction does
+    not compete for the GIL with the event loop's RTP/Opus/resampling work.
+
+    Each stream is pinned to one worker, which holds its feature buffers.
+    Audio chunks travel through a shared memory slot owned by the stream;
+    only small (request id, slot, length) tuples are pickled. Each slot is
+    tagged with the request id of the chunk it holds, so a worker that falls
+    behind skips requests the parent has already timed out.
+    """
+
+    def __init__(self, model_path=WAKE_WORD_MODEL_PATH, workers=WAKE_WORD_PROCESS_WORKERS):
+        ctx = multiprocessing.get_context("spawn")
+        self._shm = SharedMemory(create=True, size=SLOTS_BYTES + MAX_STREAMS * np.dtype(np.int64).itemsize)
+        self._slots = np.ndarray((MAX_STREAMS, SLOT_SAMPLES), dtype=np.int16, buffer=self._shm.buf)
+        self._tags = np.ndarray((MAX_STREAMS,), dtype=np.int64, buffer=self._shm.buf, offset=SLOTS_BYTES)
+        self._tags[:] = -1
+        self._free_slots = list(range(MAX_STREAMS))
+        self._stream_ids = itertools.count()
+        self._request_ids = itertools.count()
+
+        self._results = ctx.Queue()
+        self._requests = [ctx.Queue() for _ in range(workers)]
+        self._workers = [
+            ctx.Process(target=_worker_main, args=(model_path, self._shm.name, q, self._results), daemon=True)
+            for q in self._requests
+        ]
+        for worker in self._workers:
+            worker.start()
+        # Wait until every worker has loaded its model, so the first chunk is not slowed down
+        for _ in self._workers:
+            self._results.get(timeout=60)
+
+        self._futures = {}
+        self._loop = None
+        self._reader = threading.Thread(target=self._read_results, name="wakeword-results", daemon=True)
+        self._reader.start()
+
+        self.in_flight = 0
+        self._worker_in_flight = [0] * workers  # chunks sent to each worker and not answered yet
+        self.total_inferences = 0
+        self.timeouts = 0
+        self.latencies = deque(maxlen=1000)  # per-chunk round trip, seconds
+        LOGGER.info(f"Started {workers} wake word worker process(es).")
+
+    def new_stream(self):
+        """Creates the wake-word state for a new call."""
+        if not self._free_slots:
+            raise RuntimeError(f"All {MAX_STREAMS} wake word stream slots are in use.")
+        stream_id = next(self._stream_ids)
+        stream = ProcessWakeWordStream(stream_id, self._free_slots.pop(), stream_id % len(self._workers))
+        # Free the slot and the worker-side buffers once the call drops the stream
+        weakref.finalize(stream, self._release, stream_id, stream.slot, stream.worker)
+        return stream
+
+    def _release(self, stream_id, slot, worker):
+        self._free_slots.append(slot)
+        if self._workers[worker].is_alive():
+            self._requests[worker].put(("release", stream_id))
+
+    async def predict(self, stream, chunk):
+        """Scores `chunk` in the stream's worker and returns openwakeword's {model_name: score} dict."""
+        n_samples = len(chunk)
+        if n_samples > SLOT_SAMPLES:
+            raise ValueError(f"Wake word chunk of {n_samples} samples exceeds the {SLOT_SAMPLES} sample slot.")
+
+        self._loop = asyncio.get_running_loop()
+        request_id = next(self._request_ids)
+        future = self._loop.create_future()
+        self._futures[request_id] = future
+
+        # Tag before writing: a worker that sees any of the new samples also sees the new tag
+        self._tags[stream.slot] = request_id
+        self._slots[stream.slot, :n_samples] = chunk
+        # The caller clears the stream's prediction buffer after a detection; the worker's copy follows
+        reset = not stream.prediction_buffer
+        started = time.perf_counter()
+        self.in_flight += 1
+        self._worker_in_flight[stream.worker] += 1
+        try:
+            self._requests[stream.worker].put(("predict", request_id, stream.stream_id, stream.slot, n_samples, reset))
+            scores = await asyncio.wait_for(future, RESULT_TIMEOUT)
+        except asyncio.TimeoutError:
+            # Skip the chunk rather than fail the call; the worker drops it once the slot is reused
+            self.timeouts += 1
+            LOGGER.warning(f"Wake word chunk of stream {stream.stream_id} got no score after {RESULT_TIMEOUT}s; skipping it.")
+            return {}
+        finally:
+            self.in_flight -= 1
+            self._worker_in_flight[stream.worker] -= 1
+            self._futures.pop(request_id, None)
+        self.latencies.append(time.perf_counter() - started)
+        self.total_inferences += 1
+
+        for name, score in scores.items():
+            stream.prediction_buffer[name].append(score)
+        return scores
+
+    def _read_results(self):
+        while (result := self._results.get()) is not None:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._resolve, *result)
+
+    def _resolve(self, request_id, scores, error):
+        future = self._futures.get(request_id)
+        if future is None or future.done():
+            return
+        if error:
+            future.set_exception(RuntimeError(f"Wake word worker failed: {error}"))
+        else:
+            future.set_result(scores)
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        return {
+            "in_flight": self.in_flight,
+            # A worker scores one chunk at a time; the rest of its chunks are queued
+            "waiting": sum(max(0, n - 1) for n in self._worker_in_flight),
+            "total_inferences": self.total_inferences,
+            "timeouts": self.timeouts,
+            "workers_alive": sum(worker.is_alive() for worker in self._workers),
+            "latency_ms_mean": 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+            "latency_ms_p95": 1000 * latencies[int(len(latencies) * 0.95)] if latencies else 0.0,
+            "latency_ms_max": 1000 * latencies[-1] if latencies else 0.0,
+        }
+
+    def close(self):
+        for queue in self._requests:
+            queue.put(None)
+        for worker in self._workers:
+            worker.join(timeout=2)
+            if worker.is_alive():
+                worker.terminate()
+        self._results.put(None)
+        del self._slots, self._tags
+        self._shm.close()
+        self._shm.unlink()
+        LOGGER.info("Wake word worker processes stopped.")
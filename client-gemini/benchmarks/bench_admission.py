@@ -0,0 +1,135 @@
+# benchmarks/bench_admission.py
+"""
+Fixed MAX_SESSIONS vs load-aware admission under a rising call rate.
+
+Calls arrive every `--arrival-ms` and last `--call-s`. Each admitted call
+costs `--call-cpu-ms` of event-loop time per 20ms audio tick (resampling,
+wake word, jitter buffer... lumped together) and counts a playback
+underrun whenever its tick runs more than a frame late - the same signal
+AdmissionController reads from real calls. A separate probe records
+event-loop lag for the whole run.
+
+"fixed limit" is the old `len(active_sessions) >= MAX_SESSIONS` check,
+with a limit sized for a bigger box. "load-aware" is AdmissionController
+with the same slot limit plus the load signals.
+
+Run from the client-gemini folder:
+    python -m benchmarks.bench_admission [--call-cpu-ms 2.5] [--max-sessions 16]
+"""
+import argparse
+import asyncio
+import logging
+import time
+from types import SimpleNamespace
+import numpy as np
+from app.core.admission import AdmissionController
+
+TICK_S = 0.02
+
+
+class SyntheticCall:
+    def __init__(self, cpu_ms):
+        self.cpu_s = cpu_ms / 1000
+        self.llm_client = SimpleNamespace(playback_buffer=SimpleNamespace(underruns=0))
+
+    async def run(self, seconds):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        ticks = 0
+        while loop.time() - started < seconds:
+            ticks += 1
+            due = started + ticks * TICK_S
+            await asyncio.sleep(max(0, due - loop.time()))
+            if loop.time() - due > TICK_S:
+                self.llm_client.playback_buffer.underruns += 1
+            busy_until = time.perf_counter() + self.cpu_s
+            while time.perf_counter() < busy_until:
+                pass
+
+
+async def probe_lag(lags):
+    loop = asyncio.get_running_loop()
+    while True:
+        due = loop.time() + 0.01
+        await asyncio.sleep(0.01)
+        lags.append((loop.time() - due) * 1000)
+
+
+class FixedLimit:
+    """What GeminiApp did before: take the call if fewer than `max_sessions` are active."""
+
+    def __init__(self, max_sessions):
+        self.max_sessions = max_sessions
+        self.active = self.admitted = self.rejected = 0
+
+    async def acquire(self, call_id):
+        if self.active >= self.max_sessions:
+            self.rejected += 1
+            return False
+        self.active += 1
+        self.admitted += 1
+        return True
+
+    def release(self):
+        self.active -= 1
+
+    async def close(self):
+        pass
+
+    def stats(self):
+        return {"admitted": self.admitted, "rejected": self.rejected}
+
+
+async def run(label, args, load_aware):
+    calls = {}
+    if load_aware:
+        controller = AdmissionController(lambda: calls.values(), max_sessions=args.max_sessions, queue_timeout_s=2)
+        controller.start()
+    else:
+        controller = FixedLimit(args.max_sessions)
+    lags = []
+    probe = asyncio.create_task(probe_lag(lags))
+    underruns = 0
+    peak = 0
+
+    async def call(n):
+        nonlocal underruns, peak
+        if not await controller.acquire(n):
+            return
+        session = calls[n] = SyntheticCall(args.call_cpu_ms)
+        peak = max(peak, len(calls))
+        await session.run(args.call_s)
+        underruns += session.llm_client.playback_buffer.underruns
+        del calls[n]
+        controller.release()
+
+    tasks = []
+    for n in range(int(args.arrivals)):
+        tasks.append(asyncio.create_task(call(n)))
+        await asyncio.sleep(args.arrival_ms / 1000)
+    await asyncio.gather(*tasks)
+    probe.cancel()
+    await controller.close()
+
+    stats = controller.stats()
+    print(f"{label:<14}{stats['admitted']:>9}{stats['rejected']:>9}{peak:>6}"
+          f"{np.percentile(lags, 95):>11.1f}ms{max(lags):>9.0f}ms{underruns:>11}")
+
+
+async def main(args):
+    logging.basicConfig(level=logging.ERROR)
+    print(f"{args.arrivals} calls, one every {args.arrival_ms}ms, {args.call_s}s each, "
+          f"{args.call_cpu_ms}ms loop time per 20ms tick, slot limit {args.max_sessions}\n")
+    print(f"{'admission':<14}{'admitted':>9}{'rejected':>9}{'peak':>6}{'lag p95':>13}{'max':>11}{'underruns':>11}")
+    await run("fixed limit", args, load_aware=False)
+    await run("load-aware", args, load_aware=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--arrivals", type=int, default=30)
+    parser.add_argument("--arrival-ms", type=int, default=400)
+    parser.add_argument("--call-s", type=float, default=8)
+    parser.add_argument("--call-cpu-ms", type=float, default=2.5)
+    parser.add_argument("--max-sessions", type=int, default=16)
+    asyncio.run(main(parser.parse_args()))
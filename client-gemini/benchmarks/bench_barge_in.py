@@ -0,0 +1,125 @@
+# benchmarks/bench_barge_in.py
+"""
+Interrupt-to-silence latency with and without local barge-in.
+
+Drives AdaptiveJitterBuffer + BargeInDetector on a simulated clock, the way
+GeminiOutputTrack and the uplink task do every 20ms: a long reply is
+playing, the caller starts talking, and Gemini's `interrupted` event
+arrives `--server-ms` later (its own VAD plus the network round trip - an
+assumption, pass what you measure on your link). Latency is from the
+caller's speech onset to the first silent output frame.
+
+Also checks the false-positive path: a short burst Gemini never confirms
+must be rolled back, and the reply must resume where it was cut.
+
+Run from the client-gemini folder:
+    python -m benchmarks.bench_barge_in [--server-ms 450] [--trials 50]
+"""
+import argparse
+import asyncio
+import random
+import numpy as np
+import app.media.barge_in as barge_in_module
+import app.media.jitter_buffer as jitter_module
+from app.media.barge_in import BargeInDetector
+from app.media.jitter_buffer import AdaptiveJitterBuffer
+from app.config.constants import GEMINI_WEBRTC_SAMPLE_RATE, GEMINI_SAMPLE_RATE, BARGE_IN_CONFIRM_MS
+
+TICK = 0.02
+REPLY_SECONDS = 10
+AUDIBLE_PEAK = 300
+
+
+class SimulatedTime:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def tone(sample_rate, seconds, freq, amplitude):
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.int16)
+
+
+async def run_trial(clock, enabled, server_ms, onset_s, speech_s, rng):
+    buffer = AdaptiveJitterBuffer()
+    detector = BargeInDetector(buffer, enabled=enabled)
+    reply = tone(GEMINI_WEBRTC_SAMPLE_RATE, REPLY_SECONDS, 440, 8000)
+    await buffer.write(reply.tobytes())
+    await buffer.end_turn()
+
+    uplink_samples = int(GEMINI_SAMPLE_RATE * TICK)
+    speech = tone(GEMINI_SAMPLE_RATE, TICK, 220, 6000)
+    start = clock.now
+    interrupted_at = onset_s + server_ms / 1000 if server_ms is not None else None
+    silent_since = None
+    peaks = []
+
+    for tick in range(int((onset_s + 3) / TICK)):
+        t = tick * TICK
+        clock.now = start + t
+
+        if interrupted_at is not None and t >= interrupted_at:
+            detector.on_interrupted()
+            interrupted_at = None
+
+        noise = rng.normal(0, 30, uplink_samples)
+        if onset_s <= t < onset_s + speech_s:
+            noise = noise + speech
+        detector.process(noise.astype(np.int16))
+
+        frame = buffer.read_frame_nowait()
+        peak = 0 if frame is None else int(np.abs(np.frombuffer(frame, dtype=np.int16)).max())
+        peaks.append(peak)
+        if t >= onset_s:
+            if peak <= AUDIBLE_PEAK:
+                silent_since = t if silent_since is None else silent_since
+            else:
+                silent_since = None
+
+    latency_ms = None if silent_since is None else (silent_since - onset_s) * 1000
+    return latency_ms, buffer, peaks
+
+
+def summarize(label, latencies):
+    ms = np.asarray(latencies)
+    print(f"{label:<24}{ms.mean():>10.0f}ms{np.percentile(ms, 50):>10.0f}ms{np.percentile(ms, 95):>10.0f}ms")
+
+
+async def main(server_ms, trials):
+    clock = SimulatedTime()
+    barge_in_module.time = clock
+    jitter_module.time = clock
+    rng = np.random.default_rng(0)
+    onsets = [1.0 + random.Random(i).random() for i in range(trials)]
+
+    print(f"{trials} trials, Gemini interrupted event assumed {server_ms}ms after speech onset\n")
+    print(f"{'mode':<24}{'mean':>12}{'p50':>12}{'p95':>12}")
+    for label, enabled in (("Gemini event only", False), ("local barge-in", True)):
+        latencies = []
+        for onset in onsets:
+            latency, _, _ = await run_trial(clock, enabled, server_ms, onset, 1.0, rng)
+            latencies.append(latency)
+        summarize(label, latencies)
+
+    # Fade instead of click: per-frame output peaks from the onset on
+    _, _, peaks = await run_trial(clock, True, server_ms, 1.0, 1.0, rng)
+    print(f"\nfade-out peaks per frame after onset: {peaks[int(1.0 / TICK):int(1.0 / TICK) + 10]}")
+
+    # False positive: a 200ms burst that Gemini never reports as an interruption
+    _, buffer, peaks = await run_trial(clock, True, None, 1.0, 0.2, rng)
+    gap_frames = sum(1 for p in peaks[int(1.0 / TICK):] if p <= AUDIBLE_PEAK)
+    stats = buffer.stats()
+    print(f"unconfirmed cut: cuts {stats['cuts']}, rolled back {stats['cuts_rolled_back']}, "
+          f"reply gap {gap_frames * TICK * 1000:.0f}ms (confirm window {BARGE_IN_CONFIRM_MS}ms)")
+    assert stats["cuts"] == 1 and stats["cuts_rolled_back"] == 1, "unconfirmed cut was not rolled back"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--server-ms", type=int, default=450)
+    parser.add_argument("--trials", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.server_ms, args.trials))
@@ -0,0 +1,259 @@
+# benchmarks/bench_e2e.py
+"""
+End-to-end latency of N calls, offline.
+
+A child process plays the outside world: the stand-in Live server
+(benchmarks/fake_live_server.py) and N aiortc caller peers. Each caller
+talks (`--utterance-s` of test.wav, then `--pause-s` of silence, over and
+over) and listens to what comes back. This process hosts the calls the
+way GeminiApp does: one CallSession per caller, answering its offer
+through a loopback signaling stub, and talking to the Live server through
+the usual pool. The wake word is taken as said.
+
+Reported, per run:
+
+- mouth-to-ear: caller's last loud frame sent -> first loud reply frame
+  heard. "pipeline" is what is left after taking out what the stand-in
+  server adds on purpose (end of speech wait, reply delay, network both ways)
+- time to first audio: offer sent -> first loud reply frame heard
+- CPU per call: this process only, so the callers and the server do not count
+- frame jitter: how far the gaps between reply frames heard by the caller
+  stray from 20ms
+
+Run from the client-gemini folder:
+    python -m benchmarks.bench_e2e [--calls 4] [--seconds 20] [--latency-ms 40] [--script replies]
+"""
+import argparse
+import asyncio
+import functools
+import logging
+import multiprocessing
+import time
+import numpy as np
+from aiortc import RTCConfiguration, RTCPeerConnection, RTCSessionDescription
+from aiortc.mediastreams import MediaStreamError, MediaStreamTrack
+from av.audio.frame import AudioFrame
+from app.config.constants import CONF_CHAT_MODEL
+from app.core import webrtc
+from app.core.call_session import CallSession
+from app.llm.gemini import GeminiClientManager, build_live_config
+from app.llm.handle_store import SessionHandleStore
+from app.llm.live_pool import LiveSessionPool
+from app.models.gemini_track import GeminiOutputTrack
+from app.wakeword.engine import get_wakeword_engine, shutdown_wakeword_engine
+from benchmarks.fake_live_server import FakeLiveServer, client_for, pcm_from_file
+
+CALLER_RATE = 48000
+FRAME_SAMPLES = CALLER_RATE // 50
+LOUD_RMS = 300  # same bar the stand-in server uses for speech
+SCRIPTS = {
+    "replies": [{}],
+    "interrupts": [{}, {"interrupt_after_ms": 400}],
+    "tools": [{}, {"tool_call": {"name": "get_the_lights_state"}}],
+    "go_away": [{}, {}, {"go_away": True}],
+}
+
+
+def rms(samples):
+    return float(np.sqrt(np.mean(samples.astype(np.float32) ** 2))) if samples.size else 0.0
+
+
+class UtteranceTrack(MediaStreamTrack):
+    """A caller saying the same thing every `utterance_s + pause_s`, in real time."""
+    kind = "audio"
+
+    def __init__(self, speech, utterance_s, pause_s):
+        super().__init__()
+        cycle = np.zeros(int((utterance_s + pause_s) * CALLER_RATE), dtype=np.int16)
+        spoken = speech[:int(utterance_s * CALLER_RATE)]
+        cycle[:len(spoken)] = spoken
+        self.frames = cycle[:len(cycle) - len(cycle) % FRAME_SAMPLES].reshape(-1, 1, FRAME_SAMPLES)
+        self.loud = [rms(frame) > LOUD_RMS for frame in self.frames]
+        self.pts = 0
+        self.started = None
+        self.speech_ended_at = None  # perf_counter of the last loud frame of the latest utterance
+        self.awaiting_reply = False
+
+    async def recv(self):
+        if self.readyState != "live":
+            raise MediaStreamError
+        if self.started is None:
+            self.started = time.perf_counter()
+        due = self.started + self.pts / CALLER_RATE
+        await asyncio.sleep(max(0, due - time.perf_counter()))
+        index = (self.pts // FRAME_SAMPLES) % len(self.frames)
+        if self.loud[index] and not self.loud[(index + 1) % len(self.frames)]:
+            self.speech_ended_at = time.perf_counter()
+            self.awaiting_reply = True
+        frame = AudioFrame.from_ndarray(self.frames[index], format="s16", layout="mono")
+        frame.sample_rate = CALLER_RATE
+        frame.pts = self.pts
+        self.pts += FRAME_SAMPLES
+        return frame
+
+
+class Caller:
+    def __init__(self, speech, args):
+        self.pc = RTCPeerConnection(RTCConfiguration(iceServers=[]))
+        self.track = UtteranceTrack(speech, args["utterance_s"], args["pause_s"])
+        self.pc.addTrack(self.track)
+        self.offered_at = None
+        self.first_audio_s = None
+        self.mouth_to_ear = []
+        self.gaps = []
+        self.listener = None
+        self.pc.on("track", lambda track: setattr(self, "listener", asyncio.ensure_future(self.listen(track))))
+
+    async def offer(self):
+        self.offered_at = time.perf_counter()
+        await self.pc.setLocalDescription(await self.pc.createOffer())
+        return {"type": self.pc.localDescription.type, "sdp": self.pc.localDescription.sdp}
+
+    async def listen(self, track):
+        last = None
+        try:
+            while True:
+                frame = await track.recv()
+                now = time.perf_counter()
+                if last is not None:
+                    self.gaps.append(now - last)
+                last = now
+                if rms(frame.to_ndarray()) <= LOUD_RMS:
+                    continue
+                if self.first_audio_s is None:
+                    self.first_audio_s = now - self.offered_at
+                if self.track.awaiting_reply:
+                    self.track.awaiting_reply = False
+                    self.mouth_to_ear.append(now - self.track.speech_ended_at)
+        except MediaStreamError:
+            pass
+
+
+def caller_side(conn, args):
+    """Entry point of the child process: the Live server and the callers."""
+    logging.basicConfig(level=logging.ERROR)
+    asyncio.run(_callers(conn, args))
+
+
+async def _callers(conn, args):
+    server = await FakeLiveServer(rtt_ms=args["rtt_ms"], setup_ms=args["setup_ms"],
+                                  reply_delay_ms=args["reply_delay_ms"], reply_ms=args["reply_ms"],
+                                  latency_ms=args["latency_ms"], jitter_ms=args["jitter_ms"],
+                                  end_of_speech_ms=args["end_of_speech_ms"], script=SCRIPTS[args["script"]]).start()
+    conn.send(server.port)
+    await asyncio.to_thread(conn.recv)  # the host is ready
+    speech = np.frombuffer(pcm_from_file(args["speech"], CALLER_RATE), dtype=np.int16)
+    callers = [Caller(speech, args) for _ in range(args["calls"])]
+    for n, caller in enumerate(callers):
+        conn.send(("offer", n, await caller.offer()))
+        _, _, answer = await asyncio.to_thread(conn.recv)
+        await caller.pc.setRemoteDescription(RTCSessionDescription(**answer))
+    conn.send("connected")
+    await asyncio.sleep(args["seconds"])
+
+    results = [
+        {"first_audio_s": caller.first_audio_s, "mouth_to_ear": caller.mouth_to_ear, "gaps": caller.gaps}
+        for caller in callers
+    ]
+    conn.send({"callers": results, "turns": server.turns, "tool_calls": server.tool_calls_sent,
+               "interruptions": server.interruptions_sent})
+    for caller in callers:
+        await caller.pc.close()
+    await server.close()
+
+
+class LoopbackSignaling:
+    """Hands the callee's answer straight back to the caller process."""
+
+    def __init__(self, conn, n):
+        self.conn = conn
+        self.n = n
+
+    async def send_answer(self, caller_id, sdp):
+        self.conn.send(("answer", self.n, {"type": sdp.type, "sdp": sdp.sdp}))
+
+    async def send_ice_candidate(self, callee_id, candidate):
+        pass  # aiortc puts its candidates in the SDP
+
+
+async def main(args):
+    logging.basicConfig(level=logging.ERROR)
+    webrtc.ICE_SERVERS = []  # loopback only: no STUN round trips
+    await asyncio.to_thread(get_wakeword_engine)
+
+    ctx = multiprocessing.get_context("spawn")
+    conn, child_conn = ctx.Pipe()
+    world = ctx.Process(target=caller_side, args=(child_conn, vars(args)), daemon=True)
+    world.start()
+    port = await asyncio.to_thread(conn.recv)
+    client = client_for(port)
+    pool = LiveSessionPool(lambda: client.aio.live.connect(model=CONF_CHAT_MODEL, config=build_live_config()))
+    pool.start()
+    store = SessionHandleStore(":memory:")
+    manager = functools.partial(GeminiClientManager, genai_client=client, live_pool=pool, handle_store=store)
+    await asyncio.sleep(1)  # let the pool warm up, as it would long before the first call
+    conn.send("ready")
+
+    sessions = []
+
+    async def on_cleanup(remote_user_id):
+        pass
+
+    while (message := await asyncio.to_thread(conn.recv)) != "connected":
+        _, n, offer = message
+        session = CallSession(f"caller-{n}", LoopbackSignaling(conn, n), manager, GeminiOutputTrack, on_cleanup)
+        session.llm_client.is_wake.set()  # the wake word has been said
+        sessions.append(session)
+        await session.webrtc_manager.handle_remote_offer(offer)
+
+    cpu, wall = time.process_time(), time.perf_counter()
+    report = await asyncio.to_thread(conn.recv)
+    cpu_per_call = (time.process_time() - cpu) / (time.perf_counter() - wall) / args.calls
+
+    frame_emit = [session.llm_client.metrics.stats()["frame_emit"]["p95_ms"] for session in sessions]
+    underruns = sum(session.llm_client.playback_buffer.underruns for session in sessions)
+    for session in sessions:
+        await session.cleanup()
+    await pool.close()
+    await store.close()
+    world.join(10)
+    shutdown_wakeword_engine()
+
+    callers = report["callers"]
+    m2e = np.array([s for c in callers for s in c["mouth_to_ear"]]) * 1000
+    ttfa = np.array([c["first_audio_s"] for c in callers if c["first_audio_s"] is not None]) * 1000
+    jitter = np.abs(np.array([g for c in callers for g in c["gaps"]]) * 1000 - 20)
+    added = args.end_of_speech_ms + args.reply_delay_ms + 2 * args.latency_ms
+
+    print(f"{args.calls} calls for {args.seconds}s, script '{args.script}', network {args.latency_ms}ms "
+          f"(+{args.jitter_ms}ms jitter) each way; {report['turns']} replies, {report['tool_calls']} tool calls, "
+          f"{report['interruptions']} interruptions\n")
+    if not len(m2e) or not len(ttfa):
+        print("No reply audio reached the callers.")
+        return
+    print(f"mouth-to-ear         p50 {np.percentile(m2e, 50):6.0f}ms  p95 {np.percentile(m2e, 95):6.0f}ms  "
+          f"({len(m2e)} turns)")
+    print(f"  pipeline           p50 {np.percentile(m2e, 50) - added:6.0f}ms  p95 {np.percentile(m2e, 95) - added:6.0f}ms  "
+          f"(minus {added}ms the stand-in adds)")
+    print(f"time to first audio  p50 {np.percentile(ttfa, 50):6.0f}ms  p95 {np.percentile(ttfa, 95):6.0f}ms")
+    print(f"CPU per call         {100 * cpu_per_call:.1f}% of a core")
+    print(f"frame jitter         p50 {np.percentile(jitter, 50):6.1f}ms  p95 {np.percentile(jitter, 95):6.1f}ms  "
+          f"(callee frame_emit p95 <= {max(frame_emit):.3g}ms, {underruns} underruns)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--speech", default="test.wav")
+    parser.add_argument("--utterance-s", type=float, default=1.5)
+    parser.add_argument("--pause-s", type=float, default=4)
+    parser.add_argument("--script", choices=sorted(SCRIPTS), default="replies")
+    parser.add_argument("--rtt-ms", type=int, default=60)
+    parser.add_argument("--setup-ms", type=int, default=250)
+    parser.add_argument("--latency-ms", type=int, default=40)
+    parser.add_argument("--jitter-ms", type=int, default=10)
+    parser.add_argument("--end-of-speech-ms", type=int, default=500)
+    parser.add_argument("--reply-delay-ms", type=int, default=300)
+    parser.add_argument("--reply-ms", type=int, default=1500)
+    asyncio.run(main(parser.parse_args()))
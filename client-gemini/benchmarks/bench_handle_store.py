@@ -0,0 +1,130 @@
+# benchmarks/bench_handle_store.py
+"""
+Live session-handle store: event-loop cost, size under churn, restart.
+
+1. `--updates` handle updates from `--users` callers, as they arrive during
+   calls (a few per turn), timed on the event loop: SessionHandleStore vs
+   committing each one to sqlite on the loop.
+2. The database size after that churn, and after 9 in 10 callers'
+   handles expire and get pruned.
+3. A "restart": a new store opened on the same file, and a call from a
+   saved caller against the stand-in Live server
+   (benchmarks/fake_live_server.py), which counts resumed sessions.
+
+Run from the client-gemini folder:
+    python -m benchmarks.bench_handle_store [--users 1000] [--updates 50000]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from app.config.constants import CONF_CHAT_MODEL
+from app.llm.gemini import GeminiClientManager, build_live_config
+from app.llm.handle_store import SessionHandleStore
+from app.llm.live_pool import LiveSessionPool
+from app.wakeword.engine import get_wakeword_engine, shutdown_wakeword_engine
+from benchmarks.bench_live_pool import CallerTrack
+from benchmarks.fake_live_server import FakeLiveServer
+
+BURST = 20  # updates handled per loop iteration
+
+
+def updates(users, count, seed=0):
+    rng = random.Random(seed)
+    return [(f"caller-{rng.randrange(users)}", f"handle-{i:08d}-{'x' * 100}") for i in range(count)]
+
+
+async def timed(stream, put):
+    """Worst and mean time one loop iteration spends on its updates."""
+    worst = total = 0
+    for i in range(0, len(stream), BURST):
+        started = time.perf_counter()
+        for user, handle in stream[i:i + BURST]:
+            put(user, handle)
+        elapsed = time.perf_counter() - started
+        worst, total = max(worst, elapsed), total + elapsed
+        await asyncio.sleep(0)
+    return 1e6 * total / len(stream), 1000 * worst
+
+
+async def on_loop_sqlite(path, stream):
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA journal_mode = WAL")
+    db.execute("CREATE TABLE handles (remote_user_id TEXT PRIMARY KEY, handle TEXT, expires_at REAL)")
+
+    def put(user, handle):
+        db.execute("INSERT OR REPLACE INTO handles VALUES (?, ?, ?)", (user, handle, time.time() + 7200))
+        db.commit()
+
+    result = await timed(stream, put)
+    db.close()
+    return result
+
+
+def file_size(path):
+    return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+
+
+async def restart_resumes(path):
+    server = await FakeLiveServer().start()
+    client = server.client()
+    store = SessionHandleStore(path)
+    await store.open()
+    pool = LiveSessionPool(lambda: client.aio.live.connect(model=CONF_CHAT_MODEL, config=build_live_config()))
+    manager = GeminiClientManager("caller-0", genai_client=client, live_pool=pool, handle_store=store)
+    manager.is_wake.set()
+    task = asyncio.create_task(manager.start_session(CallerTrack()))
+    while manager.session_ready_s is None:
+        await asyncio.sleep(0.01)
+    await manager.stop_session()
+    await task
+    await store.close()
+    await server.close()
+    return server.resumed
+
+
+async def main(users, count):
+    logging.basicConfig(level=logging.ERROR)
+    await asyncio.to_thread(get_wakeword_engine)
+    stream = updates(users, count)
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{count} handle updates from {users} callers, {BURST} per loop iteration\n")
+        print(f"{'store':<22}{'per update':>12}{'worst iteration':>17}")
+        mean_us, worst_ms = await on_loop_sqlite(os.path.join(tmp, "on_loop.db"), stream)
+        print(f"{'sqlite on the loop':<22}{mean_us:>10.1f}us{worst_ms:>15.2f}ms")
+
+        path = os.path.join(tmp, "handles.db")
+        store = SessionHandleStore(path)
+        await store.open()
+        mean_us, worst_ms = await timed(stream, store.put)
+        print(f"{'SessionHandleStore':<22}{mean_us:>10.1f}us{worst_ms:>15.2f}ms")
+        await store.close()
+        stats = store.stats()
+        print(f"\n{stats['writes']} updates saved in {stats['flushes']} transactions")
+
+        # Most callers never call again: their handles expire and are pruned on the next load
+        db = sqlite3.connect(path)
+        with db:
+            db.execute("UPDATE handles SET expires_at = 0 WHERE CAST(SUBSTR(remote_user_id, 8) AS INTEGER) % 10 != 0")
+        db.close()
+        before = file_size(path)
+        store = SessionHandleStore(path)
+        await store.open()
+        await store.close()
+        print(f"database: {before / 1024:.0f} KiB with {users} callers -> {file_size(path) / 1024:.0f} KiB "
+              f"after pruning to {store.stats()['handles']}")
+
+        print(f"restarted process resumed {await restart_resumes(path)} of 1 saved conversation")
+    shutdown_wakeword_engine()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--updates", type=int, default=50000)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.updates))
@@ -0,0 +1,123 @@
+# benchmarks/bench_handover.py
+"""
+Audio lost across Live session handovers (go_away -> resumed connection).
+
+Runs a call against the local stand-in Live server
+(benchmarks/fake_live_server.py), which sends goAway `--go-away-s` into
+every connection and keeps streaming long replies, while the caller talks
+the whole time and a player drains the playback buffer in real time.
+
+"make-before-break" is GeminiClientManager as is. "break-before-make"
+replays what go_away used to do: drop queued reply audio, close the old
+connection at once, and lose whatever the caller says until the new
+connection is up.
+
+Run from the client-gemini folder:
+    python -m benchmarks.bench_handover [--seconds 12] [--go-away-s 3]
+"""
+import argparse
+import asyncio
+import logging
+import time
+from app.config.constants import CONF_CHAT_MODEL, CHUNK_DURATION_MS
+from app.llm.gemini import GeminiClientManager, build_live_config
+from app.llm.live_pool import LiveSessionPool
+from app.llm.handle_store import SessionHandleStore
+from app.media.uplink import UplinkAggregator
+from app.wakeword.engine import get_wakeword_engine, shutdown_wakeword_engine
+from benchmarks.bench_live_pool import CallerTrack
+from benchmarks.fake_live_server import FakeLiveServer
+
+
+class CountingUplink(UplinkAggregator):
+    def __init__(self, drop_while_paused=False):
+        super().__init__()
+        self.drop_while_paused = drop_while_paused
+        self.bytes_captured = 0
+
+    def add(self, data):
+        self.bytes_captured += memoryview(data).nbytes
+        if not (self.drop_while_paused and self.paused):
+            super().add(data)
+
+    def pause(self):
+        if self.drop_while_paused:
+            self.clear()
+        super().pause()
+
+
+class BreakBeforeMake(GeminiClientManager):
+    """go_away handling before the handover: everything in flight is dropped."""
+
+    def _begin_handover(self, connection):
+        self._handover_started = time.perf_counter()
+        self.playback_buffer.clear()
+        task = asyncio.create_task(self._close_connection(connection))
+        self._draining.add(task)
+        task.add_done_callback(self._draining.discard)
+
+
+async def play(buffer, counters):
+    """Reads the playback buffer on the 20ms clock, like GeminiOutputTrack."""
+    frames = 0
+    started = time.perf_counter()
+    while True:
+        frames += 1
+        await asyncio.sleep(max(0, started + frames * CHUNK_DURATION_MS / 1000 - time.perf_counter()))
+        if buffer.read_frame_nowait() is not None:
+            counters["played"] += buffer.frame_bytes
+
+
+async def run(label, manager_class, seconds, go_away_s, reply_ms):
+    server = await FakeLiveServer(rtt_ms=60, setup_ms=250, reply_ms=reply_ms, go_away_after_s=go_away_s).start()
+    client = server.client()
+    pool = LiveSessionPool(lambda: client.aio.live.connect(model=CONF_CHAT_MODEL, config=build_live_config()))
+    store = SessionHandleStore(":memory:")
+    manager = manager_class("bench", genai_client=client, live_pool=pool, handle_store=store)
+    manager.uplink = CountingUplink(drop_while_paused=manager_class is BreakBeforeMake)
+    manager.is_wake.set()
+    manager.interrupt_enabled = False  # the caller talks over every reply on purpose
+
+    counters = {"played": 0}
+    session = asyncio.create_task(manager.start_session(CallerTrack()))
+    player = asyncio.create_task(play(manager.playback_buffer, counters))
+    await asyncio.sleep(seconds)
+    # Let audio already on its way land before hanging up
+    manager.is_wake.clear()
+    manager.uplink.flush()
+    await asyncio.sleep(1)
+    uplink = manager.uplink
+    captured, delivered = uplink.bytes_captured, server.audio_bytes_received
+    received = server.reply_bytes_sent
+    played = counters["played"] + len(manager.playback_buffer)
+    gaps = manager.handover_gaps.stats()
+
+    player.cancel()
+    await manager.stop_session()
+    await session
+    await store.close()
+    await server.close()
+
+    print(f"{label:<20}{gaps['count']:>10}{gaps['mean_ms']:>10.0f}ms{gaps['max_ms']:>8.0f}ms"
+          f"{100 * (1 - delivered / captured):>12.1f}%{100 * (1 - min(played, received) / received):>12.1f}%"
+          f"{manager.playback_buffer.underruns:>11}")
+
+
+async def main(seconds, go_away_s, reply_ms):
+    logging.basicConfig(level=logging.ERROR)
+    await asyncio.to_thread(get_wakeword_engine)
+    print(f"{seconds}s call, goAway {go_away_s}s into every connection, {reply_ms}ms replies streamed in real time\n")
+    print(f"{'handover':<20}{'handovers':>10}{'gap mean':>12}{'max':>10}{'caller lost':>13}{'reply lost':>12}"
+          f"{'underruns':>11}")
+    await run("break-before-make", BreakBeforeMake, seconds, go_away_s, reply_ms)
+    await run("make-before-break", GeminiClientManager, seconds, go_away_s, reply_ms)
+    shutdown_wakeword_engine()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=12)
+    parser.add_argument("--go-away-s", type=float, default=3)
+    parser.add_argument("--reply-ms", type=int, default=1500)
+    args = parser.parse_args()
+    asyncio.run(main(args.seconds, args.go_away_s, args.reply_ms))
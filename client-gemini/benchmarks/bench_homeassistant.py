@@ -0,0 +1,130 @@
+# benchmarks/bench_homeassistant.py
+"""
+Blocking vs async Home Assistant tool calls against a local stub HA server.
+
+The stub runs on its own thread and event loop (a blocking client on the
+main loop would otherwise deadlock against it). It answers
+/api/services/switch/<service> after `--delay-ms`, counts TCP connections,
+and never answers /api/services/hang/<service>. While tool calls run, a
+heartbeat task measures how long the main event loop was frozen - what
+every other call's audio would experience.
+
+Run from the client-gemini folder:
+    python -m benchmarks.bench_homeassistant [--turns 20] [--delay-ms 100]
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+import urllib.request
+from aiohttp import web
+from app.services.homeassistant_api import HomeAssistantClient
+
+CALLS_PER_TURN = 2  # e.g. "turn off the lights and turn on the fan"
+
+
+class StubHomeAssistant:
+    def __init__(self, delay_ms):
+        self.delay = delay_ms / 1000
+        self.connections = set()
+        self.base_url = None
+
+    async def service(self, request):
+        self.connections.add(request.transport.get_extra_info("peername"))
+        await request.json()
+        await asyncio.sleep(self.delay)
+        return web.json_response([])
+
+    async def hang(self, request):
+        await asyncio.sleep(3600)
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_post("/api/services/switch/{service}", self.service)
+        app.router.add_post("/api/services/hang/{service}", self.hang)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    def start_in_thread(self):
+        ready = threading.Event()
+
+        def serve():
+            loop = asyncio.new_event_loop()
+            loop.run_until_complete(self._start())
+            ready.set()
+            loop.run_forever()
+
+        threading.Thread(target=serve, daemon=True).start()
+        ready.wait()
+        return self.base_url
+
+
+def blocking_call(base_url, service):
+    # What homeassistant_api did before: a synchronous POST on the event loop thread
+    request = urllib.request.Request(
+        f"{base_url}/api/services/switch/{service}",
+        data=json.dumps({"entity_id": "switch.bench"}).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(request) as response:
+        return response.status
+
+
+async def heartbeat(stalls, stop):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.005)
+        stalls.append(time.perf_counter() - started - 0.005)
+
+
+async def measure(label, stub, turns, run_turn):
+    stub.connections.clear()
+    stalls, stop = [], asyncio.Event()
+    beat = asyncio.create_task(heartbeat(stalls, stop))
+    await asyncio.sleep(0)
+    elapsed = 0.0
+    for _ in range(turns):
+        started = time.perf_counter()
+        await run_turn()
+        elapsed += time.perf_counter() - started
+        await asyncio.sleep(0.05)  # the rest of the conversation turn
+    stop.set()
+    await beat
+    print(f"{label:<18}{elapsed / turns * 1000:>10.0f}ms{max(stalls) * 1000:>12.0f}ms{len(stub.connections):>13}")
+
+
+async def main(turns, delay_ms):
+    stub = StubHomeAssistant(delay_ms)
+    base_url = stub.start_in_thread()
+    client = HomeAssistantClient(base_url=base_url, token="bench", timeout_s=1)
+
+    async def blocking_turn():
+        for _ in range(CALLS_PER_TURN):
+            blocking_call(base_url, "turn_on")
+
+    async def async_turn():
+        await asyncio.gather(*(client.call_service("switch", "turn_on", "switch.bench") for _ in range(CALLS_PER_TURN)))
+
+    print(f"{turns} turns x {CALLS_PER_TURN} tool calls, HA answers after {delay_ms}ms\n")
+    print(f"{'client':<18}{'per turn':>12}{'loop stall':>14}{'connections':>13}")
+    await measure("blocking (old)", stub, turns, blocking_turn)
+    await measure("aiohttp pooled", stub, turns, async_turn)
+
+    started = time.perf_counter()
+    result = await client.call_service("hang", "turn_on", "switch.bench")
+    print(f"\nhung HA: returned {result} after {time.perf_counter() - started:.2f}s")
+    await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--delay-ms", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.delay_ms))
@@ -0,0 +1,142 @@
+# benchmarks/bench_homeassistant_state.py
+"""
+Home Assistant state cache against a local fake HA (REST + websocket API).
+
+The fake server speaks enough of HA's websocket protocol (auth,
+subscribe_events, get_states) to feed HomeAssistantStateCache, pushes a
+state_changed event for every service call, and answers REST after
+`--delay-ms`. A scripted conversation of state reads and light switches
+is run with and without the cache; the fake HA counts the REST requests
+it actually had to serve.
+
+Run from the client-gemini folder:
+    python -m benchmarks.bench_homeassistant_state [--delay-ms 30]
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from aiohttp import web
+from app.services.homeassistant_api import HomeAssistantClient
+
+ENTITY = "switch.bench_light"
+TURNS = 200
+
+
+class FakeHomeAssistant:
+    def __init__(self, delay_ms, entities=500):
+        self.delay = delay_ms / 1000
+        self.sockets = set()
+        self.rest_requests = 0
+        self.states = {ENTITY: self._state(ENTITY, "off")}
+        for i in range(entities - 1):
+            entity_id = f"sensor.bench_{i}"
+            self.states[entity_id] = self._state(entity_id, str(i))
+
+    @staticmethod
+    def _state(entity_id, state):
+        return {"entity_id": entity_id, "state": state, "attributes": {},
+                "last_updated": datetime.now(timezone.utc).isoformat()}
+
+    async def websocket(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_json({"type": "auth_required"})
+        await ws.receive_json()
+        await ws.send_json({"type": "auth_ok"})
+        self.sockets.add(ws)
+        try:
+            async for msg in ws:
+                data = msg.json()
+                if data["type"] == "subscribe_events":
+                    await ws.send_json({"id": data["id"], "type": "result", "success": True, "result": None})
+                elif data["type"] == "get_states":
+                    await ws.send_json({"id": data["id"], "type": "result", "success": True,
+                                        "result": list(self.states.values())})
+        finally:
+            self.sockets.discard(ws)
+        return ws
+
+    async def service(self, request):
+        self.rest_requests += 1
+        body = await request.json()
+        await asyncio.sleep(self.delay)
+        entity_id = body["entity_id"]
+        old_state = self.states[entity_id]
+        new_state = self._state(entity_id, "on" if request.match_info["service"] == "turn_on" else "off")
+        self.states[entity_id] = new_state
+        event = {"event_type": "state_changed",
+                 "data": {"entity_id": entity_id, "old_state": old_state, "new_state": new_state}}
+        for ws in list(self.sockets):
+            await ws.send_json({"id": 1, "type": "event", "event": event})
+        return web.json_response([new_state])
+
+    async def state(self, request):
+        self.rest_requests += 1
+        await asyncio.sleep(self.delay)
+        return web.json_response(self.states[request.match_info["entity_id"]])
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/api/websocket", self.websocket)
+        app.router.add_post("/api/services/{domain}/{service}", self.service)
+        app.router.add_get("/api/states/{entity_id}", self.state)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", 0).start()
+        return f"http://127.0.0.1:{runner.addresses[0][1]}"
+
+
+def script(seed=0):
+    # Mostly "is the light on?", sometimes a switch the light may already be in
+    rng = random.Random(seed)
+    return [rng.choice(["read", "read", "read", "turn_on", "turn_off"]) for _ in range(TURNS)]
+
+
+async def run(label, base_url, fake, use_cache):
+    client = HomeAssistantClient(base_url=base_url, token="bench", state_cache=use_cache)
+    client.start()
+    if use_cache:
+        await asyncio.wait_for(client.state_cache.ready.wait(), 5)
+
+    fake.rest_requests = 0
+    read_times = []
+    for action in script():
+        if action == "read":
+            started = time.perf_counter()
+            state = await client.get_state(ENTITY)
+            read_times.append(time.perf_counter() - started)
+            assert state["state"] == fake.states[ENTITY]["state"], "cache served a stale state"
+        else:
+            await client.call_service("switch", action, ENTITY)
+        await asyncio.sleep(0)  # let the websocket event land
+
+    # Two identical calls at once share one request
+    await asyncio.gather(client.call_service("switch", "turn_on", "sensor.bench_0"),
+                         client.call_service("switch", "turn_on", "sensor.bench_0"))
+
+    read_ms = sorted(t * 1000 for t in read_times)
+    line = (f"{label:<10}{fake.rest_requests:>10}{read_ms[len(read_ms) // 2]:>11.2f}ms"
+            f"{read_ms[int(len(read_ms) * 0.95)]:>11.2f}ms")
+    if use_cache:
+        stats = client.state_cache.stats()
+        line += f"{stats['hit_rate']:>10.0%}{stats['deduplicated']:>8}"
+    print(line)
+    await client.close()
+
+
+async def main(delay_ms):
+    fake = FakeHomeAssistant(delay_ms)
+    base_url = await fake.start()
+    print(f"{TURNS} tool calls against a fake HA with {len(fake.states)} entities, REST answers after {delay_ms}ms\n")
+    print(f"{'client':<10}{'REST reqs':>10}{'read p50':>13}{'read p95':>13}{'hit rate':>10}{'dedup':>8}")
+    await run("REST only", base_url, fake, use_cache=False)
+    await run("cached", base_url, fake, use_cache=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--delay-ms", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(main(args.delay_ms))
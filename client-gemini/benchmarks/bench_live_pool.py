@@ -0,0 +1,111 @@
+# benchmarks/bench_live_pool.py
+"""
+Time-to-first-audio with and without the warm Live session pool.
+
+Runs GeminiClientManager against the local stand-in Live server
+(benchmarks/fake_live_server.py) with a synthetic caller track that
+starts talking as soon as the call is answered. Time-to-first-audio is
+from `start_session` to the first reply audio landing in the playback
+buffer; "session ready" is the part of it spent connecting.
+
+Run from the client-gemini folder:
+    python -m benchmarks.bench_live_pool [--trials 10] [--rtt-ms 60] [--setup-ms 250]
+"""
+import argparse
+import asyncio
+import logging
+import time
+import numpy as np
+from av.audio.frame import AudioFrame
+from app.config.constants import CONF_CHAT_MODEL
+from app.llm.gemini import GeminiClientManager, build_live_config
+from app.llm.live_pool import LiveSessionPool
+from app.llm.handle_store import SessionHandleStore
+from app.wakeword.engine import get_wakeword_engine, shutdown_wakeword_engine
+from benchmarks.fake_live_server import FakeLiveServer
+
+CALLER_RATE = 48000
+FRAME_SAMPLES = CALLER_RATE // 50
+
+
+class CallerTrack:
+    """A caller that talks (a 220Hz tone) in real time from the moment the call is answered."""
+    kind = "audio"
+
+    def __init__(self):
+        t = np.arange(FRAME_SAMPLES) / CALLER_RATE
+        self.samples = (8000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16).reshape(1, -1)
+        self.pts = 0
+        self.started = None
+
+    async def recv(self):
+        if self.started is None:
+            self.started = time.perf_counter()
+        due = self.started + self.pts / CALLER_RATE
+        await asyncio.sleep(max(0, due - time.perf_counter()))
+        frame = AudioFrame.from_ndarray(self.samples, format="s16", layout="mono")
+        frame.sample_rate = CALLER_RATE
+        frame.pts = self.pts
+        self.pts += FRAME_SAMPLES
+        return frame
+
+
+async def time_to_first_audio(client, pool, store, caller_id):
+    # A new caller every time: a saved handle would resume instead of using the pool
+    manager = GeminiClientManager(caller_id, genai_client=client, live_pool=pool, handle_store=store)
+    manager.is_wake.set()  # skip the wake word: the caller is talking to the assistant
+    started = time.perf_counter()
+    task = asyncio.create_task(manager.start_session(CallerTrack()))
+    while len(manager.playback_buffer) == 0:
+        await asyncio.sleep(0.001)
+    ttfa = time.perf_counter() - started
+    ready = manager.session_ready_s
+    # Hang up the way CallSession.cleanup does
+    await manager.stop_session()
+    await task
+    return ttfa, ready
+
+
+async def run(label, client, pool, store, trials, warm):
+    results = []
+    for trial in range(trials):
+        if warm:
+            while pool.stats()["idle"] < 1:
+                await asyncio.sleep(0.01)
+        results.append(await time_to_first_audio(client, pool, store, f"{label}-{trial}"))
+        await asyncio.sleep(0.05)
+    ttfa = np.array([r[0] for r in results]) * 1000
+    ready = np.array([r[1] for r in results]) * 1000
+    print(f"{label:<14}{np.median(ttfa):>10.0f}ms{np.percentile(ttfa, 95):>10.0f}ms{np.median(ready):>14.0f}ms")
+
+
+async def main(trials, rtt_ms, setup_ms):
+    logging.basicConfig(level=logging.ERROR)
+    await asyncio.to_thread(get_wakeword_engine)
+    server = await FakeLiveServer(rtt_ms=rtt_ms, setup_ms=setup_ms).start()
+    client = server.client()
+    store = SessionHandleStore(":memory:")
+    pool = LiveSessionPool(lambda: client.aio.live.connect(model=CONF_CHAT_MODEL, config=build_live_config()))
+
+    print(f"{trials} calls, stand-in Live server: {rtt_ms}ms handshake, {setup_ms}ms setup, "
+          f"{server.reply_delay * 1000:.0f}ms to first reply audio\n")
+    print(f"{'mode':<14}{'TTFA p50':>12}{'TTFA p95':>12}{'session ready':>16}")
+    # A pool that is never started always misses: the plain connect path
+    await run("cold connect", client, LiveSessionPool(pool.connect), store, trials, warm=False)
+    pool.start()
+    await run("warm pool", client, pool, store, trials, warm=True)
+    print(f"\npool: {pool.stats()}")
+
+    await pool.close()
+    await store.close()
+    await server.close()
+    shutdown_wakeword_engine()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trials", type=int, default=10)
+    parser.add_argument("--rtt-ms", type=int, default=60)
+    parser.add_argument("--setup-ms", type=int, default=250)
+    args = parser.parse_args()
+    asyncio.run(main(args.trials, args.rtt_ms, args.setup_ms))
@@ -0,0 +1,104 @@
+# benchmarks/bench_media_clock.py
+"""
+Simulates 24 hours of output-track pacing against a fake clock and checks
+that MediaClock stays within its lag bound, compared with the old
+`time.time()` schedule.
+
+The simulated scheduler oversleeps by 0-3ms on every frame, stalls for
+500ms once an hour, and the wall clock is stepped forward by 2s (NTP) once
+mid-call. Drift is the gap between when each frame is scheduled to go out
+and the media time it carries. Exits non-zero if the drift bound is broken.
+
+Run from the client-gemini folder:
+    python -m benchmarks.bench_media_clock
+The same check runs in tests/test_media_clock.py.
+"""
+import random
+import sys
+import time
+from app.media.media_clock import MediaClock
+from app.config.constants import GEMINI_WEBRTC_SAMPLE_RATE, SAMPLES_PER_FRAME, MEDIA_CLOCK_MAX_LAG_MS
+
+HOURS = 24
+FRAME_NS = SAMPLES_PER_FRAME * 1_000_000_000 // GEMINI_WEBRTC_SAMPLE_RATE
+TOTAL_NS = HOURS * 3600 * 1_000_000_000
+STALL_EVERY_NS = 3600 * 1_000_000_000
+STALL_NS = 500_000_000
+WALL_STEP_AT_NS = TOTAL_NS // 2
+WALL_STEP_NS = 2_000_000_000
+# The most a frame may go out off its media time: the lag bound plus the frame in hand and the one due
+DRIFT_BOUND_NS = MEDIA_CLOCK_MAX_LAG_MS * 1_000_000 + 2 * FRAME_NS
+
+
+class FakeClock:
+    def __init__(self, seed):
+        self.now = 0
+        self.rng = random.Random(seed)
+        self.next_stall = STALL_EVERY_NS
+
+    def sleep(self, ns):
+        self.now += ns + self.rng.randrange(0, 3_000_000)
+        if self.now >= self.next_stall:
+            self.now += STALL_NS
+            self.next_stall += STALL_EVERY_NS
+
+    def wall(self):
+        return self.now + (WALL_STEP_NS if self.now >= WALL_STEP_AT_NS else 0)
+
+
+def run_media_clock():
+    fake = FakeClock(seed=1)
+    clock = MediaClock(GEMINI_WEBRTC_SAMPLE_RATE, SAMPLES_PER_FRAME, now_ns=lambda: fake.now)
+    max_drift = max_burst = burst = frames = 0
+    last_pts = None
+    while fake.now < TOTAL_NS:
+        wait = int(clock.wait_time() * 1_000_000_000)
+        media_ns = clock.pts * 1_000_000_000 // GEMINI_WEBRTC_SAMPLE_RATE
+        max_drift = max(max_drift, abs(fake.now + wait - media_ns))
+        burst = burst + 1 if wait == 0 else 0
+        max_burst = max(max_burst, burst)
+        fake.sleep(wait)
+        pts = clock.pts
+        assert last_pts is None or pts > last_pts, "RTP timestamps must increase"
+        last_pts = pts
+        clock.advance()
+        frames += 1
+    return frames, max_drift, max_burst, clock.skipped_frames
+
+
+def run_wall_clock():
+    # The schedule GeminiOutputTrack used before: time.time() based, started at construction
+    fake = FakeClock(seed=1)
+    start = fake.wall()
+    timestamp = max_drift = max_burst = burst = frames = 0
+    while fake.now < TOTAL_NS:
+        wait_until = start + timestamp + FRAME_NS
+        wait = max(0, wait_until - fake.wall())
+        max_drift = max(max_drift, abs(fake.now + wait - timestamp))
+        burst = burst + 1 if wait == 0 else 0
+        max_burst = max(max_burst, burst)
+        fake.sleep(wait)
+        timestamp += FRAME_NS
+        frames += 1
+    return frames, max_drift, max_burst, 0
+
+
+def main():
+    print(f"Simulating {HOURS}h of {FRAME_NS / 1e6:.0f}ms frames ({TOTAL_NS // FRAME_NS:,} frames)\n")
+    print(f"{'schedule':<14}{'frames':>12}{'max drift':>12}{'max burst':>12}{'skipped':>10}{'cpu s':>8}")
+    results = {}
+    for name, run in (("time.time", run_wall_clock), ("MediaClock", run_media_clock)):
+        start = time.process_time()
+        frames, drift, burst, skipped = results[name] = run()
+        elapsed = time.process_time() - start
+        print(f"{name:<14}{frames:>12,}{drift / 1e6:>10.1f}ms{burst:>12}{skipped:>10}{elapsed:>8.1f}")
+
+    _, drift, _, _ = results["MediaClock"]
+    if drift > DRIFT_BOUND_NS:
+        print(f"\nFAIL: MediaClock drift {drift / 1e6:.1f}ms exceeds {DRIFT_BOUND_NS / 1e6:.0f}ms")
+        sys.exit(1)
+    print(f"\nOK: MediaClock drift stayed within {DRIFT_BOUND_NS / 1e6:.0f}ms over {HOURS}h")
+
+
+if __name__ == "__main__":
+    main()
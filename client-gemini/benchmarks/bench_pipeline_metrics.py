@@ -0,0 +1,107 @@
+# benchmarks/bench_pipeline_metrics.py
+"""
+Cost of the per-stage pipeline metrics, and what they show for one call.
+
+1. `PipelineMetrics.observe` in a tight loop, and what that adds up to at
+   the ~300 observations a second one talking call makes.
+2. A call against the local stand-in Live server
+   (benchmarks/fake_live_server.py): wake word for the first seconds, then
+   the caller talks and gets replies, played out by a real GeminiOutputTrack.
+   The stage histograms are then read back from a MetricsServer over HTTP,
+   the way a dashboard would.
+
+Run from the client-gemini folder:
+    python -m benchmarks.bench_pipeline_metrics [--seconds 8]
+"""
+import argparse
+import asyncio
+import logging
+import time
+import aiohttp
+from app.config.constants import CONF_CHAT_MODEL
+from app.llm.gemini import GeminiClientManager, build_live_config
+from app.llm.live_pool import LiveSessionPool
+from app.llm.handle_store import SessionHandleStore
+from app.metrics.loop_lag import get_loop_lag_monitor, close_loop_lag_monitor
+from app.metrics.pipeline import PipelineMetrics
+from app.metrics.server import MetricsServer
+from app.models.gemini_track import GeminiOutputTrack
+from app.wakeword.engine import get_wakeword_engine, shutdown_wakeword_engine
+from benchmarks.bench_live_pool import CallerTrack
+from benchmarks.fake_live_server import FakeLiveServer
+
+PORT = 9499
+OBSERVATIONS_PER_S = 300  # resample + frame emit at 50/s each, wake word, uplink, replies
+
+
+def observe_cost(n=1_000_000):
+    metrics = PipelineMetrics()
+    started = time.perf_counter()
+    for i in range(n):
+        metrics.observe("resample", 0.0002)
+    return (time.perf_counter() - started) / n
+
+
+async def play(track):
+    while True:
+        await track.recv()
+
+
+async def run_call(seconds):
+    server = await FakeLiveServer(rtt_ms=60, setup_ms=250, reply_ms=1500).start()
+    client = server.client()
+    pool = LiveSessionPool(lambda: client.aio.live.connect(model=CONF_CHAT_MODEL, config=build_live_config()))
+    store = SessionHandleStore(":memory:")
+    manager = GeminiClientManager("bench", genai_client=client, live_pool=pool, handle_store=store)
+    track = GeminiOutputTrack(manager.playback_buffer)
+    monitor = get_loop_lag_monitor()
+    monitor.start()
+    metrics_server = MetricsServer(lambda: {"loop_lag": monitor.stats(), "sessions": {"bench": manager.metrics.stats()}},
+                                   "127.0.0.1", PORT)
+    await metrics_server.start()
+
+    session = asyncio.create_task(manager.start_session(CallerTrack()))
+    player = asyncio.create_task(play(track))
+    await asyncio.sleep(2)
+    manager.is_wake.set()  # past the wake word: the caller talks to the assistant
+    await asyncio.sleep(seconds)
+
+    async with aiohttp.ClientSession() as http:
+        started = time.perf_counter()
+        async with http.get(f"http://127.0.0.1:{PORT}/metrics") as response:
+            body = await response.json()
+        fetch_ms = (time.perf_counter() - started) * 1000
+
+    player.cancel()
+    await manager.stop_session()
+    await session
+    await metrics_server.close()
+    await close_loop_lag_monitor()
+    await store.close()
+    await server.close()
+    return body, fetch_ms
+
+
+async def main(seconds):
+    logging.basicConfig(level=logging.ERROR)
+    cost = observe_cost()
+    print(f"observe: {cost * 1e9:.0f}ns each, {100 * cost * OBSERVATIONS_PER_S:.3f}% of a core "
+          f"at {OBSERVATIONS_PER_S} observations/s per call\n")
+
+    await asyncio.to_thread(get_wakeword_engine)
+    body, fetch_ms = await run_call(seconds)
+    shutdown_wakeword_engine()
+
+    print(f"one call, 2s of wake word then {seconds}s talking; GET /metrics took {fetch_ms:.1f}ms\n")
+    print(f"{'stage':<18}{'count':>7}{'mean':>10}{'p50 <=':>10}{'p95 <=':>10}{'max':>10}")
+    stages = body["sessions"]["bench"] | {"event loop lag": body["loop_lag"]}
+    for stage, stats in stages.items():
+        print(f"{stage:<18}{stats['count']:>7}{stats['mean_ms']:>8.2f}ms{stats['p50_ms']:>8.3g}ms"
+              f"{stats['p95_ms']:>8.3g}ms{stats['max_ms']:>8.3g}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.seconds))
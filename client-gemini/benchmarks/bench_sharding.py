@@ -0,0 +1,158 @@
+# benchmarks/bench_sharding.py
+"""
+Calls served on time by one process vs a SessionSupervisor with N workers.
+
+`--calls` calls are offered at once through the supervisor's routing, the
+way newCall events arrive from signaling. Each worker hosts its calls in a
+SyntheticHost: every 20ms audio tick costs `--call-cpu-ms` of event-loop
+time (Opus, resampling, wake word... lumped together) and a tick that runs
+more than a frame late is counted as late. Each call answers through the
+worker's WorkerSignalingClient, so the relay to the socket is timed too.
+
+"capacity" is ticks processed per second divided by the 50 a call needs:
+how many calls' worth of audio the box actually kept up with. It should
+grow with workers until they run out of cores. "late" is the share of
+ticks that missed their frame; once a worker is over capacity its calls
+fall behind and stay behind.
+
+Run from the client-gemini folder:
+    python -m benchmarks.bench_sharding [--workers 1,2,4] [--calls 16] [--call-cpu-ms 5]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+import numpy as np
+from app.config.constants import SHARD_STATS_INTERVAL_S
+from app.core.sharding import SessionSupervisor
+
+TICK_S = 0.02
+
+
+class SyntheticHost:
+    """Stands in for ShardApp: runs each routed call as a CPU-bound 20ms tick loop."""
+
+    def __init__(self, signaling_client, call_s=5.0, cpu_ms=5.0):
+        self.signaling_client = signaling_client
+        self.call_s = call_s
+        self.cpu_s = cpu_ms / 1000
+        self.calls = {}
+        self.ticks = 0
+        self.late = 0
+        signaling_client.on_new_call_callback = self.handle_incoming_call
+        signaling_client.on_call_ended_callback = lambda data: self.hang_up(data["senderId"])
+
+    async def start(self):
+        pass
+
+    async def shutdown(self):
+        for task in self.calls.values():
+            task.cancel()
+
+    async def handle_incoming_call(self, data):
+        caller_id = data["callerId"]
+        await self.signaling_client.emit("answerCall", {"callerId": caller_id, "sent_at": data["sent_at"]})
+        self.calls[caller_id] = asyncio.current_task()
+        try:
+            await self._run_call()
+        finally:
+            del self.calls[caller_id]
+            self.signaling_client.report("ended", caller_id)
+
+    async def _run_call(self):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        n = 0
+        while loop.time() - started < self.call_s:
+            n += 1
+            due = started + n * TICK_S
+            await asyncio.sleep(max(0, due - loop.time()))
+            self.ticks += 1
+            if loop.time() - due > TICK_S:
+                self.late += 1
+            busy_until = time.perf_counter() + self.cpu_s
+            while time.perf_counter() < busy_until:
+                pass
+
+    async def hang_up(self, caller_id):
+        task = self.calls.get(caller_id)
+        if task:
+            task.cancel()
+
+    def stats(self):
+        return {"active": len(self.calls), "ticks": self.ticks, "late": self.late}
+
+
+class HostFactory:
+    """Picklable factory handing the benchmark's settings to every worker."""
+
+    def __init__(self, call_s, cpu_ms):
+        self.call_s = call_s
+        self.cpu_ms = cpu_ms
+
+    def __call__(self, signaling_client):
+        return SyntheticHost(signaling_client, self.call_s, self.cpu_ms)
+
+
+class FakeSignaling:
+    """The supervisor's socket: records how long answers took to come back."""
+
+    def __init__(self):
+        self.on_connect_callback = None
+        self.on_new_call_callback = None
+        self.on_call_answered_callback = None
+        self.on_ice_candidate_callback = None
+        self.on_call_ended_callback = None
+        self.relay_ms = []
+
+    async def emit(self, event, data):
+        self.relay_ms.append((time.time() - data["sent_at"]) * 1000)
+
+    async def send_hangup(self, target_id, reason=None):
+        pass
+
+    async def disconnect(self):
+        pass
+
+
+async def run(workers, args):
+    signaling = FakeSignaling()
+    supervisor = SessionSupervisor(workers, signaling_client=signaling,
+                                   host_factory=HostFactory(args.call_s, args.call_cpu_ms),
+                                   log_level=logging.WARNING)
+    await supervisor.start()
+    for n in range(args.calls):
+        await signaling.on_new_call_callback({"callerId": f"caller-{n}", "rtcMessage": None, "sent_at": time.time()})
+    spread = sorted(supervisor.stats()["workers"][i]["calls"] for i in range(workers))
+    while supervisor.routes:
+        await asyncio.sleep(0.1)
+    # Let every worker send the stats that include its last tick
+    await asyncio.sleep(2 * SHARD_STATS_INTERVAL_S)
+    ticks = sum(stats["ticks"] for stats in supervisor.worker_stats)
+    late = sum(stats["late"] for stats in supervisor.worker_stats)
+    await supervisor.shutdown()
+
+    capacity = ticks / args.call_s / (1 / TICK_S)
+    print(f"{workers:>7}{'/'.join(map(str, spread)):>12}{capacity:>10.1f}{100 * late / max(1, ticks):>9.1f}%"
+          f"{np.percentile(signaling.relay_ms, 50):>11.1f}ms")
+    return capacity
+
+
+async def main(args):
+    logging.basicConfig(level=logging.ERROR)
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    print(f"{args.calls} calls for {args.call_s}s, {args.call_cpu_ms}ms per 20ms tick "
+          f"(one core carries ~{20 / args.call_cpu_ms:.0f}), {cores} core(s)\n")
+    print(f"{'workers':>7}{'calls each':>12}{'capacity':>10}{'late':>10}{'relay p50':>13}")
+    for workers in args.workers:
+        await run(workers, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=lambda s: [int(n) for n in s.split(",")], default=[1, 2, 4])
+    parser.add_argument("--calls", type=int, default=16)
+    parser.add_argument("--call-s", type=float, default=5)
+    parser.add_argument("--call-cpu-ms", type=float, default=5)
+    asyncio.run(main(parser.parse_args()))
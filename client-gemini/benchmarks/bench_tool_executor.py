@@ -0,0 +1,98 @@
+# benchmarks/bench_tool_executor.py
+"""
+Sequential in-loop tool dispatch vs ToolExecutor.
+
+One tool_call message carries three calls: two Home Assistant-like calls
+(150ms and 300ms) and one that hangs. "receive blocked" is how long the
+receive loop is stuck before it can read the next message (audio);
+"responses" is when the model gets its answers.
+
+Run from the client-gemini folder:
+    python -m benchmarks.bench_tool_executor
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+from app.tools.executor import ToolExecutor
+from app.tools.registry import ToolRegistry
+
+DEADLINE_S = 1.0
+
+registry = ToolRegistry()
+
+
+@registry.register("lights", timeout_s=2)
+async def lights(context):
+    await asyncio.sleep(0.15)
+    return 200
+
+
+@registry.register("thermostat", timeout_s=2)
+async def thermostat(context):
+    await asyncio.sleep(0.3)
+    return 200
+
+
+@registry.register("stuck", timeout_s=5)
+async def stuck(context):
+    await asyncio.sleep(3600)
+
+
+@registry.register("slow_report", timeout_s=2, non_blocking=True)
+async def slow_report(context):
+    await asyncio.sleep(0.5)
+    return "done"
+
+
+def calls(*names):
+    return [SimpleNamespace(id=f"{name}-{i}", name=name, args=None) for i, name in enumerate(names)]
+
+
+def describe(responses):
+    return ", ".join(f"{r.name}={'error' if 'error' in r.response else 'ok'}" for r in responses)
+
+
+async def sequential(function_calls):
+    # The old receive-loop behaviour: each call awaited in turn, no deadline
+    responses = []
+    for fc in function_calls:
+        tool = registry.get(fc.name)
+        try:
+            result = {"result": await asyncio.wait_for(tool.handler(None), tool.timeout_s)}
+        except asyncio.TimeoutError:
+            result = {"error": "timeout"}
+        responses.append(SimpleNamespace(name=fc.name, response=result))
+    return responses
+
+
+async def main():
+    batch = calls("lights", "thermostat", "stuck")
+
+    started = time.perf_counter()
+    responses = await sequential(batch)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"{'sequential (old)':<18}receive blocked {elapsed:>6.0f}ms, responses after {elapsed:>6.0f}ms: {describe(responses)}")
+
+    sent = []
+
+    async def send(responses, origin):
+        sent.append((time.perf_counter(), responses))
+
+    executor = ToolExecutor(registry, None, send, deadline_s=DEADLINE_S)
+    started = time.perf_counter()
+    executor.submit(batch + calls("slow_report"))
+    blocked = (time.perf_counter() - started) * 1000
+    await asyncio.sleep(DEADLINE_S + 0.2)
+    for at, responses in sent:
+        print(f"{'ToolExecutor':<18}receive blocked {blocked:>6.0f}ms, responses after "
+              f"{(at - started) * 1000:>6.0f}ms: {describe(responses)}")
+    await executor.close()
+
+    print("\nper-tool latency:")
+    for name, stats in executor.stats().items():
+        print(f"  {name:<12} n={stats['count']} p50<={stats['p50_ms']:.0f}ms max={stats['max_ms']:.0f}ms "
+              f"timeouts={stats['timeouts']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
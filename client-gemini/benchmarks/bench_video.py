@@ -0,0 +1,151 @@
+# benchmarks/bench_video.py
+"""
+Per-call CPU of the caller's video track.
+
+A caller camera is replayed as pre-encoded VP8 (640x480, 30fps, a moving
+test pattern) into a track that decodes it on its own thread and queues
+the frames, the way aiortc's RTCRtpReceiver feeds a RemoteStreamTrack.
+Process CPU time over `--seconds` is measured for:
+
+- drain:    the previous `_drain_track`, every frame decoded and discarded
+- sampler:  VideoFrameSampler at VIDEO_SAMPLE_FPS, JPEGs sent to a sink
+- declined: VIDEO_ENABLED = False; the answer marks video inactive (checked
+            against a real aiortc offer) so the caller sends nothing
+
+Run from the client-gemini folder:
+    python -m benchmarks.bench_video [--seconds 10]
+"""
+import argparse
+import asyncio
+import threading
+import time
+from fractions import Fraction
+import av
+import numpy as np
+from aiortc import RTCPeerConnection, VideoStreamTrack
+from aiortc.contrib.media import MediaStreamError
+from app.config.constants import VIDEO_SAMPLE_FPS
+from app.core import webrtc
+from app.media.video import VideoFrameSampler, shutdown_video_encode_pool
+
+WIDTH, HEIGHT, FPS = 640, 480, 30
+
+
+def encode_camera(seconds=2):
+    """A moving test pattern as VP8 packets, looped by the caller."""
+    encoder = av.CodecContext.create("libvpx", "w")
+    encoder.width, encoder.height, encoder.pix_fmt = WIDTH, HEIGHT, "yuv420p"
+    encoder.time_base = Fraction(1, FPS)
+    encoder.bit_rate = 1_000_000
+    y, x = np.mgrid[0:HEIGHT, 0:WIDTH]
+    packets = []
+    for i in range(seconds * FPS):
+        rgb = np.stack([(x + 4 * i) % 256, (y + 2 * i) % 256, ((x + y) // 2 + i) % 256], axis=-1).astype(np.uint8)
+        frame = av.VideoFrame.from_ndarray(rgb, format="rgb24").reformat(format="yuv420p")
+        frame.pts = i
+        packets.extend(encoder.encode(frame))
+    packets.extend(encoder.encode(None))
+    return [bytes(p) for p in packets]
+
+
+class CameraTrack:
+    """Decodes the caller's VP8 on a thread at 30fps and queues frames, like aiortc's receiver."""
+    kind = "video"
+
+    def __init__(self, packets):
+        self.packets = packets
+        self.queue = asyncio.Queue()
+        self.loop = asyncio.get_running_loop()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._decode, daemon=True)
+        self.thread.start()
+
+    def _decode(self):
+        decoder = av.CodecContext.create("vp8", "r")
+        started = time.perf_counter()
+        n = 0
+        while not self.stopped.is_set():
+            packet = av.Packet(self.packets[n % len(self.packets)])
+            for frame in decoder.decode(packet):
+                self.loop.call_soon_threadsafe(self.queue.put_nowait, frame)
+            n += 1
+            time.sleep(max(0, started + n / FPS - time.perf_counter()))
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, None)
+
+    async def recv(self):
+        frame = await self.queue.get()
+        if frame is None:
+            raise MediaStreamError
+        return frame
+
+    def stop(self):
+        self.stopped.set()
+
+
+async def drain(track):
+    # What start_video_processing used to do with the caller's camera
+    try:
+        while True:
+            await track.recv()
+    except MediaStreamError:
+        pass
+
+
+async def answer_direction():
+    """Offers audio + video from a real peer and returns what our answer says about video."""
+    caller = RTCPeerConnection()
+    caller.addTrack(VideoStreamTrack())
+    callee_manager = webrtc.WebRTCManager(playback_buffer=None, output_track=lambda buffer: VideoStreamTrack())
+    await caller.setLocalDescription(await caller.createOffer())
+    await callee_manager.handle_remote_offer({"sdp": caller.localDescription.sdp, "type": "offer"})
+    sdp = callee_manager.pc.localDescription.sdp
+    video = sdp[sdp.index("m=video"):]
+    direction = next(d for d in ("inactive", "recvonly", "sendrecv", "sendonly") if f"a={d}" in video)
+    await caller.close()
+    await callee_manager.close()
+    return direction
+
+
+async def measure(packets, seconds, consume):
+    track = CameraTrack(packets) if packets else None
+    cpu, wall = time.process_time(), time.perf_counter()
+    task = asyncio.create_task(consume(track)) if track else None
+    await asyncio.sleep(seconds)
+    used = (time.process_time() - cpu) / (time.perf_counter() - wall)
+    if track:
+        track.stop()
+        await task
+    return used
+
+
+async def main(seconds):
+    packets = encode_camera()
+    sent = []
+
+    async def sink(jpeg):
+        sent.append(len(jpeg))
+
+    sampler = VideoFrameSampler(sink)
+    results = [
+        ("drain (before)", await measure(packets, seconds, drain)),
+        (f"sampler {VIDEO_SAMPLE_FPS}fps", await measure(packets, seconds, sampler.run)),
+    ]
+    webrtc.VIDEO_ENABLED = False
+    direction = await answer_direction()
+    results.append((f"declined ({direction})", await measure(None, seconds, None)))
+
+    print(f"caller camera {WIDTH}x{HEIGHT} VP8 @ {FPS}fps, {seconds}s per mode\n")
+    print(f"{'video stage':<22}{'CPU per call':>14}")
+    for label, used in results:
+        print(f"{label:<22}{100 * used:>13.1f}%")
+    stats = sampler.stats()
+    print(f"\nsampler: {stats['frames_received']} frames decoded, {stats['frames_sent']} sent, "
+          f"{stats['kib_sent'] / max(1, stats['frames_sent']):.1f} KiB per JPEG, encode {stats['encode_ms_mean']:.1f}ms")
+    shutdown_video_encode_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.seconds))
@@ -0,0 +1,67 @@
+# benchmarks/bench_wake_buffer.py
+"""
+Compares the old np.concatenate wake-word accumulator with PCMRingBuffer
+over one minute of idle (sleep mode) audio.
+
+Run from the client-gemini folder:
+    python -m benchmarks.bench_wake_buffer
+"""
+import time
+import tracemalloc
+import numpy as np
+from app.media.ring_buffer import PCMRingBuffer
+from app.llm.gemini import WAKE_BUFFER, WAKE_RING_CAPACITY
+
+FRAME_SAMPLES = 320            # 20ms @ 16kHz, what AudioResampler hands us
+FRAMES_PER_MINUTE = 60 * 50
+
+
+def concatenate_accumulator(frames):
+    wake_buffer = np.array([], dtype=np.int16)
+    for audio_np in frames:
+        wake_buffer = np.concatenate((wake_buffer, audio_np))
+        while len(wake_buffer) >= WAKE_BUFFER:
+            chunk = wake_buffer[:WAKE_BUFFER]
+            wake_buffer = wake_buffer[WAKE_BUFFER:]
+            yield chunk
+
+
+def ring_accumulator(frames):
+    wake_buffer = PCMRingBuffer(WAKE_RING_CAPACITY)
+    for audio_np in frames:
+        wake_buffer.write(audio_np)
+        while (chunk := wake_buffer.read(WAKE_BUFFER)) is not None:
+            yield chunk
+
+
+def measure(accumulator, frames):
+    # CPU time, without tracemalloc overhead
+    start = time.process_time()
+    chunks = sum(1 for _ in accumulator(frames))
+    cpu = time.process_time() - start
+
+    # Allocations: sum of the transient memory peaks between consecutive chunks
+    tracemalloc.start()
+    allocated = 0
+    baseline = 0
+    for _ in accumulator(frames):
+        current, peak = tracemalloc.get_traced_memory()
+        allocated += peak - baseline
+        tracemalloc.reset_peak()
+        baseline = current
+    tracemalloc.stop()
+    return chunks, cpu, allocated
+
+
+def main():
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(-200, 200, FRAME_SAMPLES, dtype=np.int16) for _ in range(FRAMES_PER_MINUTE)]
+
+    print(f"{'accumulator':<14}{'chunks':>8}{'cpu ms/min':>12}{'KiB alloc/min':>15}")
+    for name, accumulator in (("concatenate", concatenate_accumulator), ("ring", ring_accumulator)):
+        chunks, cpu, allocated = measure(accumulator, frames)
+        print(f"{name:<14}{chunks:>8}{cpu * 1000:>12.2f}{allocated / 1024:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# benchmarks/bench_wakeword_engines.py
+"""
+CPU cost per idle (sleeping) session for the pooled and batched wake word
+engines at 1, 10 and 50 concurrent sessions.
+
+Every session feeds WAKE_BUFFER chunks of low-level noise, as fast as the
+engine accepts them, for AUDIO_SECONDS of audio. CPU is process time, so
+it includes ONNX runtime and thread-pool work.
+
+Run from the client-gemini folder:
+    python -m benchmarks.bench_wakeword_engines
+"""
+import asyncio
+import time
+import numpy as np
+from app.llm.gemini import WAKE_BUFFER
+from app.config.constants import GEMINI_SAMPLE_RATE
+from app.wakeword.engine import create_wakeword_engine
+
+SESSION_COUNTS = (1, 10, 50)
+AUDIO_SECONDS = 10
+
+
+async def run_session(engine, chunks):
+    stream = engine.new_stream()
+    for chunk in chunks:
+        await engine.predict(stream, chunk)
+
+
+async def measure(engine, sessions, chunks):
+    start_cpu, start_wall = time.process_time(), time.perf_counter()
+    await asyncio.gather(*(run_session(engine, chunks) for _ in range(sessions)))
+    cpu, wall = time.process_time() - start_cpu, time.perf_counter() - start_wall
+    return cpu, wall
+
+
+async def main():
+    rng = np.random.default_rng(0)
+    n_chunks = AUDIO_SECONDS * GEMINI_SAMPLE_RATE // WAKE_BUFFER
+    chunks = [rng.normal(0, 200, WAKE_BUFFER).astype(np.int16) for _ in range(n_chunks)]
+
+    print(f"{'engine':<9}{'sessions':>9}{'cpu %/session':>15}{'wall s':>9}")
+    for name in ("pooled", "batched"):
+        engine = create_wakeword_engine(name)
+        for sessions in SESSION_COUNTS:
+            cpu, wall = await measure(engine, sessions, chunks)
+            # CPU seconds spent per second of audio, per session
+            per_session = cpu / (AUDIO_SECONDS * sessions) * 100
+            print(f"{name:<9}{sessions:>9}{per_session:>15.2f}{wall:>9.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
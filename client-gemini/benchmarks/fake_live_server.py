@@ -0,0 +1,293 @@
+# benchmarks/fake_live_server.py
+"""
+Local stand-in for the Gemini Live API websocket.
+
+Speaks enough of BidiGenerateContent for google-genai's `aio.live.connect`
+to work against it: waits `rtt_ms` before the websocket handshake and
+`setup_ms` before setupComplete (what TLS + a far-away endpoint + session
+setup cost in production - assumptions, tune them to your link), then
+answers realtime audio with an audio reply of `reply_ms`, streamed in
+real time, one at a time. `go_away_after_s` sends goAway like the real
+service does before it drops a connection.
+
+By default a reply starts as soon as audio arrives and none is playing.
+With `end_of_speech_ms` the server waits, like Gemini's own VAD, until the
+caller has been quiet that long after speaking. `latency_ms` (plus up to
+`jitter_ms` at random) delays every message in both directions, in order.
+
+Replies play `reply_pcm` (24kHz s16 mono, see `pcm_from_file`) or a tone.
+`script` is a list of turns, used in order and then repeated; each is a
+dict with any of:
+
+    reply_ms            length of this reply's audio
+    tool_call           {"name": ..., "args": {...}}: sent before the audio,
+                        which waits for the client's toolResponse
+    interrupt_after_ms  stop the reply there with serverContent.interrupted
+    go_away             send goAway once the turn is over
+
+The SDK only speaks wss:// when an API key is set, so the server runs TLS
+with a throwaway self-signed certificate; `client()` builds a genai
+client that trusts it.
+"""
+import asyncio
+import base64
+import datetime
+import itertools
+import json
+import logging
+import random
+import ssl
+import tempfile
+import time
+import av
+import numpy as np
+import websockets
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from google import genai
+from app.config.constants import GEMINI_WEBRTC_SAMPLE_RATE, GEMINI_API_VERSION
+
+REPLY_CHUNK_MS = 100
+SPEECH_RMS = 300  # caller audio louder than this counts as speech for end_of_speech_ms
+TOOL_RESPONSE_TIMEOUT_S = 15
+SERVER_LOGGER = logging.getLogger("fake_live_server")
+SERVER_LOGGER.setLevel(logging.CRITICAL)  # clients hanging up mid-handshake is expected here
+
+
+def _self_signed_context():
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1)).not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName("localhost")]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+    with tempfile.NamedTemporaryFile(suffix=".pem") as pem:
+        pem.write(cert.public_bytes(serialization.Encoding.PEM))
+        pem.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                    serialization.NoEncryption()))
+        pem.flush()
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(pem.name)
+    return context
+
+
+def pcm_from_file(path, rate=GEMINI_WEBRTC_SAMPLE_RATE):
+    """Decodes any audio file into the s16 mono PCM Gemini replies with."""
+    resampler = av.AudioResampler(format="s16", layout="mono", rate=rate)
+    pcm = bytearray()
+    with av.open(path) as container:
+        for frame in container.decode(audio=0):
+            for resampled in resampler.resample(frame):
+                pcm += resampled.to_ndarray().tobytes()
+    return bytes(pcm)
+
+
+def client_for(port):
+    """A genai client pointed at a FakeLiveServer on `port`, e.g. one run by another process."""
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return genai.Client(api_key="fake", http_options={
+        "base_url": f"https://localhost:{port}",
+        "api_version": GEMINI_API_VERSION,
+        "async_client_args": {"ssl": context},
+    })
+
+
+class _Connection:
+    """One client websocket, with its delayed outbound and inbound queues."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.outbound = asyncio.Queue()
+        self.inbound = asyncio.Queue()
+        self.tool_responses = asyncio.Queue()
+        self.speech_at = None     # arrival of the latest loud caller chunk
+        self.awaiting_reply = False
+        self.replying = None
+
+
+class FakeLiveServer:
+    def __init__(self, rtt_ms=60, setup_ms=250, reply_delay_ms=300, reply_ms=200, go_away_after_s=None,
+                 latency_ms=0, jitter_ms=0, end_of_speech_ms=None, reply_pcm=None, script=None):
+        self.rtt = rtt_ms / 1000
+        self.setup = setup_ms / 1000
+        self.reply_delay = reply_delay_ms / 1000
+        self.reply_ms = reply_ms
+        self.go_away_after_s = go_away_after_s
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.end_of_speech = end_of_speech_ms / 1000 if end_of_speech_ms else None
+        self.script = itertools.cycle(script or [{}])
+        self.connections = 0
+        self.open_connections = 0
+        self.resumed = 0
+        self.handles_issued = 0
+        self.audio_chunks_received = 0
+        self.audio_bytes_received = 0
+        self.reply_bytes_sent = 0
+        self.turns = 0
+        self.tool_calls_sent = 0
+        self.tool_responses_received = 0
+        self.interruptions_sent = 0
+        self.lifetimes = []
+        self._server = None
+        self.port = None
+        chunk_samples = GEMINI_WEBRTC_SAMPLE_RATE * REPLY_CHUNK_MS // 1000
+        if reply_pcm is None:
+            tone = 3000 * np.sin(2 * np.pi * 440 * np.arange(chunk_samples) / GEMINI_WEBRTC_SAMPLE_RATE)
+            reply_pcm = tone.astype(np.int16).tobytes()
+        # The canned reply, cut into base64 chunks once; replies loop over them
+        chunk_bytes = chunk_samples * 2
+        reply_pcm = reply_pcm[:len(reply_pcm) - len(reply_pcm) % chunk_bytes] or bytes(chunk_bytes)
+        self.reply_chunk_bytes = chunk_bytes
+        self.reply_chunks = [base64.b64encode(reply_pcm[i:i + chunk_bytes]).decode()
+                             for i in range(0, len(reply_pcm), chunk_bytes)]
+
+    async def start(self):
+        async def delay_handshake(connection, request):
+            await asyncio.sleep(self.rtt)  # TCP + TLS round trips to a remote endpoint
+
+        self._server = await websockets.serve(self._handle, "127.0.0.1", 0, ssl=_self_signed_context(),
+                                              process_request=delay_handshake, max_size=None,
+                                              logger=SERVER_LOGGER)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def client(self):
+        """A genai client pointed at this server."""
+        return client_for(self.port)
+
+    def _delay(self):
+        return self.latency + random.uniform(0, self.jitter)
+
+    async def _send(self, conn, message):
+        """Queues a message for the client, `latency_ms` (+ jitter) from now."""
+        await conn.outbound.put((time.monotonic() + self._delay(), json.dumps(message)))
+
+    async def _run_outbound(self, conn):
+        while True:
+            due, raw = await conn.outbound.get()
+            await asyncio.sleep(due - time.monotonic())
+            await conn.ws.send(raw)
+
+    async def _handle(self, ws):
+        self.connections += 1
+        self.open_connections += 1
+        opened = time.monotonic()
+        conn = _Connection(ws)
+        tasks = []
+        try:
+            setup = json.loads(await ws.recv()).get("setup", {})
+            if (setup.get("sessionResumption") or {}).get("handle"):
+                self.resumed += 1
+            await asyncio.sleep(self.setup)
+            await ws.send(json.dumps({"setupComplete": {}}))
+
+            tasks.append(asyncio.create_task(self._run_outbound(conn)))
+            tasks.append(asyncio.create_task(self._run_inbound(conn)))
+            if self.go_away_after_s:
+                tasks.append(asyncio.create_task(self._go_away(conn, self.go_away_after_s)))
+            if self.end_of_speech:
+                tasks.append(asyncio.create_task(self._take_turns(conn)))
+            async for raw in ws:
+                await conn.inbound.put((time.monotonic() + self._delay(), raw))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for task in tasks + [conn.replying]:
+                if task:
+                    task.cancel()
+            await asyncio.gather(*[task for task in tasks + [conn.replying] if task], return_exceptions=True)
+            self.open_connections -= 1
+            self.lifetimes.append(time.monotonic() - opened)
+
+    async def _run_inbound(self, conn):
+        while True:
+            due, raw = await conn.inbound.get()
+            await asyncio.sleep(due - time.monotonic())
+            message = json.loads(raw)
+            if "toolResponse" in message or "tool_response" in message:
+                self.tool_responses_received += 1
+                conn.tool_responses.put_nowait(message)
+                continue
+            realtime_input = message.get("realtimeInput") or message.get("realtime_input")
+            if not realtime_input:
+                continue
+            self.audio_chunks_received += 1
+            for chunk in realtime_input.get("mediaChunks") or realtime_input.get("media_chunks") or []:
+                data = chunk["data"]
+                # The SDK sends unpadded url-safe base64
+                self.audio_bytes_received += len(data.rstrip("=")) * 3 // 4
+                if self.end_of_speech and chunk.get("mimeType", chunk.get("mime_type", "")).startswith("audio"):
+                    pcm = np.frombuffer(base64.urlsafe_b64decode(data + "=" * (-len(data) % 4)), dtype=np.int16)
+                    if len(pcm) and np.sqrt(np.mean(pcm.astype(np.float32) ** 2)) > SPEECH_RMS:
+                        conn.speech_at = time.monotonic()
+                        conn.awaiting_reply = True
+            if not self.end_of_speech and (conn.replying is None or conn.replying.done()):
+                conn.replying = asyncio.create_task(self._reply(conn))
+
+    async def _take_turns(self, conn):
+        """Starts a reply once the caller has been quiet for `end_of_speech_ms` after speaking."""
+        while True:
+            await asyncio.sleep(0.01)
+            if (conn.awaiting_reply and time.monotonic() - conn.speech_at >= self.end_of_speech
+                    and (conn.replying is None or conn.replying.done())):
+                conn.awaiting_reply = False
+                conn.replying = asyncio.create_task(self._reply(conn))
+
+    async def _reply(self, conn):
+        turn = next(self.script)
+        self.turns += 1
+        await asyncio.sleep(self.reply_delay)
+        try:
+            if tool_call := turn.get("tool_call"):
+                self.tool_calls_sent += 1
+                await self._send(conn, {"toolCall": {"functionCalls": [
+                    {"id": f"call-{self.tool_calls_sent}", "name": tool_call["name"], "args": tool_call.get("args", {})}
+                ]}})
+                try:
+                    await asyncio.wait_for(conn.tool_responses.get(), TOOL_RESPONSE_TIMEOUT_S)
+                except asyncio.TimeoutError:
+                    pass
+            self.handles_issued += 1
+            await self._send(conn, {"sessionResumptionUpdate": {"newHandle": f"handle-{self.handles_issued}",
+                                                                "resumable": True}})
+            chunks = max(1, turn.get("reply_ms", self.reply_ms) // REPLY_CHUNK_MS)
+            interrupt_at = turn.get("interrupt_after_ms")
+            for i in range(chunks):
+                if interrupt_at is not None and i * REPLY_CHUNK_MS >= interrupt_at:
+                    self.interruptions_sent += 1
+                    await self._send(conn, {"serverContent": {"interrupted": True}})
+                    return
+                if i:
+                    await asyncio.sleep(REPLY_CHUNK_MS / 1000)
+                await self._send(conn, {"serverContent": {"modelTurn": {"parts": [
+                    {"inlineData": {"mimeType": f"audio/pcm;rate={GEMINI_WEBRTC_SAMPLE_RATE}",
+                                    "data": self.reply_chunks[i % len(self.reply_chunks)]}}
+                ]}}})
+                self.reply_bytes_sent += self.reply_chunk_bytes
+            await self._send(conn, {"serverContent": {"turnComplete": True}})
+            if turn.get("go_away"):
+                await self._go_away(conn, 0)
+        except websockets.ConnectionClosed:
+            pass
+
+    async def _go_away(self, conn, after_s):
+        await asyncio.sleep(after_s)
+        try:
+            await self._send(conn, {"goAway": {"timeLeft": "5s"}})
+            await asyncio.sleep(5 + self.latency)
+            await conn.ws.close()
+        except websockets.ConnectionClosed:
+            pass
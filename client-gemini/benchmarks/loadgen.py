@@ -0,0 +1,319 @@
+# benchmarks/loadgen.py
+"""
+Synthetic callers against a running signalling server and client-gemini.
+
+Each caller is a headless aiortc peer with its own Socket.IO connection,
+registered under its own callerId. It does what the phone app does: emits
+`call` to the main ID with its offer, trickles its ICE candidates as
+`ICEcandidate` events, applies the answer from `callAnswered`, and then
+streams a WAV file (test.wav by default) in a loop while it listens to the
+reply track. A `callEnded` (e.g. reason "busy" from admission control) ends
+the caller.
+
+Concurrency is ramped through `--ramp` levels: at each level the missing
+callers are started `--spawn-interval-ms` apart, given `--settle-s` to
+connect and then measured for `--hold-s`. Per level the report has:
+
+- setup: `call` sent -> `callAnswered` received
+- ICE: `call` sent -> peer connection "connected"
+- packet loss: reply audio lost on the way in (our inbound RTP stats) and
+  caller audio lost on the way out (the host's receiver reports)
+- underruns: gaps of more than UNDERRUN_GAP_MS between reply frames
+- calls answered, rejected, and never answered within `--setup-timeout-s`
+- optionally client-gemini's own /metrics (admission, loop lag)
+
+The report is JSON with stable keys and rounded numbers, so two releases
+can be compared with a plain diff.
+
+Start the signalling server and client-gemini (`python main.py`), then
+from the client-gemini folder:
+    python -m benchmarks.loadgen --server http://127.0.0.1:3500 --ramp 1,2,4,8 \\
+        [--metrics-url http://127.0.0.1:9464/metrics] [--report loadgen-report.json]
+"""
+import argparse
+import asyncio
+import datetime
+import itertools
+import json
+import logging
+import subprocess
+import time
+import aiohttp
+import numpy as np
+import socketio
+from aiortc import RTCConfiguration, RTCPeerConnection, RTCSessionDescription
+from aiortc.mediastreams import MediaStreamError, MediaStreamTrack
+from aiortc.sdp import candidate_from_sdp
+from av.audio.frame import AudioFrame
+from benchmarks.fake_live_server import pcm_from_file
+
+CALLER_RATE = 48000
+FRAME_SAMPLES = CALLER_RATE // 50
+UNDERRUN_GAP_MS = 60  # two or more 20ms frames missing in a row
+REPORT_VERSION = 1
+
+
+class WavLoopTrack(MediaStreamTrack):
+    """Plays PCM in a loop, in real time, as 20ms frames."""
+    kind = "audio"
+
+    def __init__(self, pcm):
+        super().__init__()
+        self.frames = pcm[:len(pcm) - len(pcm) % FRAME_SAMPLES].reshape(-1, 1, FRAME_SAMPLES)
+        self.pts = 0
+        self.started = None
+
+    async def recv(self):
+        if self.readyState != "live":
+            raise MediaStreamError
+        if self.started is None:
+            self.started = time.perf_counter()
+        await asyncio.sleep(max(0, self.started + self.pts / CALLER_RATE - time.perf_counter()))
+        frame = AudioFrame.from_ndarray(self.frames[(self.pts // FRAME_SAMPLES) % len(self.frames)],
+                                        format="s16", layout="mono")
+        frame.sample_rate = CALLER_RATE
+        frame.pts = self.pts
+        self.pts += FRAME_SAMPLES
+        return frame
+
+
+def local_candidates(sdp):
+    """The candidates aiortc gathered into `sdp`, as the phone app would trickle them."""
+    candidates = []
+    m_index, mid = -1, None
+    for line in sdp.splitlines():
+        if line.startswith("m="):
+            m_index += 1
+            mid = None
+        elif line.startswith("a=mid:"):
+            mid = line[len("a=mid:"):]
+        elif line.startswith("a=candidate:"):
+            candidates.append({"candidate": line[len("a="):], "sdpMid": mid, "sdpMLineIndex": m_index})
+    return candidates
+
+
+class SyntheticCaller:
+    def __init__(self, caller_id, target_id, pcm):
+        self.caller_id = caller_id
+        self.target_id = target_id
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self.pc = RTCPeerConnection(RTCConfiguration(iceServers=[]))
+        self.pc.addTrack(WavLoopTrack(pcm))
+        self.called_at = None
+        self.setup_s = None
+        self.ice_s = None
+        self.ended_reason = None
+        self.frames_received = 0
+        self.underruns = 0
+        self._listener = None
+        self._wire()
+
+    def _wire(self):
+        @self.sio.on("callAnswered")
+        async def call_answered(data):
+            self.setup_s = time.perf_counter() - self.called_at
+            await self.pc.setRemoteDescription(RTCSessionDescription(**data["rtcMessage"]))
+
+        @self.sio.on("ICEcandidate")
+        async def ice_candidate(data):
+            message = data["rtcMessage"]
+            candidate = candidate_from_sdp(message["candidate"].split(":", 1)[1])
+            candidate.sdpMid, candidate.sdpMLineIndex = message.get("sdpMid"), message.get("sdpMLineIndex")
+            await self.pc.addIceCandidate(candidate)
+
+        @self.sio.on("callEnded")
+        async def call_ended(data):
+            if data.get("targetId") in (None, self.caller_id):
+                self.ended_reason = data.get("reason") or "hangup"
+                await self.pc.close()
+
+        @self.pc.on("connectionstatechange")
+        async def connection_state_change():
+            if self.pc.connectionState == "connected" and self.ice_s is None:
+                self.ice_s = time.perf_counter() - self.called_at
+            elif self.pc.connectionState == "failed" and self.ended_reason is None:
+                self.ended_reason = "ice_failed"
+
+        @self.pc.on("track")
+        def on_track(track):
+            self._listener = asyncio.ensure_future(self._listen(track))
+
+    @property
+    def active(self):
+        return self.ended_reason is None
+
+    async def start(self, server_url):
+        await self.sio.connect(f"{server_url}?callerId={self.caller_id}", transports=["websocket"])
+        await self.pc.setLocalDescription(await self.pc.createOffer())
+        self.called_at = time.perf_counter()
+        await self.sio.emit("call", {"calleeId": self.target_id, "rtcMessage": {
+            "type": self.pc.localDescription.type, "sdp": self.pc.localDescription.sdp}})
+        for candidate in local_candidates(self.pc.localDescription.sdp):
+            await self.sio.emit("ICEcandidate", {"calleeId": self.target_id, "rtcMessage": candidate})
+
+    async def _listen(self, track):
+        last = None
+        try:
+            while True:
+                await track.recv()
+                now = time.perf_counter()
+                if last is not None and (now - last) * 1000 > UNDERRUN_GAP_MS:
+                    self.underruns += 1
+                last = now
+                self.frames_received += 1
+        except MediaStreamError:
+            pass
+
+    async def counters(self):
+        """Cumulative RTP counters: reply packets received/lost, caller packets the host reported lost."""
+        counters = {"received": 0, "lost": 0, "sent": 0, "remote_lost": 0, "underruns": self.underruns}
+        if self.pc.connectionState != "connected":
+            return counters
+        for stats in (await self.pc.getStats()).values():
+            if stats.type == "inbound-rtp":
+                counters["received"] += stats.packetsReceived
+                counters["lost"] += max(0, stats.packetsLost)
+            elif stats.type == "outbound-rtp":
+                counters["sent"] += stats.packetsSent
+            elif stats.type == "remote-inbound-rtp":
+                counters["remote_lost"] += max(0, stats.packetsLost)
+        return counters
+
+    async def hang_up(self):
+        if self.active and self.sio.connected:
+            await self.sio.emit("hangupCall", {"targetId": self.target_id})
+            self.ended_reason = "hung_up"
+        await self.pc.close()
+        if self._listener:
+            self._listener.cancel()
+        if self.sio.connected:
+            await self.sio.disconnect()
+
+
+def percentiles(values_s):
+    values = [v * 1000 for v in values_s if v is not None]
+    if not values:
+        return {"count": 0, "p50_ms": None, "p95_ms": None, "max_ms": None}
+    return {"count": len(values), "p50_ms": round(float(np.percentile(values, 50)), 1),
+            "p95_ms": round(float(np.percentile(values, 95)), 1), "max_ms": round(max(values), 1)}
+
+
+def loss_percent(lost, total):
+    return round(100 * lost / total, 3) if total else None
+
+
+async def scrape(url):
+    try:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as http:
+            async with http.get(url) as response:
+                metrics = await response.json()
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        return {"error": str(e)}
+    admission = metrics.get("admission", {})
+    loop_lag = metrics.get("loop_lag", {})
+    return {
+        "admission": {key: admission.get(key) for key in ("active", "waiting", "admitted", "queued", "rejected", "overloaded")},
+        "loop_lag_p95_ms": loop_lag.get("p95_ms"),
+        "loop_lag_max_ms": round(loop_lag.get("max_ms", 0.0), 1),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_step(level, callers, new_caller, args):
+    started = []
+    while sum(caller.active for caller in callers) < level:
+        caller = new_caller()
+        callers.append(caller)
+        started.append(caller)
+        try:
+            await caller.start(args.server)
+        except (socketio.exceptions.ConnectionError, OSError) as e:
+            caller.ended_reason = f"signaling_error: {e}"
+        await asyncio.sleep(args.spawn_interval_ms / 1000)
+
+    deadline = time.perf_counter() + args.setup_timeout_s
+    while time.perf_counter() < deadline and any(c.active and c.ice_s is None for c in started):
+        await asyncio.sleep(0.1)
+    await asyncio.sleep(args.settle_s)
+
+    live = [caller for caller in callers if caller.active and caller.ice_s is not None]
+    before = [await caller.counters() for caller in live]
+    held = time.perf_counter()
+    await asyncio.sleep(args.hold_s)
+    held = time.perf_counter() - held
+    after = [await caller.counters() for caller in live]
+    delta = {key: sum(a[key] - b[key] for a, b in zip(after, before)) for key in before[0]} if live else {}
+
+    step = {
+        "target_calls": level,
+        "started": len(started),
+        "connected": sum(caller.active and caller.ice_s is not None for caller in callers),
+        "rejected": sum(caller.ended_reason == "busy" for caller in started),
+        "unanswered": sum(caller.active and caller.setup_s is None for caller in started),
+        "failed": sum(caller.ended_reason not in (None, "busy") for caller in started),
+        "setup": percentiles([caller.setup_s for caller in started]),
+        "ice": percentiles([caller.ice_s for caller in started]),
+        "downlink_loss_percent": loss_percent(delta.get("lost", 0), delta.get("lost", 0) + delta.get("received", 0)),
+        "uplink_loss_percent": loss_percent(delta.get("remote_lost", 0), delta.get("sent", 0)),
+        "underruns_per_call_min": round(delta.get("underruns", 0) / len(live) * 60 / held, 2) if live else None,
+    }
+    if args.metrics_url:
+        step["host"] = await scrape(args.metrics_url)
+    return step
+
+
+async def main(args):
+    logging.basicConfig(level=logging.ERROR)
+    pcm = np.frombuffer(pcm_from_file(args.wav, CALLER_RATE), dtype=np.int16)
+    ids = itertools.count(1)
+    run_id = datetime.datetime.now().strftime("%H%M%S")
+
+    def new_caller():
+        return SyntheticCaller(f"load-{run_id}-{next(ids)}", args.target, pcm)
+
+    report = {
+        "version": REPORT_VERSION,
+        "git_commit": git_commit(),
+        "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "config": {key: value for key, value in sorted(vars(args).items()) if key != "report"},
+        "steps": [],
+    }
+    callers = []
+    try:
+        for level in args.ramp:
+            step = await run_step(level, callers, new_caller, args)
+            report["steps"].append(step)
+            print(f"{level:>4} calls: {step['connected']} connected, {step['rejected']} rejected, "
+                  f"{step['unanswered']} unanswered, {step['failed']} failed; "
+                  f"setup p95 {step['setup']['p95_ms']}ms, ICE p95 {step['ice']['p95_ms']}ms, "
+                  f"loss {step['downlink_loss_percent']}% down / {step['uplink_loss_percent']}% up, "
+                  f"{step['underruns_per_call_min']} underruns/call/min")
+    finally:
+        await asyncio.gather(*(caller.hang_up() for caller in callers), return_exceptions=True)
+
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--server", default="http://127.0.0.1:3500", help="Signalling server URL")
+    parser.add_argument("--target", default="666666", help="Main ID client-gemini listens on")
+    parser.add_argument("--wav", default="test.wav")
+    parser.add_argument("--ramp", type=lambda s: [int(n) for n in s.split(",")], default=[1, 2, 4, 8])
+    parser.add_argument("--spawn-interval-ms", type=int, default=250)
+    parser.add_argument("--setup-timeout-s", type=float, default=15)
+    parser.add_argument("--settle-s", type=float, default=2)
+    parser.add_argument("--hold-s", type=float, default=20)
+    parser.add_argument("--metrics-url", help="client-gemini's /metrics, sampled at the end of every level")
+    parser.add_argument("--report", default="loadgen-report.json")
+    asyncio.run(main(parser.parse_args()))
@@ -2,10 +2,12 @@
 import asyncio
 import logging
 import argparse
+import os
 import sys
 from dotenv import load_dotenv
 from pathlib import Path
 from app.app import GeminiApp
+from app.core.sharding import SessionSupervisor
 
 sys.path.append(str(Path(__file__).resolve().parent))
 
@@ -26,12 +28,18 @@ def setup_logger(debug: bool):
 async def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--debug", action="store_true", help="Enable debug logging for app only")
+    parser.add_argument("--workers", type=int, help="Run as a supervisor spreading calls over this many "
+                        "worker processes (0 = one per core)")
     args = parser.parse_args()
 
     LOGGER = setup_logger(args.debug)
 
     load_dotenv()
-    app = GeminiApp()
+    if args.workers is not None:
+        workers = args.workers or os.cpu_count()
+        app = SessionSupervisor(workers, log_level=logging.DEBUG if args.debug else logging.INFO)
+    else:
+        app = GeminiApp()
 
     LOGGER.info("Starting Application...")
     await app.run()
@@ -0,0 +1,159 @@
+# tests/test_homeassistant_api.py
+import asyncio
+import socket
+import time
+from aiohttp import web
+from app.services.homeassistant_api import HomeAssistantClient
+
+
+class StubHomeAssistant:
+    """Local HA REST stub: records requests and the TCP connections they came on."""
+
+    def __init__(self):
+        self.requests = []
+        self.connections = set()
+        self.runner = None
+        self.base_url = None
+
+    async def service(self, request):
+        self.connections.add(request.transport.get_extra_info("peername"))
+        self.requests.append((request.match_info["service"], await request.json(), request.headers["Authorization"]))
+        await asyncio.sleep(0.01)
+        return web.json_response([])
+
+    async def refuse(self, request):
+        return web.Response(status=400, text="Service switch.explode not found")
+
+    async def hang(self, request):
+        await asyncio.sleep(3600)
+
+    async def state(self, request):
+        entity_id = request.match_info["entity_id"]
+        if entity_id == "switch.missing":
+            return web.Response(status=404, text="Entity not found.")
+        return web.json_response({"entity_id": entity_id, "state": "on"})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/api/services/switch/explode", self.refuse)
+        app.router.add_post("/api/services/switch/{service}", self.service)
+        app.router.add_post("/api/services/hang/{service}", self.hang)
+        app.router.add_get("/api/states/{entity_id}", self.state)
+        self.runner = web.AppRunner(app, shutdown_timeout=0.1)  # the hanging handler is not waited for
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "127.0.0.1", 0).start()
+        self.base_url = f"http://127.0.0.1:{self.runner.addresses[0][1]}"
+        return self
+
+    async def close(self):
+        await self.runner.cleanup()
+
+
+def with_stub(test, **client_args):
+    """Runs `test(stub, client)` against a fresh stub and client, closing both afterwards."""
+    async def run():
+        stub = await StubHomeAssistant().start()
+        client = HomeAssistantClient(stub.base_url, token="test-token", state_cache=False, **client_args)
+        try:
+            return await test(stub, client)
+        finally:
+            await client.close()
+            await stub.close()
+    return asyncio.run(run())
+
+
+def unused_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_calls_share_one_pooled_session():
+    async def test(stub, client):
+        for service in ("turn_on", "turn_off", "turn_on"):
+            assert await client.call_service("switch", service, "switch.light") == 200
+        session = client._session
+        assert await client.get_state("switch.light") == {"entity_id": "switch.light", "state": "on"}
+        return session, client._session
+
+    session, after = with_stub(test)
+    assert session is after
+
+
+def test_sequential_calls_reuse_one_connection():
+    async def test(stub, client):
+        for service in ("turn_on", "turn_off", "turn_on", "turn_off"):
+            await client.call_service("switch", service, "switch.light")
+        return stub
+
+    stub = with_stub(test)
+    assert len(stub.requests) == 4
+    assert len(stub.connections) == 1
+    assert stub.requests[0] == ("turn_on", {"entity_id": "switch.light"}, "Bearer test-token")
+
+
+def test_concurrent_calls_are_bounded_by_max_connections():
+    async def test(stub, client):
+        entities = [f"switch.light_{n}" for n in range(8)]
+        results = await asyncio.gather(*(client.call_service("switch", "turn_on", e) for e in entities))
+        return stub, results
+
+    stub, results = with_stub(test, max_connections=2)
+    assert results == [200] * 8
+    assert len(stub.connections) <= 2
+
+
+def test_identical_concurrent_calls_send_one_request():
+    async def test(stub, client):
+        return stub, await asyncio.gather(*(client.call_service("switch", "turn_on", "switch.light") for _ in range(3)))
+
+    stub, results = with_stub(test)
+    assert results == [200] * 3
+    assert len(stub.requests) == 1
+
+
+def test_timeout_is_returned_as_an_error():
+    async def test(stub, client):
+        started = time.perf_counter()
+        result = await client.call_service("hang", "turn_on", "switch.light")
+        return result, time.perf_counter() - started
+
+    result, elapsed = with_stub(test, timeout_s=0.2)
+    assert result == {"error": "Home Assistant did not answer within 0.2s"}
+    assert elapsed < 1
+
+
+def test_error_responses_are_returned_to_the_model():
+    async def test(stub, client):
+        return (await client.call_service("switch", "explode", "switch.light"),
+                await client.get_state("switch.missing"))
+
+    refused, missing = with_stub(test)
+    assert refused == "Service switch.explode not found"
+    assert missing == {"error": "Entity not found."}
+
+
+def test_unreachable_server_is_returned_as_an_error():
+    async def run():
+        client = HomeAssistantClient(f"http://127.0.0.1:{unused_port()}", token="test-token", state_cache=False)
+        try:
+            return await client.call_service("switch", "turn_on", "switch.light"), await client.get_state("switch.light")
+        finally:
+            await client.close()
+
+    for result in asyncio.run(run()):
+        assert result["error"].startswith("Home Assistant request failed: ")
+
+
+def test_close_releases_the_session_and_a_later_call_opens_a_new_one():
+    async def test(stub, client):
+        await client.call_service("switch", "turn_on", "switch.light")
+        session = client._session
+        await client.close()
+        closed = session.closed, client._session
+        result = await client.call_service("switch", "turn_off", "switch.light")
+        return closed, result, client._session is not session
+
+    (was_closed, session_after_close), result, new_session = with_stub(test)
+    assert was_closed and session_after_close is None
+    assert result == 200 and new_session
@@ -0,0 +1,138 @@
+# tests/test_homeassistant_state.py
+import asyncio
+import aiohttp
+from aiohttp import web
+from app.services.homeassistant_state import HomeAssistantStateCache
+
+
+def state(entity_id, value, updated):
+    return {"entity_id": entity_id, "state": value, "attributes": {}, "last_updated": f"2025-01-01T00:00:{updated:02d}+00:00"}
+
+
+class FakeHomeAssistant:
+    """HA's websocket API, as far as the state cache uses it: auth, subscribe_events and get_states."""
+
+    def __init__(self, states):
+        self.states = {s["entity_id"]: s for s in states}
+        self.sockets = set()
+        self.connections = 0
+        self.before_snapshot = []  # state_changed data sent between the subscription and the next snapshot
+        self.runner = None
+        self.base_url = None
+
+    async def websocket(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_json({"type": "auth_required"})
+        await ws.receive_json()
+        await ws.send_json({"type": "auth_ok"})
+        self.connections += 1
+        self.sockets.add(ws)
+        try:
+            async for msg in ws:
+                data = msg.json()
+                if data["type"] == "subscribe_events":
+                    await ws.send_json({"id": data["id"], "type": "result", "success": True, "result": None})
+                elif data["type"] == "get_states":
+                    snapshot = list(self.states.values())
+                    for event in self.before_snapshot:
+                        await self.send_event(ws, event)
+                    self.before_snapshot = []
+                    await ws.send_json({"id": data["id"], "type": "result", "success": True, "result": snapshot})
+        finally:
+            self.sockets.discard(ws)
+        return ws
+
+    @staticmethod
+    async def send_event(ws, data):
+        await ws.send_json({"id": 1, "type": "event", "event": {"event_type": "state_changed", "data": data}})
+
+    async def drop_connections(self):
+        for ws in list(self.sockets):
+            await ws.close()
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/api/websocket", self.websocket)
+        self.runner = web.AppRunner(app, shutdown_timeout=0.1)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "127.0.0.1", 0).start()
+        self.base_url = f"http://127.0.0.1:{self.runner.addresses[0][1]}"
+        return self
+
+    async def close(self):
+        await self.runner.cleanup()
+
+
+async def connected(cache, server, connections):
+    """Waits until the cache has loaded the snapshot of its `connections`-th connection."""
+    while not (cache.ready.is_set() and server.connections >= connections):
+        await asyncio.sleep(0.01)
+
+
+def with_cache(test, states):
+    async def run():
+        server = await FakeHomeAssistant(states).start()
+        session = aiohttp.ClientSession()
+        cache = HomeAssistantStateCache(server.base_url, "test-token", lambda: session)
+        cache.start()
+        try:
+            await asyncio.wait_for(connected(cache, server, 1), 5)
+            return await asyncio.wait_for(test(server, cache), 10)
+        finally:
+            await cache.close()
+            await session.close()
+            await server.close()
+    return asyncio.run(run())
+
+
+def test_reconnect_rebuilds_states_from_the_new_snapshot():
+    async def test(server, cache):
+        loaded = dict(cache.states)
+        # Changed while the cache was not listening: no events for any of it
+        await server.drop_connections()
+        await asyncio.sleep(0.05)
+        del server.states["switch.removed"]
+        server.states["switch.light"] = state("switch.light", "off", 10)
+        server.states["switch.added"] = state("switch.added", "on", 11)
+        await connected(cache, server, 2)
+        return loaded, cache.states
+
+    loaded, states = with_cache(test, [state("switch.light", "on", 1), state("switch.removed", "on", 2)])
+    assert set(loaded) == {"switch.light", "switch.removed"}
+    assert states == {"switch.light": state("switch.light", "off", 10), "switch.added": state("switch.added", "on", 11)}
+
+
+def test_events_received_before_the_snapshot_are_kept_when_newer():
+    async def test(server, cache):
+        await server.drop_connections()
+        await asyncio.sleep(0.05)
+        snapshot_light = state("switch.light", "on", 5)
+        server.states = {"switch.light": snapshot_light, "switch.gone": state("switch.gone", "on", 5),
+                         "switch.stale": state("switch.stale", "on", 5)}
+        server.before_snapshot = [
+            # Changed and removed after the snapshot was taken
+            {"entity_id": "switch.light", "old_state": snapshot_light, "new_state": state("switch.light", "off", 6)},
+            {"entity_id": "switch.gone", "old_state": state("switch.gone", "on", 5), "new_state": None},
+            # Already part of the snapshot
+            {"entity_id": "switch.stale", "old_state": None, "new_state": state("switch.stale", "off", 4)},
+        ]
+        await connected(cache, server, 2)
+        return cache.states
+
+    states = with_cache(test, [state("switch.light", "on", 1)])
+    assert states == {"switch.light": state("switch.light", "off", 6), "switch.stale": state("switch.stale", "on", 5)}
+
+
+def test_events_after_the_snapshot_update_the_cache():
+    async def test(server, cache):
+        [ws] = server.sockets
+        await server.send_event(ws, {"entity_id": "switch.light", "new_state": state("switch.light", "off", 2)})
+        await server.send_event(ws, {"entity_id": "switch.other", "new_state": None})
+        while cache.events < 2:
+            await asyncio.sleep(0.01)
+        return cache.get("switch.light"), cache.get("switch.other")
+
+    light, other = with_cache(test, [state("switch.light", "on", 1), state("switch.other", "on", 1)])
+    assert light == state("switch.light", "off", 2)
+    assert other is None
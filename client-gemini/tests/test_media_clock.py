@@ -0,0 +1,13 @@
+# tests/test_media_clock.py
+from app.config.constants import MEDIA_CLOCK_MAX_LAG_MS
+from benchmarks.bench_media_clock import DRIFT_BOUND_NS, FRAME_NS, HOURS, STALL_NS, run_media_clock
+
+
+def test_media_clock_does_not_drift_over_a_day():
+    # 24 simulated hours of oversleeps, hourly 500ms stalls and a wall-clock step
+    frames, max_drift, max_burst, skipped = run_media_clock()
+
+    assert max_drift <= DRIFT_BOUND_NS
+    # Stalls are skipped over rather than caught up in a burst of back-to-back frames
+    assert skipped >= (HOURS - 1) * (STALL_NS - MEDIA_CLOCK_MAX_LAG_MS * 1_000_000) // FRAME_NS
+    assert max_burst <= MEDIA_CLOCK_MAX_LAG_MS * 1_000_000 // FRAME_NS
@@ -0,0 +1,80 @@
+# tests/test_session_resumption.py
+import asyncio
+import pytest
+from app.config.constants import CONF_CHAT_MODEL
+from app.llm.gemini import GeminiClientManager, build_live_config
+from app.llm.handle_store import SessionHandleStore
+from app.llm.live_pool import LiveSessionPool
+from app.wakeword.engine import get_wakeword_engine, shutdown_wakeword_engine
+from benchmarks.bench_live_pool import CallerTrack
+from benchmarks.fake_live_server import FakeLiveServer
+
+
+@pytest.fixture
+def wakeword_engine():
+    yield get_wakeword_engine()
+    shutdown_wakeword_engine()
+
+
+async def workers_sharing(path, count=2):
+    """The handle stores of `count` shard workers, opened on the same file before any call."""
+    stores = [SessionHandleStore(path) for _ in range(count)]
+    for store in stores:
+        await store.open()
+    return stores
+
+
+async def saved(store, remote_user_id):
+    """Waits until the store has written what it was given: its lookups run after its pending writes."""
+    await store.get(remote_user_id)
+
+
+async def call(server, store, caller_id):
+    """One call hosted by the worker owning `store`; returns once its Live session was up."""
+    client = server.client()
+    pool = LiveSessionPool(lambda: client.aio.live.connect(model=CONF_CHAT_MODEL, config=build_live_config()))
+    manager = GeminiClientManager(caller_id, genai_client=client, live_pool=pool, handle_store=store)
+    manager.is_wake.set()
+    task = asyncio.create_task(manager.start_session(CallerTrack()))
+    while manager.session_ready_s is None:
+        await asyncio.sleep(0.01)
+    await manager.stop_session()
+    await task
+
+
+def test_caller_resumes_on_another_worker(tmp_path, wakeword_engine):
+    async def run():
+        server = await FakeLiveServer(rtt_ms=0, setup_ms=0).start()
+        first, second = await workers_sharing(str(tmp_path / "live_handles.db"))
+        try:
+            # The caller's last call was hosted by the first worker, which saved its handle
+            first.put("caller-0", "handle-1")
+            await saved(first, "caller-0")
+            await call(server, second, "caller-0")
+        finally:
+            for store in (first, second):
+                await store.close()
+            await server.close()
+        return server.resumed
+
+    assert asyncio.run(run()) == 1
+
+
+def test_refused_handle_does_not_remove_a_newer_one(tmp_path):
+    async def run():
+        first, second = await workers_sharing(str(tmp_path / "live_handles.db"))
+        try:
+            first.put("caller-0", "handle-1")
+            await saved(first, "caller-0")
+            stale = await second.get("caller-0")
+            # The caller calls again through the first worker and gets a new handle...
+            first.put("caller-0", "handle-2")
+            await saved(first, "caller-0")
+            # ...while the second worker finds out its copy is no longer accepted
+            second.discard("caller-0", stale)
+            return stale, await second.get("caller-0")
+        finally:
+            for store in (first, second):
+                await store.close()
+
+    assert asyncio.run(run()) == ("handle-1", "handle-2")
@@ -0,0 +1,70 @@
+# tests/test_wakeword_batcher.py
+import asyncio
+import numpy as np
+import pytest
+from app.wakeword.batcher import BatchedWakeWordEngine
+from app.wakeword.pool import load_model
+
+
+def speech_like_audio(seconds, seed=0):
+    """Bursts of tone and noise between quiet stretches, as 16kHz int16 PCM."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(16000 * seconds) / 16000
+    envelope = (np.sin(2 * np.pi * 0.7 * t) > 0).astype(np.float32)
+    audio = envelope * (4000 * np.sin(2 * np.pi * 220 * t) + rng.normal(0, 1500, t.size))
+    return audio.astype(np.int16)
+
+
+def chunked(audio, sizes):
+    chunks, start, n = [], 0, 0
+    while start + sizes[n % len(sizes)] <= len(audio):
+        chunks.append(audio[start:start + sizes[n % len(sizes)]])
+        start += sizes[n % len(sizes)]
+        n += 1
+    return chunks
+
+
+def sequential_scores(chunks, feature_buffer):
+    model = load_model()
+    model.preprocessor.feature_buffer = feature_buffer
+    return [list(model.predict(chunk).values())[0] for chunk in chunks]
+
+
+async def batched_scores(engine, streams):
+    """Scores every (stream, chunks) pair, one chunk per stream per tick, all streams together."""
+    scores = [[] for _ in streams]
+    try:
+        for chunks in zip(*(chunks for _, chunks in streams)):
+            results = await asyncio.gather(*(engine.predict(s, chunk) for (s, _), chunk in zip(streams, chunks)))
+            for n, result in enumerate(results):
+                scores[n].append(list(result.values())[0])
+    finally:
+        engine.close()
+    return scores
+
+
+@pytest.fixture
+def engine():
+    return BatchedWakeWordEngine(tick_ms=0)
+
+
+@pytest.mark.parametrize("sizes", [[560], [1280], [560, 1600, 400], [2560, 320]])
+def test_batched_scores_match_model_predict(engine, sizes):
+    chunks = chunked(speech_like_audio(6), sizes)
+    stream = engine.new_stream()
+    expected = sequential_scores(chunks, stream.preprocessor_state["feature_buffer"])
+
+    [scores] = asyncio.run(batched_scores(engine, [(stream, chunks)]))
+
+    np.testing.assert_allclose(scores, expected, atol=1e-5)
+
+
+def test_streams_batched_together_keep_their_own_scores(engine):
+    audio = [speech_like_audio(4, seed) for seed in range(3)]
+    streams = [(engine.new_stream(), chunked(clip, [560])) for clip in audio]
+    expected = [sequential_scores(chunks, stream.preprocessor_state["feature_buffer"]) for stream, chunks in streams]
+
+    scores = asyncio.run(batched_scores(engine, streams))
+
+    for stream_scores, stream_expected in zip(scores, expected):
+        np.testing.assert_allclose(stream_scores, stream_expected, atol=1e-5)
@@ -1,16 +1,17 @@
 import os
 from flask import Flask, send_from_directory, request, jsonify
 from flask_socketio import SocketIO, join_room, emit, disconnect
+from call_state import CALL_EXPIRY_INTERVAL_S, SessionIndex, CallIndex, timeout_notices
 
 # Initialize Flask app
 app = Flask(__name__, static_folder='static')
 socketio = SocketIO(app, cors_allowed_origins="*")
 
-# A simple dictionary to map SocketIO session IDs (sid) to user IDs (callerId)
-socketio.sid_to_user_map = {}
+# SocketIO session IDs (sid) <-> user IDs (callerId)
+socketio.sessions = SessionIndex()
 
-# Track active ongoing calls via sets set
-socketio.active_calls = set()  # {{A,B}, {A,C}}
+# Calls in progress, by pair of users and by user
+socketio.calls = CallIndex()
 
 # Route to serve the main HTML file (e.g., index.html)
 @app.route('/')
@@ -22,10 +23,10 @@ def serve_index():
 def serve_other_static_files(path):
     return send_from_directory(app.static_folder, path)
 
-# Route to expose current sid user map for debugging
-@app.route('/debug/sessions')
-def debug_sessions():
-    return jsonify(socketio.sid_to_user_map)
+# Route to expose session and call counts for monitoring
+@app.route('/stats')
+def stats():
+    return jsonify({**socketio.sessions.stats(), **socketio.calls.stats()})
 
 # --- Socket.IO Event Handlers ---
 @socketio.on('connect')
@@ -41,7 +42,7 @@ def handle_connect():
         caller_id = request.args.get('callerId')  
         
         # Store the callerId using the current session ID (sid)
-        socketio.sid_to_user_map[request.sid] = caller_id  
+        socketio.sessions.add(request.sid, caller_id)
 
         # Join a room named after the callerId for direct messaging
         join_room(caller_id)
@@ -64,12 +65,12 @@ def handle_call(data):
     rtc_message = data.get('rtcMessage')
 
     # Get the callerId from our map using the current socket's session ID
-    caller_id = socketio.sid_to_user_map.get(request.sid)  
+    caller_id = socketio.sessions.user_for(request.sid)
 
     if callee_id and rtc_message and caller_id:
         print(f"Call from '{caller_id}' to '{callee_id}'")
 
-        socketio.active_calls.add(frozenset({callee_id, caller_id}))
+        socketio.calls.add(caller_id, callee_id)
 
         # Emit 'newCall' event to the callee's room
         emit('newCall', {
@@ -90,10 +91,11 @@ def handle_answer_call(data):
     rtc_message = data.get('rtcMessage')
 
     # Get the callee (current user) ID from our map
-    callee_id = socketio.sid_to_user_map.get(request.sid)
+    callee_id = socketio.sessions.user_for(request.sid)
 
-    if frozenset({caller_id, callee_id}) in socketio.active_calls:
+    if socketio.calls.has(caller_id, callee_id):
         if caller_id and rtc_message and callee_id:
+            socketio.calls.answer(caller_id, callee_id)
             print(f"Call answered by '{callee_id}' for '{caller_id}'")
             # Emit 'callAnswered' event to the caller's room
             emit('callAnswered', {
@@ -112,18 +114,18 @@ def handle_hangup_call(data):
     Notifies the other participant that the call has ended.
     """
     target_id = data.get('targetId')
-    sender_id = socketio.sid_to_user_map.get(request.sid)
+    sender_id = socketio.sessions.user_for(request.sid)
 
     if target_id and sender_id:
         # Established call: notify the target
         print(f"'{sender_id}' hung up the call (target {target_id}).")
-        emit('callEnded', {'senderId': sender_id}, room=target_id)
+        emit('callEnded', {'senderId': sender_id, 'targetId': target_id, 'reason': data.get('reason')}, room=target_id)
     else:
         print(f"Invalid hangupCall event: {data}")
         return
               
     # Clear the active call set
-    socketio.active_calls.discard(frozenset({target_id, sender_id}))
+    socketio.calls.remove(target_id, sender_id)
 
 
 @socketio.on('ICEcandidate')
@@ -136,7 +138,7 @@ def handle_ice_candidate(data):
     rtc_message = data.get('rtcMessage')
 
     # Get the sender (current user) ID from our map
-    sender_id = socketio.sid_to_user_map.get(request.sid) 
+    sender_id = socketio.sessions.user_for(request.sid)
 
     print(f"ICEcandidate data.calleeId: {callee_id}")
     print(f"ICEcandidate from sender: {sender_id}")
@@ -155,18 +157,31 @@ def handle_ice_candidate(data):
 def handle_disconnect():
     """
     Handles client disconnections.
-    Removes the user from our tracking map.
+    Removes the user from our tracking map, and their calls with the last
+    of their sessions.
     """
-    # Remove the user from our map upon disconnection
-    user_id = socketio.sid_to_user_map.pop(request.sid, 'Unknown')
-    to_remove = {call_set for call_set in socketio.active_calls if user_id in call_set}
-    for call_set in to_remove:
-        socketio.active_calls.discard(call_set)
-    print(f"'{user_id}' (SID: {request.sid}) Disconnected") 
+    user_id = socketio.sessions.remove(request.sid)
+    if user_id is not None and not socketio.sessions.is_online(user_id):
+        socketio.calls.drop_user(user_id)
+    print(f"'{user_id or 'Unknown'}' (SID: {request.sid}) Disconnected")
+
+
+def expire_calls():
+    """
+    Drops calls nobody answered in time and tells both sides, as if the
+    other one had hung up.
+    """
+    while True:
+        socketio.sleep(CALL_EXPIRY_INTERVAL_S)
+        for call in socketio.calls.expire():
+            print(f"Call from '{call.caller_id}' to '{call.callee_id}' was never answered.")
+            for room, data in timeout_notices(call):
+                socketio.emit('callEnded', data, room=room)
  
 
 # --- Main execution block ---
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 3500))
     print(f"Server starting on {os.environ.get('HOSTNAME', 'Unknown host') or os.uname().nodename}:{port}")
+    socketio.start_background_task(expire_calls)
     socketio.run(app, host='0.0.0.0', port=port, debug=False, allow_unsafe_werkzeug=True)
\ No newline at end of file
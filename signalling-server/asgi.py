@@ -0,0 +1,212 @@
+import os
+import json
+import mimetypes
+import socketio
+import uvicorn
+from urllib.parse import parse_qs
+from backends import create_backend
+from call_state import SessionIndex
+
+# Same signalling protocol as app.py, served by an asyncio Socket.IO server
+# under uvicorn: one event loop holds every websocket instead of one
+# thread (or green thread) per connection.
+#
+# Run with:  python asgi.py     (PORT defaults to 3500)
+#
+# Presence, call state and delivery to other nodes go through a backend
+# (backends.py), picked with SIGNALLING_BACKEND: 'memory' (the default)
+# keeps them in this process, so run a single node; 'unix:/path.sock'
+# shares them with every node attached to the same broker.py.
+
+STATIC_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins="*")
+
+# SocketIO session IDs (sid) <-> user IDs (callerId), for this node
+sio.sessions = SessionIndex()
+
+# Who is online and which calls are in progress, across nodes
+backend = create_backend(os.environ.get('SIGNALLING_BACKEND', 'memory'))
+
+
+async def deliver(user_id, event, data):
+    """Emits an event another node published to the user's sessions here."""
+    await sio.emit(event, data, room=user_id)
+
+
+async def relay(user_id, event, data):
+    """Emits to the user's sessions on this node and forwards to the other nodes."""
+    await sio.emit(event, data, room=user_id)
+    await backend.publish(user_id, event, data)
+
+
+async def send_response(send, status, body, content_type):
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', content_type.encode())]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def http_app(scope, receive, send):
+    """
+    Serves what the Flask routes in app.py serve: the static files and the
+    session and call counts.
+    """
+    if scope['type'] != 'http':
+        return
+    path = scope['path']
+    if path == '/stats':
+        stats = {'node': sio.sessions.stats(), 'backend': await backend.stats()}
+        return await send_response(send, 200, json.dumps(stats).encode(), 'application/json')
+
+    # Serve the main HTML file (e.g., index.html) or any other static file
+    filename = os.path.normpath(os.path.join(STATIC_FOLDER, path.lstrip('/') or 'index.html'))
+    if not filename.startswith(STATIC_FOLDER + os.sep) or not os.path.isfile(filename):
+        return await send_response(send, 404, b'Not Found', 'text/plain')
+    with open(filename, 'rb') as f:
+        body = f.read()
+    await send_response(send, 200, body, mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+
+
+async def on_startup():
+    await backend.start(deliver)
+
+
+app = socketio.ASGIApp(sio, other_asgi_app=http_app, on_startup=on_startup, on_shutdown=backend.close)
+
+
+# --- Socket.IO Event Handlers ---
+@sio.on('connect')
+async def handle_connect(sid, environ):
+    """
+    Handles new client connections.
+    Extracts 'callerId' from the handshake query string.
+    """
+    caller_id = parse_qs(environ.get('QUERY_STRING', '')).get('callerId', [None])[0]
+    if caller_id:
+        # Store the callerId using the current session ID (sid)
+        sio.sessions.add(sid, caller_id)
+
+        # Join a room named after the callerId for direct messaging
+        await sio.enter_room(sid, caller_id)
+        await backend.join(caller_id)
+        print(f"'{caller_id}' (SID: {sid}) Connected")
+
+        await sio.emit('my response', {'data': 'Connected to Python server!', 'id': caller_id}, to=sid)
+    else:
+        print(f"Anonymous user (SID: {sid}) Connected")
+        await sio.emit('my response', {'data': 'Connected to Python server! (Anonymous)'}, to=sid)
+
+
+@sio.on('call')
+async def handle_call(sid, data):
+    """
+    Handles a 'call' event from a client (initiating a call).
+    Forwards the call request to the 'calleeId'.
+    """
+    callee_id = data.get('calleeId')
+    rtc_message = data.get('rtcMessage')
+    caller_id = sio.sessions.user_for(sid)
+
+    if callee_id and rtc_message and caller_id:
+        print(f"Call from '{caller_id}' to '{callee_id}'")
+
+        await backend.add_call(caller_id, callee_id)
+
+        # Emit 'newCall' event to the callee's room
+        await relay(callee_id, 'newCall', {
+            'callerId': caller_id,
+            'rtcMessage': rtc_message
+        })
+    else:
+        print(f"Invalid 'call' data received from {caller_id}: {data}")
+
+
+@sio.on('answerCall')
+async def handle_answer_call(sid, data):
+    """
+    Handles an 'answerCall' event from a client (answering a call).
+    Forwards the answer to the original 'callerId'.
+    """
+    caller_id = data.get('callerId')
+    rtc_message = data.get('rtcMessage')
+    callee_id = sio.sessions.user_for(sid)
+
+    if not (caller_id and rtc_message and callee_id):
+        print(f"Invalid 'answerCall' data received from {callee_id}: {data}")
+    elif await backend.answer_call(caller_id, callee_id):
+        print(f"Call answered by '{callee_id}' for '{caller_id}'")
+        # Emit 'callAnswered' event to the caller's room
+        await relay(caller_id, 'callAnswered', {
+            'callee': callee_id,
+            'rtcMessage': rtc_message
+        })
+    else:
+        print("Call was hung up before the rtc connection was established.")
+
+
+@sio.on('hangupCall')
+async def handle_hangup_call(sid, data):
+    """
+    Handles a 'hangupCall' event from a client (ending a call).
+    Notifies the other participant that the call has ended.
+    """
+    target_id = data.get('targetId')
+    sender_id = sio.sessions.user_for(sid)
+
+    if not (target_id and sender_id):
+        print(f"Invalid hangupCall event: {data}")
+        return
+
+    # Clear the call before notifying: events are handled concurrently, and
+    # a new call between the same two users may already be on its way
+    await backend.remove_call(target_id, sender_id)
+
+    print(f"'{sender_id}' hung up the call (target {target_id}).")
+    await relay(target_id, 'callEnded', {
+        'senderId': sender_id,
+        'targetId': target_id,
+        'reason': data.get('reason')
+    })
+
+
+@sio.on('ICEcandidate')
+async def handle_ice_candidate(sid, data):
+    """
+    Handles an 'ICEcandidate' event for WebRTC peer connection.
+    Forwards the ICE candidate to the specified 'calleeId'.
+    """
+    callee_id = data.get('calleeId')
+    rtc_message = data.get('rtcMessage')
+    sender_id = sio.sessions.user_for(sid)
+
+    # No per-candidate logging: a call sends dozens and this is the hot path
+    if callee_id and rtc_message and sender_id:
+        # Emit 'ICEcandidate' event to the callee's room
+        await relay(callee_id, 'ICEcandidate', {
+            'sender': sender_id,
+            'rtcMessage': rtc_message
+        })
+    else:
+        print(f"Invalid 'ICEcandidate' data received from {sender_id}: {data}")
+
+
+@sio.on('disconnect')
+async def handle_disconnect(sid, reason=None):
+    """
+    Handles client disconnections.
+    Removes the user from our tracking map, and their calls with the last
+    of their sessions.
+    """
+    user_id = sio.sessions.remove(sid)
+    if user_id is not None:
+        await backend.leave(user_id)
+    print(f"'{user_id or 'Unknown'}' (SID: {sid}) Disconnected")
+
+
+# --- Main execution block ---
+if __name__ == '__main__':
+    port = int(os.environ.get('PORT', 3500))
+    print(f"Server starting on {os.environ.get('HOSTNAME', 'Unknown host') or os.uname().nodename}:{port}")
+    # A deep accept backlog so phones reconnecting together are not refused;
+    # the sans-I/O websockets protocol relayed the most messages per core
+    uvicorn.run(app, host='0.0.0.0', port=port, log_level='warning', backlog=4096, ws='websockets-sansio')
@@ -0,0 +1,233 @@
+import asyncio
+import itertools
+import json
+import os
+import socket
+from call_state import CALL_EXPIRY_INTERVAL_S, CallIndex, timeout_notices
+
+BROKER_RECONNECT_INTERVAL_S = 1  # How often a node retries a broker that went away
+
+# Routing state asgi.py shares with the other signalling nodes: who is
+# online, which calls are in progress, and delivery of an event to a user's
+# sessions on other nodes (asgi.py emits to the ones on its own node).
+#
+# MemoryBackend keeps all of it in this process (a single node).
+# BrokerBackend keeps it in broker.py, reached over a UNIX socket, so
+# several nodes on one box share one routing space. It is the local
+# stand-in for a networked bus; anything offering the same methods plugs in.
+
+
+def create_backend(url):
+    """'memory' or 'unix:/path/to/broker.sock'."""
+    if url == 'memory':
+        return MemoryBackend()
+    if url.startswith('unix:'):
+        return BrokerBackend(url[len('unix:'):])
+    raise ValueError(f"Unknown signalling backend: {url}")
+
+
+class MemoryBackend:
+    """Presence, calls and fan-out for a single node."""
+
+    def __init__(self):
+        self.deliver = None
+        self.presence = {}  # user_id -> connected sessions
+        self.calls = CallIndex()
+        self._expiry_task = None
+
+    async def start(self, deliver):
+        """`deliver(user_id, event, data)` emits to the user's room on this node."""
+        self.deliver = deliver
+        self._expiry_task = asyncio.create_task(self._expire_calls())
+
+    async def close(self):
+        if self._expiry_task:
+            self._expiry_task.cancel()
+
+    async def _expire_calls(self):
+        while True:
+            await asyncio.sleep(CALL_EXPIRY_INTERVAL_S)
+            for call in self.calls.expire():
+                print(f"Call from '{call.caller_id}' to '{call.callee_id}' was never answered.")
+                for room, data in timeout_notices(call):
+                    await self.deliver(room, 'callEnded', data)
+
+    async def join(self, user_id):
+        self.presence[user_id] = self.presence.get(user_id, 0) + 1
+
+    async def leave(self, user_id):
+        """One of the user's sessions went away; their calls go with the last one."""
+        if self.presence.get(user_id, 0) > 1:
+            self.presence[user_id] -= 1
+        else:
+            self.presence.pop(user_id, None)
+            self.calls.drop_user(user_id)
+
+    async def add_call(self, caller_id, callee_id):
+        self.calls.add(caller_id, callee_id)
+
+    async def answer_call(self, caller_id, callee_id):
+        """Marks the call answered. False if it was hung up, dropped or expired."""
+        return self.calls.answer(caller_id, callee_id)
+
+    async def remove_call(self, a, b):
+        self.calls.remove(a, b)
+
+    async def publish(self, user_id, event, data):
+        """Forwards `event` to the user's sessions on other nodes: there are none."""
+
+    async def stats(self):
+        return {'users': len(self.presence), **self.calls.stats()}
+
+
+class BrokerBackend:
+    """
+    Presence, calls and fan-out through broker.py.
+
+    Messages are JSON lines. Updates are sent without waiting; only
+    `answer_call` and `stats` wait for a reply. The broker handles one node's
+    messages in order, so a call added before its newCall is published is
+    always visible to the answer that follows, whichever node it comes from.
+
+    If the broker goes away the node keeps serving its own sessions and
+    reconnects in the background, announcing them again once it is back.
+    Updates made meanwhile are dropped and requests fail straight away.
+    """
+
+    def __init__(self, path, node_id=None):
+        self.path = path
+        self.node_id = node_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.deliver = None
+        self.reader = None
+        self.writer = None
+        self.sessions = {}  # user_id -> sessions on this node, replayed on reconnect
+        self._ids = itertools.count(1)
+        self._replies = {}
+        self._read_task = None
+
+    async def start(self, deliver):
+        self.deliver = deliver
+        await self._connect()
+        self._read_task = asyncio.create_task(self._read())
+        print(f"Node '{self.node_id}' joined the broker at {self.path}")
+
+    async def close(self):
+        if self._read_task:
+            self._read_task.cancel()
+        if self.writer:
+            self.writer.close()
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.open_unix_connection(self.path, limit=2 ** 22)
+        self._send('hello', node=self.node_id)
+        # The broker forgets a node's sessions with its connection
+        for user_id, sessions in self.sessions.items():
+            self._send('join', user=user_id, sessions=sessions)
+        await self.writer.drain()
+
+    async def _reconnect(self):
+        while True:
+            try:
+                await self._connect()
+            except OSError:
+                await asyncio.sleep(BROKER_RECONNECT_INTERVAL_S)
+                continue
+            print(f"Node '{self.node_id}' rejoined the broker with {len(self.sessions)} users")
+            return
+
+    @property
+    def connected(self):
+        return self.writer is not None and not self.writer.is_closing()
+
+    def _send(self, op, **message):
+        """Writes one message; False if the broker is unreachable and it was dropped."""
+        if not self.connected:
+            return False
+        self.writer.write(json.dumps({'op': op, **message}).encode() + b'\n')
+        return True
+
+    async def _drain(self):
+        try:
+            await self.writer.drain()
+        except ConnectionError:
+            pass  # The read loop notices and reconnects
+
+    async def _request(self, op, **message):
+        request_id = next(self._ids)
+        reply = self._replies[request_id] = asyncio.get_running_loop().create_future()
+        try:
+            if not self._send(op, id=request_id, **message):
+                raise ConnectionError("signalling broker is unreachable")
+            await self._drain()
+            return await reply
+        finally:
+            self._replies.pop(request_id, None)
+
+    async def _read(self):
+        while True:
+            try:
+                while line := await self.reader.readline():
+                    await self._handle(line)
+            except ConnectionError:
+                pass
+            print("Lost the connection to the broker, reconnecting")
+            self.writer.close()
+            for reply in self._replies.values():
+                if not reply.done():
+                    reply.set_exception(ConnectionError("signalling broker went away"))
+            await self._reconnect()
+
+    async def _handle(self, line):
+        # A malformed message is dropped; only a lost connection makes us reconnect
+        try:
+            message = json.loads(line)
+            if 'reply' in message:
+                reply = self._replies.get(message['reply'])
+                if reply and not reply.done():
+                    reply.set_result(message['result'])
+            else:
+                await self._deliver(message['user'], message['event'], message['data'])
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Dropping a bad message from the broker: {e!r}")
+
+    async def _deliver(self, user_id, event, data):
+        # One failed emit must not stop delivery to everyone else
+        try:
+            await self.deliver(user_id, event, data)
+        except Exception as e:
+            print(f"Could not deliver '{event}' to '{user_id}': {e}")
+
+    async def join(self, user_id):
+        self.sessions[user_id] = self.sessions.get(user_id, 0) + 1
+        self._send('join', user=user_id)
+
+    async def leave(self, user_id):
+        if self.sessions.get(user_id, 0) > 1:
+            self.sessions[user_id] -= 1
+        else:
+            self.sessions.pop(user_id, None)
+        self._send('leave', user=user_id)
+
+    async def add_call(self, caller_id, callee_id):
+        self._send('add_call', caller=caller_id, callee=callee_id)
+
+    async def answer_call(self, caller_id, callee_id):
+        try:
+            return await self._request('answer_call', caller=caller_id, callee=callee_id)
+        except ConnectionError as e:
+            print(f"Could not check the call from '{caller_id}' to '{callee_id}': {e}")
+            return False
+
+    async def remove_call(self, a, b):
+        self._send('remove_call', users=[a, b])
+
+    async def publish(self, user_id, event, data):
+        # The broker forwards to every other node with a session of the user
+        if self._send('publish', user=user_id, event=event, data=data):
+            await self._drain()
+
+    async def stats(self):
+        try:
+            return await self._request('stats')
+        except ConnectionError:
+            return {'connected': False, 'users': len(self.sessions)}
@@ -0,0 +1,137 @@
+# benchmarks/bench_bus.py
+"""
+Relay latency through the signalling backends, same node vs across nodes.
+
+Starts broker.py and two asgi.py nodes attached to it, plus one node on the
+in-memory backend, then runs two phones through each layout:
+
+- memory:       both phones on the single in-memory node
+- broker/same:  both phones on node 0 (the broker is only told about state)
+- broker/cross: caller on node 0, callee on node 1 (every event crosses the broker)
+
+Per layout:
+
+1. call setup, `--calls` times: caller emits `call`, the callee answers as
+   soon as `newCall` arrives, timed until the caller gets `callAnswered`.
+   That is two relays plus the answer's call-state check. Each call is hung
+   up before the next.
+2. one-way ICEcandidate latency, `--candidates` of them `--interval-ms`
+   apart, from the caller's send to the callee's receive.
+
+All processes share this box, so the numbers include the scheduler too.
+
+Run from the signalling-server folder:
+    python -m benchmarks.bench_bus [--calls 200] [--candidates 1000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import aiohttp
+import numpy as np
+from benchmarks.bench_connections import Phone, connect, wait_for_port
+
+
+class BusPhone(Phone):
+    """A phone that answers calls and timestamps what it receives."""
+
+    def __init__(self, ws, caller_id):
+        self.answered = asyncio.Event()
+        self.latencies = []
+        super().__init__(ws, caller_id)
+
+    async def read(self):
+        async for message in self.ws:
+            if message.type != aiohttp.WSMsgType.TEXT:
+                break
+            if message.data == "2":
+                await self.ws.send_str("3")
+            elif message.data.startswith("42"):
+                event, data = json.loads(message.data[2:])
+                await self.on_event(event, data)
+
+    async def on_event(self, event, data):
+        if event == "newCall":
+            await self.emit("answerCall", {"callerId": data["callerId"],
+                                           "rtcMessage": {"type": "answer", "sdp": "v=0"}})
+        elif event == "callAnswered":
+            self.answered.set()
+        elif event == "ICEcandidate":
+            self.latencies.append(time.time() - data["rtcMessage"]["sent_at"])
+
+
+def start(script, *args, env=None):
+    return subprocess.Popen([sys.executable, script, *args], env={**os.environ, **(env or {})},
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def summary(seconds):
+    ms = np.array(seconds) * 1000
+    return f"p50 {np.percentile(ms, 50):6.2f}ms  p95 {np.percentile(ms, 95):6.2f}ms  p99 {np.percentile(ms, 99):6.2f}ms"
+
+
+async def measure(http, layout, caller_port, callee_port, args):
+    caller = await connect(http, caller_port, f"{layout}-caller", BusPhone)
+    callee = await connect(http, callee_port, f"{layout}-callee", BusPhone)
+    await asyncio.sleep(0.5)  # let the broker see both phones
+
+    setup = []
+    for _ in range(args.calls):
+        caller.answered.clear()
+        started = time.perf_counter()
+        await caller.emit("call", {"calleeId": callee.caller_id, "rtcMessage": {"type": "offer", "sdp": "v=0"}})
+        await asyncio.wait_for(caller.answered.wait(), 5)
+        setup.append(time.perf_counter() - started)
+        await caller.emit("hangupCall", {"targetId": callee.caller_id})
+
+    for _ in range(args.candidates):
+        await caller.emit("ICEcandidate", {"calleeId": callee.caller_id,
+                                           "rtcMessage": {"candidate": "candidate:1 1 udp 1 10.0.0.1 9 typ host",
+                                                          "sent_at": time.time()}})
+        await asyncio.sleep(args.interval_ms / 1000)
+    await asyncio.sleep(0.5)
+    await caller.close()
+    await callee.close()
+
+    print(f"{layout:<13}call setup    {summary(setup)}")
+    print(f"{'':<13}ICE one-way   {summary(callee.latencies)}  ({len(callee.latencies)}/{args.candidates})")
+
+
+async def main(args):
+    path = os.path.join(tempfile.mkdtemp(), "signalling.sock")
+    bus = {"SIGNALLING_BACKEND": f"unix:{path}"}
+    processes = [start("broker.py", path)]
+    try:
+        while not os.path.exists(path):
+            await asyncio.sleep(0.1)
+        processes += [
+            start("asgi.py", env={"PORT": str(args.port), "SIGNALLING_BACKEND": "memory"}),
+            start("asgi.py", env={"PORT": str(args.port + 1), **bus}),
+            start("asgi.py", env={"PORT": str(args.port + 2), **bus}),
+        ]
+        for port in (args.port, args.port + 1, args.port + 2):
+            await wait_for_port(port)
+
+        print(f"{args.calls} calls, {args.candidates} candidates {args.interval_ms}ms apart; "
+              f"{os.cpu_count()} core(s)\n")
+        async with aiohttp.ClientSession() as http:
+            await measure(http, "memory", args.port, args.port, args)
+            await measure(http, "broker/same", args.port + 1, args.port + 1, args)
+            await measure(http, "broker/cross", args.port + 1, args.port + 2, args)
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            process.wait(10)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=3580)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--candidates", type=int, default=1000)
+    parser.add_argument("--interval-ms", type=float, default=2)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,159 @@
+# benchmarks/bench_call_state.py
+"""
+Signalling state at `--users` registered users: the plain map and call set
+app.py used to keep vs SessionIndex + CallIndex (call_state.py).
+
+Both are filled the same way: every user logs in once (`--duplicates` of
+them twice), `--calls` calls are made between distinct users and most are
+answered. Then, per operation, in microseconds:
+
+- login, call, answer check: what every connect/call/answerCall does
+- logout: a user in a call disconnects. The old state scans every call to
+  find theirs; the index goes straight to them
+- expiry sweep: the ringing calls that are due are dropped. The old state
+  never expired anything
+- stats: building the body of the monitoring endpoint, i.e. the full
+  /debug/sessions dump vs the /stats counts
+
+Memory is what tracemalloc sees after filling a separate copy of the
+state, so the timings run without it.
+
+Run from the signalling-server folder:
+    python -m benchmarks.bench_call_state [--users 100000] [--calls 20000]
+"""
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from call_state import CallIndex, SessionIndex
+
+
+class LegacyState:
+    """What app.py kept before: sid -> user, and a set of user pairs."""
+
+    def __init__(self):
+        self.sid_to_user_map = {}
+        self.active_calls = set()
+
+    def login(self, sid, user_id):
+        self.sid_to_user_map[sid] = user_id
+
+    def call(self, caller_id, callee_id):
+        self.active_calls.add(frozenset({callee_id, caller_id}))
+
+    def answer(self, caller_id, callee_id):
+        return frozenset({caller_id, callee_id}) in self.active_calls
+
+    def logout(self, sid):
+        user_id = self.sid_to_user_map.pop(sid, 'Unknown')
+        to_remove = {call_set for call_set in self.active_calls if user_id in call_set}
+        for call_set in to_remove:
+            self.active_calls.discard(call_set)
+
+    def expire(self, now):
+        return []
+
+    def stats(self):
+        return json.dumps(self.sid_to_user_map)
+
+
+class IndexedState:
+    """SessionIndex + CallIndex, wired the way app.py uses them."""
+
+    def __init__(self):
+        self.sessions = SessionIndex()
+        self.calls = CallIndex(ttl_s=30)
+
+    def login(self, sid, user_id):
+        self.sessions.add(sid, user_id)
+
+    def call(self, caller_id, callee_id, now=0.0):
+        self.calls.add(caller_id, callee_id, now)
+
+    def answer(self, caller_id, callee_id):
+        return self.calls.answer(caller_id, callee_id)
+
+    def logout(self, sid):
+        user_id = self.sessions.remove(sid)
+        if user_id is not None and not self.sessions.is_online(user_id):
+            self.calls.drop_user(user_id)
+
+    def expire(self, now):
+        return self.calls.expire(now)
+
+    def stats(self):
+        return json.dumps({**self.sessions.stats(), **self.calls.stats()})
+
+
+def per_op_us(fn, items):
+    started = time.perf_counter()
+    for item in items:
+        fn(*item)
+    return (time.perf_counter() - started) / max(1, len(items)) * 1e6
+
+
+def fill(state, logins, calls, answered):
+    for login in logins:
+        state.login(*login)
+    for call in calls:
+        state.call(*call)
+    for call in answered:
+        state.answer(*call)
+
+
+def run(make_state, args):
+    rng = random.Random(1)
+    users = [f"user-{n}" for n in range(args.users)]
+    logins = [(f"sid-{n}", user) for n, user in enumerate(users)]
+    logins += [(f"sid-dup-{n}", user) for n, user in enumerate(rng.sample(users, args.duplicates))]
+    in_calls = rng.sample(users, 2 * args.calls)
+    calls = list(zip(in_calls[::2], in_calls[1::2]))
+    answered = calls[:int(len(calls) * args.answered)]
+
+    tracemalloc.start()
+    filled = make_state()
+    fill(filled, logins, calls, answered)
+    memory_mb = tracemalloc.get_traced_memory()[0] / 2 ** 20
+    tracemalloc.stop()
+    del filled
+
+    state = make_state()
+    login_us = per_op_us(state.login, logins)
+    call_us = per_op_us(state.call, calls)
+    answer_us = per_op_us(state.answer, answered)
+
+    started = time.perf_counter()
+    body = state.stats()
+    stats_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    expired = state.expire(now=60.0)
+    expire_ms = (time.perf_counter() - started) * 1000
+
+    # Callers of answered calls hang up by disconnecting (single-session users only)
+    sid_of = {user: sid for sid, user in logins}
+    leaving = [(sid_of[caller],) for caller, _ in answered[:args.logouts]]
+    logout_us = per_op_us(state.logout, leaving)
+
+    print(f"{make_state.__name__:<14}{login_us:>8.2f}{call_us:>8.2f}{answer_us:>8.2f}{logout_us:>10.1f}"
+          f"{expire_ms:>9.2f}ms ({len(expired)}){stats_ms:>9.2f}ms ({len(body) / 1024:.0f}KB){memory_mb:>8.1f}MB")
+
+
+def main(args):
+    print(f"{args.users} users ({args.duplicates} logged in twice), {args.calls} calls "
+          f"({100 * args.answered:.0f}% answered), {args.logouts} logouts\n")
+    print(f"{'':<14}{'login':>8}{'call':>8}{'answer':>8}{'logout':>10}{'expiry sweep':>17}{'stats':>21}{'memory':>10}")
+    print(f"{'':<14}{'us':>8}{'us':>8}{'us':>8}{'us':>10}")
+    for make_state in (LegacyState, IndexedState):
+        run(make_state, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--duplicates", type=int, default=5_000)
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--answered", type=float, default=0.8)
+    parser.add_argument("--logouts", type=int, default=1_000)
+    main(parser.parse_args())
@@ -0,0 +1,181 @@
+# benchmarks/bench_connections.py
+"""
+Connections held and messages relayed per core: app.py vs asgi.py.
+
+Each server is started as a subprocess on its own port, then:
+
+1. `--connections` phones connect (websocket transport, a callerId each,
+   `--connect-concurrency` handshakes at a time) and stay idle for
+   `--hold-s`. Reported: how many connected, how many are still open at the
+   end, the server's resident memory per connection, and its CPU while idle.
+2. `--pairs` of those connections relay `--messages` ICEcandidate events
+   each, caller to callee, as fast as the server takes them. Reported:
+   relayed messages per second of wall time and per second of the
+   server's own CPU time, i.e. per core.
+
+The clients speak raw Engine.IO/Socket.IO frames over one aiohttp session
+so a single process can hold thousands of sockets. They share the box with
+the server, so the per-core rate (server CPU only) is the number to compare.
+
+Run from the signalling-server folder:
+    python -m benchmarks.bench_connections [--connections 2000] [--pairs 50] [--messages 200]
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+import aiohttp
+
+SERVERS = {"flask": "app.py", "asgi": "asgi.py"}
+CANDIDATE = {"candidate": "candidate:1 1 udp 2122260223 192.168.1.20 54321 typ host", "sdpMid": "0",
+             "sdpMLineIndex": 0}
+
+
+class Phone:
+    """One idle Socket.IO client: answers pings and counts relayed candidates."""
+
+    def __init__(self, ws, caller_id):
+        self.ws = ws
+        self.caller_id = caller_id
+        self.received = 0
+        self.reader = asyncio.ensure_future(self.read())
+
+    async def read(self):
+        async for message in self.ws:
+            if message.type != aiohttp.WSMsgType.TEXT:
+                break
+            if message.data == "2":
+                await self.ws.send_str("3")
+            elif message.data.startswith('42["ICEcandidate"'):
+                self.received += 1
+
+    async def emit(self, event, data):
+        await self.ws.send_str("42" + json.dumps([event, data]))
+
+    @property
+    def open(self):
+        return not self.ws.closed
+
+    async def close(self):
+        await self.ws.close()
+        self.reader.cancel()
+
+
+async def connect(http, port, caller_id, phone=Phone):
+    ws = await http.ws_connect(f"http://127.0.0.1:{port}/socket.io/?EIO=4&transport=websocket&callerId={caller_id}")
+    await ws.receive_str()  # Engine.IO open
+    await ws.send_str("40")  # Socket.IO connect to the default namespace
+    while not (await ws.receive_str()).startswith("40"):
+        pass
+    return phone(ws, caller_id)
+
+
+def server_cpu_s(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def server_rss_mb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def wait_for_port(port, timeout=20):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"server did not listen on {port}")
+
+
+async def run(name, port, args):
+    server = subprocess.Popen([sys.executable, SERVERS[name]], env={**os.environ, "PORT": str(port)},
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    phones = []
+    try:
+        await wait_for_port(port)
+        base_rss = server_rss_mb(server.pid)
+        connector = aiohttp.TCPConnector(limit=0)
+        async with aiohttp.ClientSession(connector=connector) as http:
+            gate = asyncio.Semaphore(args.connect_concurrency)
+
+            async def one(n):
+                async with gate:
+                    try:
+                        phones.append(await asyncio.wait_for(connect(http, port, f"phone-{n}"), 30))
+                    except (aiohttp.ClientError, asyncio.TimeoutError, OSError):
+                        pass
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one(n) for n in range(args.connections)))
+            connect_s = time.perf_counter() - started
+
+            cpu = server_cpu_s(server.pid)
+            await asyncio.sleep(args.hold_s)
+            idle_cpu = (server_cpu_s(server.pid) - cpu) / args.hold_s
+            held = sum(phone.open for phone in phones)
+            rss = server_rss_mb(server.pid)
+
+            # Caller 2i relays to callee 2i+1, as during call setup
+            pairs = [(phones[2 * i], phones[2 * i + 1]) for i in range(min(args.pairs, len(phones) // 2))]
+            callees = [callee for _, callee in pairs]
+            expected = len(pairs) * args.messages
+
+            async def send(caller, callee):
+                for _ in range(args.messages):
+                    await caller.emit("ICEcandidate", {"calleeId": callee.caller_id, "rtcMessage": CANDIDATE})
+
+            cpu, started = server_cpu_s(server.pid), time.perf_counter()
+            await asyncio.gather(*(send(caller, callee) for caller, callee in pairs))
+            deadline = started + args.relay_timeout_s
+            while sum(phone.received for phone in callees) < expected and time.perf_counter() < deadline:
+                await asyncio.sleep(0.01)
+            relay_s = time.perf_counter() - started
+            relay_cpu = server_cpu_s(server.pid) - cpu
+            relayed = sum(phone.received for phone in callees)
+
+            await asyncio.gather(*(phone.close() for phone in phones), return_exceptions=True)
+    finally:
+        server.terminate()
+        server.wait(10)
+
+    per_conn_kb = (rss - base_rss) * 1024 / max(1, held)
+    print(f"{name:<6}{len(phones):>6}/{args.connections:<6}{held:>7}{connect_s:>9.1f}s{per_conn_kb:>9.1f}KB"
+          f"{100 * idle_cpu:>8.1f}%{relayed:>8}/{expected:<7}{relayed / relay_s:>9.0f}/s"
+          f"{relayed / max(relay_cpu, 1e-3):>10.0f}/s")
+
+
+async def main(args):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    print(f"{args.connections} idle connections held {args.hold_s}s, then {args.pairs} pairs x {args.messages} "
+          f"ICEcandidate relays; {os.cpu_count()} core(s)\n")
+    print(f"{'server':<6}{'connected':>13}{'held':>7}{'connect':>10}{'RSS/conn':>11}{'idle CPU':>9}"
+          f"{'relayed':>15}{'wall':>11}{'per core':>10}")
+    for n, name in enumerate(args.servers):
+        await run(name, args.port + n, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--servers", type=lambda s: s.split(","), default=["flask", "asgi"])
+    parser.add_argument("--port", type=int, default=3590)
+    parser.add_argument("--connections", type=int, default=2000)
+    parser.add_argument("--connect-concurrency", type=int, default=100)
+    parser.add_argument("--hold-s", type=float, default=10)
+    parser.add_argument("--pairs", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--relay-timeout-s", type=float, default=60)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import os
+import sys
+from call_state import CALL_EXPIRY_INTERVAL_S, CallIndex, timeout_notices
+
+# Local stand-in for a cross-node message bus: keeps presence and call
+# state for every signalling node on this box and forwards events to the
+# nodes a user is connected to. Nodes talk to it through BrokerBackend
+# (backends.py), one JSON message per line.
+#
+# Run with:  python broker.py /tmp/signalling.sock
+# then start each node with SIGNALLING_BACKEND=unix:/tmp/signalling.sock
+
+
+class Broker:
+    def __init__(self, path):
+        self.path = path
+        self.server = None
+        self.nodes = {}  # node_id -> writer
+        self.presence = {}  # user_id -> {node_id: connected sessions}
+        self.calls = CallIndex()
+        self.relayed = 0
+        self._expiry_task = None
+
+    async def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.server = await asyncio.start_unix_server(self.handle_node, self.path, limit=2 ** 22)
+        self._expiry_task = asyncio.create_task(self.expire_calls())
+        print(f"Broker listening on {self.path}")
+        return self
+
+    async def close(self):
+        self._expiry_task.cancel()
+        self.server.close()
+        for writer in self.nodes.values():
+            writer.close()
+        await self.server.wait_closed()
+
+    async def handle_node(self, reader, writer):
+        node_id = None
+        try:
+            while line := await reader.readline():
+                message = json.loads(line)
+                op = message['op']
+                if op == 'hello':
+                    node_id = message['node']
+                    self.nodes[node_id] = writer
+                    print(f"Node '{node_id}' connected")
+                    continue
+                result = self.apply(node_id, op, message)
+                if 'id' in message:
+                    writer.write(json.dumps({'reply': message['id'], 'result': result}).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            # Unless the node has already reconnected on a new connection
+            if node_id is not None and self.nodes.get(node_id) is writer:
+                self.drop_node(node_id)
+            writer.close()
+
+    def apply(self, node_id, op, message):
+        if op == 'join':
+            # A node rejoining after a lost connection announces all of a user's sessions at once
+            sessions = self.presence.setdefault(message['user'], {})
+            sessions[node_id] = sessions.get(node_id, 0) + message.get('sessions', 1)
+        elif op == 'leave':
+            self.leave(message['user'], node_id)
+        elif op == 'add_call':
+            self.calls.add(message['caller'], message['callee'])
+        elif op == 'answer_call':
+            return self.calls.answer(message['caller'], message['callee'])
+        elif op == 'remove_call':
+            self.calls.remove(*message['users'])
+        elif op == 'publish':
+            self.publish(message['user'], message['event'], message['data'], skip=node_id)
+        elif op == 'stats':
+            return {'nodes': len(self.nodes), 'users': len(self.presence), 'relayed': self.relayed,
+                    **self.calls.stats()}
+        else:
+            print(f"Unknown broker op from '{node_id}': {op}")
+
+    def publish(self, user_id, event, data, skip=None):
+        """Forwards an event to every node with a session of the user, but `skip`."""
+        line = json.dumps({'user': user_id, 'event': event, 'data': data}).encode() + b'\n'
+        for target in self.presence.get(user_id, ()):
+            if target != skip:
+                self.nodes[target].write(line)
+                self.relayed += 1
+
+    def leave(self, user_id, node_id):
+        sessions = self.presence.get(user_id, {})
+        if sessions.get(node_id, 0) > 1:
+            sessions[node_id] -= 1
+            return
+        sessions.pop(node_id, None)
+        if not sessions:
+            # The user's last session anywhere: their calls go with it
+            self.presence.pop(user_id, None)
+            self.calls.drop_user(user_id)
+
+    async def expire_calls(self):
+        while True:
+            await asyncio.sleep(CALL_EXPIRY_INTERVAL_S)
+            for call in self.calls.expire():
+                for room, data in timeout_notices(call):
+                    self.publish(room, 'callEnded', data)
+
+    def drop_node(self, node_id):
+        """A node went away: so did every phone connected to it."""
+        self.nodes.pop(node_id, None)
+        for user_id in [user_id for user_id, sessions in self.presence.items() if node_id in sessions]:
+            sessions = self.presence[user_id]
+            del sessions[node_id]
+            if not sessions:
+                del self.presence[user_id]
+                self.calls.drop_user(user_id)
+        print(f"Node '{node_id}' disconnected")
+
+
+async def main(path):
+    broker = await Broker(path).start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await broker.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else '/tmp/signalling.sock'))
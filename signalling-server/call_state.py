@@ -0,0 +1,179 @@
+import collections
+import os
+import time
+
+# Indexed signalling state. Every lookup and teardown touches only the
+# user's own entries, so the cost stays flat however many users are online.
+
+CALL_TTL_S = float(os.environ.get('CALL_TTL_S', 30))  # An unanswered call rings this long before it is dropped
+CALL_EXPIRY_INTERVAL_S = 1  # How often calls are checked for expiry
+
+
+def _index_add(index, key, value):
+    """
+    Files `value` under `key` and returns how many values the key has.
+    A key with one value keeps it bare: most users have one session and one
+    call, and a set for each would triple the memory at 100k users.
+    """
+    current = index.get(key)
+    if current is None:
+        index[key] = value
+        return 1
+    if not isinstance(current, set):
+        if current == value:
+            return 1
+        current = index[key] = {current}
+    current.add(value)
+    return len(current)
+
+
+def _index_remove(index, key, value):
+    """Removes `value` from under `key` and returns how many values the key has left."""
+    current = index.get(key)
+    if current is None:
+        return 0
+    if not isinstance(current, set):
+        if current != value:
+            return 1
+        del index[key]
+        return 0
+    current.discard(value)
+    if len(current) == 1:
+        index[key] = next(iter(current))
+    return len(current)
+
+
+def _index_values(index, key):
+    current = index.get(key)
+    if current is None:
+        return ()
+    return tuple(current) if isinstance(current, set) else (current,)
+
+
+def timeout_notices(call):
+    """The callEnded events telling both sides an unanswered call expired, as (room, data)."""
+    return [
+        (call.caller_id, {'senderId': call.callee_id, 'targetId': call.caller_id, 'reason': 'timeout'}),
+        (call.callee_id, {'senderId': call.caller_id, 'targetId': call.callee_id, 'reason': 'timeout'}),
+    ]
+
+
+class SessionIndex:
+    """Socket.IO sessions (sid) and the user each one logged in as, both ways."""
+
+    def __init__(self):
+        self.user_by_sid = {}  # sid -> user_id
+        self.sids_by_user = {}  # user_id -> sid, or {sid, ...} when logged in more than once
+        self.duplicate_users = 0  # users logged in from more than one session
+
+    def add(self, sid, user_id):
+        """Returns how many sessions the user now has."""
+        self.user_by_sid[sid] = user_id
+        sessions = _index_add(self.sids_by_user, user_id, sid)
+        if sessions == 2:
+            self.duplicate_users += 1
+        return sessions
+
+    def remove(self, sid):
+        """Returns the session's user, or None if it never logged in."""
+        user_id = self.user_by_sid.pop(sid, None)
+        if user_id is None:
+            return None
+        if _index_remove(self.sids_by_user, user_id, sid) == 1:
+            self.duplicate_users -= 1
+        return user_id
+
+    def user_for(self, sid):
+        return self.user_by_sid.get(sid)
+
+    def is_online(self, user_id):
+        return user_id in self.sids_by_user
+
+    def stats(self):
+        return {'sessions': len(self.user_by_sid), 'users': len(self.sids_by_user),
+                'duplicate_users': self.duplicate_users}
+
+
+class Call:
+    __slots__ = ('caller_id', 'callee_id', 'created_at', 'answered')
+
+    def __init__(self, caller_id, callee_id, created_at):
+        self.caller_id = caller_id
+        self.callee_id = callee_id
+        self.created_at = created_at
+        self.answered = False
+
+
+class CallIndex:
+    """
+    Calls in progress, keyed by the pair of users, with a per-user index
+    and expiry of calls nobody answered within `ttl_s`.
+
+    Ringing calls also sit in a FIFO in the order they were made, so an
+    expiry sweep only looks at the calls that are due. Entries for calls
+    answered, hung up or made again since are skipped when they come up.
+    """
+
+    def __init__(self, ttl_s=CALL_TTL_S):
+        self.ttl_s = ttl_s
+        self.calls = {}  # frozenset({A, B}) -> Call
+        self.calls_by_user = {}  # user_id -> frozenset({A, B}), or a set of them
+        self._ringing = collections.deque()  # (Call, key), oldest first
+        self.ringing = 0
+        self.expired = 0
+
+    def add(self, caller_id, callee_id, now=None):
+        key = frozenset({caller_id, callee_id})
+        self._remove(key)
+        call = self.calls[key] = Call(caller_id, callee_id, time.monotonic() if now is None else now)
+        for user_id in key:
+            _index_add(self.calls_by_user, user_id, key)
+        self._ringing.append((call, key))
+        self.ringing += 1
+        return call
+
+    def answer(self, a, b):
+        """Marks the call answered. False if there is no such call (hung up, dropped or expired)."""
+        call = self.calls.get(frozenset({a, b}))
+        if call is None:
+            return False
+        if not call.answered:
+            call.answered = True
+            self.ringing -= 1
+        return True
+
+    def has(self, a, b):
+        return frozenset({a, b}) in self.calls
+
+    def remove(self, a, b):
+        return self._remove(frozenset({a, b}))
+
+    def _remove(self, key):
+        call = self.calls.pop(key, None)
+        if call is None:
+            return None
+        for user_id in key:
+            _index_remove(self.calls_by_user, user_id, key)
+        if not call.answered:
+            self.ringing -= 1
+        return call
+
+    def drop_user(self, user_id):
+        """Removes every call the user is in; returns them."""
+        return [self._remove(key) for key in _index_values(self.calls_by_user, user_id)]
+
+    def expire(self, now=None):
+        """Removes the calls that rang longer than `ttl_s`; returns them."""
+        deadline = (time.monotonic() if now is None else now) - self.ttl_s
+        expired = []
+        while self._ringing and self._ringing[0][0].created_at <= deadline:
+            call, key = self._ringing.popleft()
+            if self.calls.get(key) is call and not call.answered:
+                self._remove(key)
+                expired.append(call)
+        self.expired += len(expired)
+        return expired
+
+    def stats(self):
+        return {'calls': len(self.calls), 'ringing': self.ringing, 'answered': len(self.calls) - self.ringing,
+                'expired': self.expired}